@@ -3,10 +3,20 @@
 
 import os
 import re
+import sys
 import json
-import glob
+import time
+import random
+import hashlib
+import threading
+import uuid
+import contextlib
 import pathlib
-import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+from tools import results as junit_results  # noqa: E402
 
 # ---------- utils ----------
 
@@ -23,16 +33,6 @@ def _fmt_duration(sec):
     h = m // 60; m = m % 60
     return f"~{h}h{m:02d}m"
 
-def _extract_browser(name: str) -> str | None:
-    if not name:
-        return None
-    m = re.search(r"[^\[\]]+", name)
-    if not m:
-        return None
-    token = m.group(1)
-    browser = token.split("-", 1)[0].strip().lower()
-    return browser if browser in ("chromium", "firefox", "webkit") else None
-
 def _prepare_proxies():
     px = os.getenv("TELEGRAM_PROXY") or os.getenv("HTTPS_PROXY") or os.getenv("HTTP_PROXY")
     if not px:
@@ -48,120 +48,55 @@ def _bool_env(name: str, default: bool = False) -> bool:
     return raw in {"1", "true", "yes", "y", "on"}
 
 
-def _pretty_test_id(name: str) -> str:
-    if not name:
-        return name
-    base, br = (name.split("[", 1) + [""])[:2]
-    br = br.rstrip("]") if br else ""
-    parts = base.split(".")
-    if parts and parts[0] == "tests":
-        parts = parts[1:]
-    mod = "/".join(parts[:-1]) if len(parts) > 1 else base
-    fn = parts[-1] if parts else base
-    browser = None
-    param = None
-    if br:
-        if "-" in br:
-            browser, param = br.split("-", 1)
-        else:
-            browser, param = br, None
-    tail = []
-    if param:
-        tail.append(f"[{param}]")
-    if browser:
-        tail.append(f"({browser})")
-    suffix = (" " + " ".join(tail)) if tail else ""
-    return f"{mod}::{fn}{suffix}"
-
 # ---------- JUnit parsing ----------
 
 def _find_junit():
+    """JUNIT_XML may list several files / globs (one per shard or rerun job); default: newest report/*.xml."""
     p_env = (os.getenv("JUNIT_XML") or "").strip()
-    if p_env and pathlib.Path(p_env).is_file():
-        return p_env
-    cands = sorted(glob.glob("report/*.xml"), key=lambda p: pathlib.Path(p).stat().st_mtime, reverse=True)
-    for p in cands:
-        try:
-            root = ET.parse(p).getroot()
-            if root.tag.endswith("testsuite") or root.find(".//testsuite") is not None:
-                return p
-        except Exception:
-            continue
-    return p_env or ""
-
-def _collect_suites(root):
-    return [root] if root.tag.endswith("testsuite") else list(root.findall(".//testsuite"))
-
-def _parse_junit_any(path):
-    p = pathlib.Path(path)
-    if not p.is_file():
-        return {}
-    try:
-        root = ET.parse(p).getroot()
-    except Exception as e:
-        print(f"[report] WARN: parse error: {e}")
+    if p_env:
+        files = junit_results.expand([p_env])
+        if files:
+            return files
+    newest = junit_results.newest_junit("report")
+    return [newest] if newest else []
+
+def _parse_junit_any(paths):
+    paths = [paths] if isinstance(paths, (str, pathlib.Path)) else list(paths or [])
+    paths = [str(p) for p in paths if pathlib.Path(p).is_file()]
+    if paths:
+        rs = junit_results.load_results(paths, cache=junit_results.cache_path())
+    else:
+        # No XML around (e.g. only the results cache was downloaded as an artifact)
+        rs = junit_results.read_cache()
+    if rs is None or not len(rs):
         return {}
 
-    suites = _collect_suites(root)
-    if not suites:
-        return {}
-
-    passed, errored, failed, skipped = [], [], [], []
-    duration_sum = 0.0
-    slow = []
-
-    for ts in suites:
-        try:
-            duration_sum += float(ts.get("time","0") or 0.0)
-        except Exception:
-            pass
-        for tc in ts.findall(".//testcase"):
-            name = (tc.get("name") or "").strip()
-            classname = (tc.get("classname") or "").strip()
-            full_name = f"{classname}.{name}".strip(".")
-
-            try:
-                ttime = float(tc.get("time", "0") or 0.0)
-            except Exception:
-                ttime = 0.0
-            if ttime > 5:
-                slow.append((ttime, full_name))
-
-            props = {p.get("name"): p.get("value") for p in tc.findall("properties/property")}
-            cid = props.get("case_id", "")
-            title = props.get("case_title", "")
-
-            fe = tc.find("failure")
-            er = tc.find("error")
-            sk = tc.find("skipped")
-
-            test_details = {'name': full_name, 'time': ttime, 'id': cid, 'title': title}
-
-            if er is not None:
-                msg = (er.get("message") or "").strip() or (er.text or "").strip() or "No message"
-                test_details['reason'] = msg
-                errored.append(test_details)
-            elif fe is not None:
-                msg = (fe.get("message") or "").strip() or (fe.text or "").strip() or "No message"
-                test_details['reason'] = msg
-                failed.append(test_details)
-            elif sk is not None:
-                msg = (sk.get("message") or "").strip() or (sk.text or "").strip() or ""
-                test_details['reason'] = msg
-                skipped.append(test_details)
-            else:
-                passed.append(test_details)
+    buckets = {"pass": [], "fail": [], "error": [], "skip": []}
+    slow, flaky = [], []
+    for case in rs:
+        full_name = case.full_name
+        if case.time > 5:
+            slow.append((case.time, full_name))
+        test_details = {'name': full_name, 'nodeid': case.nodeid, 'pretty': case.pretty, 'time': case.time,
+                        'id': case.case_id, 'title': case.title}
+        if case.outcome != "pass":
+            test_details['reason'] = case.message
+        if case.flaky:
+            flaky.append({**test_details, 'attempts': case.attempts})
+        buckets[case.outcome].append(test_details)
 
     slow.sort(key=lambda x: x[0], reverse=True)
     return {
-        "total": len(passed) + len(failed) + len(errored) + len(skipped),
-        "duration": duration_sum,
+        "total": len(rs),
+        "duration": rs.duration,
         "slow": slow[:5],
-        "passed_tests": passed,
-        "failed_tests": failed,
-        "errored_tests": errored,
-        "skipped_tests": skipped,
-        "_junit_src": str(p),
+        "passed_tests": buckets["pass"],
+        "failed_tests": buckets["fail"],
+        "errored_tests": buckets["error"],
+        "skipped_tests": buckets["skip"],
+        "flaky_tests": flaky,
+        "_junit_src": rs.sources[-1] if rs.sources else "",
+        "_junit_srcs": rs.sources,
     }
 
 def _load_summary():
@@ -173,10 +108,136 @@ def _load_summary():
                 return data
         except Exception as e:
             print(f"[report] WARN: SUMMARY_JSON parse error: {e}")
-    path = _find_junit()
-    if not path or not pathlib.Path(path).is_file():
+    return _parse_junit_any(_find_junit())
+
+# ---------- fixture timing ----------
+
+def _load_fixture_timing():
+    """report/fixture-timing.json from tests/_fixtures/timing.py (setup/call/teardown per test)."""
+    p = pathlib.Path(os.getenv("FIXTURE_TIMING_JSON") or "report/fixture-timing.json")
+    if not p.is_file():
         return {}
-    return _parse_junit_any(path)
+    try:
+        return json.loads(p.read_text(encoding="utf-8")) or {}
+    except Exception as e:
+        print(f"[report] WARN: fixture timing parse error: {e}")
+        return {}
+
+# ---------- run history ----------
+
+def _history_lines(summary):
+    """Significant slowdowns from the run-history store (tools/run_history.py), if one exists."""
+    db = (os.getenv("E2E_HISTORY_DB") or "").strip() or "report/history.sqlite"
+    if not pathlib.Path(db).is_file() or not _bool_env("TELEGRAM_HISTORY", True):
+        return []
+    try:
+        from tools import run_history as rh
+
+        site = os.getenv("SITE", "")
+        branch = os.getenv("GITHUB_REF_NAME", "")
+        with contextlib.closing(rh.connect(db)) as conn:
+            srcs = [p for p in (summary.get("_junit_srcs") or [summary.get("_junit_src")])
+                    if p and pathlib.Path(p).is_file()]
+            if srcs:
+                # Idempotent: JUnit files that were already ingested are skipped; shards form one run
+                rh.ingest_junit(conn, srcs, site, branch,
+                                os.getenv("GITHUB_SHA", ""), os.getenv("BASE_URL", ""),
+                                cache=junit_results.cache_path())
+            # Baseline from this branch only; other branches' runs are not comparable
+            regs = rh.find_regressions(conn, site or None, branch or None)
+    except Exception as e:
+        print(f"[report] WARN: run history unavailable: {e}")
+        return []
+    limit = _list_limit_from_env("TELEGRAM_HISTORY_LIMIT", 5)
+    lines = [f"- {r.describe()}" for r in regs[:limit]]
+    if len(regs) > limit:
+        lines.append(f"(...and {len(regs) - limit} more)")
+    return lines
+
+# ---------- run-over-run diff ----------
+
+_BAD = ("fail", "error")
+
+def _summary_store_path():
+    """report/summaries/<site>-<branch>.json (TELEGRAM_SUMMARY_DIR); one file per site and branch."""
+    site = os.getenv("SITE") or os.getenv("PROJECT") or "default"
+    branch = os.getenv("GITHUB_REF_NAME") or os.getenv("BRANCH") or "local"
+    name = re.sub(r"[^\w.-]+", "_", f"{site}-{branch}")
+    return pathlib.Path(os.getenv("TELEGRAM_SUMMARY_DIR") or "report/summaries") / f"{name}.json"
+
+def _test_key(test):
+    return test.get("nodeid") or junit_results.nodeid_for(*junit_results.split_full_name(test.get("name") or ""))
+
+def _outcomes(summary):
+    """{nodeid: (outcome, seconds)} from the summary lists."""
+    out = {}
+    for bucket, outcome in (("passed_tests", "pass"), ("failed_tests", "fail"),
+                            ("errored_tests", "error"), ("skipped_tests", "skip")):
+        for t in summary.get(bucket) or []:
+            out[_test_key(t)] = (outcome, float(t.get("time") or 0.0))
+    return out
+
+def _load_previous():
+    p = _summary_store_path()
+    if not p.is_file():
+        return None
+    try:
+        data = json.loads(p.read_text(encoding="utf-8")) or {}
+        data["tests"] = {k: tuple(v) for k, v in (data.get("tests") or {}).items()}
+        return data
+    except Exception as e:
+        print(f"[report] WARN: previous summary unreadable ({p}): {e}")
+        return None
+
+def _save_summary(summary):
+    if not int(summary.get("total") or 0):
+        return  # a crashed run would turn every test into "newly failing" next time
+    p = _summary_store_path()
+    data = {
+        "sha": os.getenv("GITHUB_SHA", ""),
+        "run_id": os.getenv("GITHUB_RUN_ID", ""),
+        "saved_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "tests": {k: [o, round(t, 3)] for k, (o, t) in _outcomes(summary).items()},
+    }
+    try:
+        p.parent.mkdir(parents=True, exist_ok=True)
+        p.write_text(json.dumps(data, separators=(",", ":")), encoding="utf-8")
+    except Exception as e:
+        print(f"[report] WARN: cannot store run summary ({p}): {e}")
+
+def _diff_runs(prev, cur):
+    """
+    Keyed comparison of two {nodeid: (outcome, seconds)} maps. Tests missing from
+    the current run are ignored (not selected this time is not the same as fixed).
+    """
+    try:
+        ratio = float(os.getenv("TELEGRAM_SLOW_RATIO", "1.5"))
+        min_s = float(os.getenv("TELEGRAM_SLOW_MIN_S", "2"))
+    except ValueError:
+        ratio, min_s = 1.5, 2.0
+    d = {"new_failing": [], "fixed": [], "still_failing": [], "new_slow": [], "new_skipped": []}
+    for key, (outcome, t) in cur.items():
+        p_out, p_t = prev.get(key) or (None, 0.0)
+        if outcome in _BAD:
+            d["still_failing" if p_out in _BAD else "new_failing"].append(key)
+        elif outcome == "pass":
+            if p_out in _BAD:
+                d["fixed"].append(key)
+            elif p_out == "pass" and t >= p_t * ratio and t - p_t >= min_s:
+                d["new_slow"].append((key, p_t, t))
+        elif outcome == "skip" and p_out in ("pass", *_BAD):
+            d["new_skipped"].append(key)
+    d["new_slow"].sort(key=lambda x: x[1] - x[2])
+    return d
+
+def _run_diff(summary):
+    """(previous-run meta, diff) or None when there is nothing to compare with."""
+    if not _bool_env("TELEGRAM_DIFF", True) or not int(summary.get("total") or 0):
+        return None
+    prev = _load_previous()
+    if not prev or not prev.get("tests"):
+        return None
+    return prev, _diff_runs(prev["tests"], _outcomes(summary))
 
 # ---------- message builders ----------
 
@@ -242,14 +303,14 @@ def _build_message(summary):
     errored = summary.get("errored_tests", [])
     skipped = _filter_skipped(summary.get("skipped_tests", []))
     
-    def format_test_list(tests, show_reason=False):
+    def format_test_list(tests, show_reason=False, limit=None):
         lines = []
         tests.sort(key=lambda x: x.get('id') or x.get('name'))
-        limit = _list_limit_from_env("TELEGRAM_LIST_LIMIT", 20)
+        limit = limit or _list_limit_from_env("TELEGRAM_LIST_LIMIT", 20)
         
         for test in tests[:limit]:
             case_id = test.get('id')
-            title = test.get('title') or _pretty_test_id(test.get('name'))
+            title = test.get('title') or test.get('pretty') or junit_results.pretty_id(test.get('name') or "")
             prefix = f"[{case_id}] " if case_id else "• "
             lines.append(f"{prefix}{title}")
             if show_reason and test.get('reason'):
@@ -261,28 +322,81 @@ def _build_message(summary):
             lines.append(f"(...and {more} more)")
         return "\n".join(lines)
 
-    if failed:
-        blocks.append("\n❌ Failed Tests:")
-        blocks.append(format_test_list(failed, show_reason=True))
-    
-    if errored:
-        blocks.append("\n💥 Errored Tests:")
-        blocks.append(format_test_list(errored, show_reason=True))
-
-    if skipped:
-        blocks.append("\n⚠️ Skipped Tests:")
-        blocks.append(format_test_list(skipped, show_reason=True))
+    diff = _run_diff(summary)
+    if diff:
+        # Only what changed since the previous run of this site/branch gets full detail
+        prev, d = diff
+        by_key = {_test_key(t): t for t in failed + errored + skipped + passed}
+        pick = lambda keys: [by_key[k] for k in keys if k in by_key]
+        since = " · ".join(filter(None, [(prev.get("sha") or "")[:7], prev.get("saved_at") or ""]))
+        blocks.append(f"\n🔄 Since last run{f' ({since})' if since else ''}: "
+                      f"new fail {len(d['new_failing'])} · fixed {len(d['fixed'])} · "
+                      f"still failing {len(d['still_failing'])} · newly slow {len(d['new_slow'])} · "
+                      f"newly skipped {len(d['new_skipped'])}")
+        if d["new_failing"]:
+            blocks.append("\n🆕 Newly failing:")
+            blocks.append(format_test_list(pick(d["new_failing"]), show_reason=True))
+        if d["fixed"]:
+            blocks.append("\n✅ Fixed:")
+            blocks.append(format_test_list(pick(d["fixed"])))
+        if d["still_failing"]:
+            blocks.append(f"\n♻️ Still failing ({len(d['still_failing'])}):")
+            blocks.append(format_test_list(pick(d["still_failing"]),
+                                           limit=_list_limit_from_env("TELEGRAM_STILL_FAILING_LIMIT", 5)))
+        if d["new_slow"]:
+            blocks.append("\n🐢 Newly slow:")
+            for key, before, after in d["new_slow"][:_list_limit_from_env("TELEGRAM_LIST_LIMIT", 20)]:
+                t = by_key.get(key) or {}
+                name = t.get('title') or t.get('pretty') or key
+                blocks.append(f"- {name}: {_fmt_duration(before)} → {_fmt_duration(after)}")
+        new_skipped = _filter_skipped(pick(d["new_skipped"]))
+        if new_skipped:
+            blocks.append("\n⏭ Newly skipped:")
+            blocks.append(format_test_list(new_skipped, show_reason=True))
+    else:
+        if failed:
+            blocks.append("\n❌ Failed Tests:")
+            blocks.append(format_test_list(failed, show_reason=True))
+
+        if errored:
+            blocks.append("\n💥 Errored Tests:")
+            blocks.append(format_test_list(errored, show_reason=True))
+
+        if skipped:
+            blocks.append("\n⚠️ Skipped Tests:")
+            blocks.append(format_test_list(skipped, show_reason=True))
+
+    flaky = summary.get("flaky_tests") or []
+    if flaky:
+        blocks.append("\n🔁 Flaky (failed, then passed on rerun):")
+        blocks.append(format_test_list(flaky))
 
     show_passed = _bool_env("TELEGRAM_SHOW_PASSED", False)
     if passed and show_passed:
         blocks.append("\n✅ Passed Tests:")
         blocks.append(format_test_list(passed))
 
+    hist = _history_lines(summary)
+    if hist:
+        blocks.append("\n📈 Slower than usual (run history):")
+        blocks.extend(hist)
+
     slow = summary.get("slow") or []
+    timing = _load_fixture_timing()
     if slow:
         blocks.append("\n🐌 Slowest tests (top 5):")
         for t, full in slow[:5]:
-            blocks.append(f"- {_fmt_duration(t)} — {_pretty_test_id(full)}")
+            nodeid = junit_results.nodeid_for(*junit_results.split_full_name(full))
+            phases = (timing.get("tests") or {}).get(nodeid) or {}
+            split = ""
+            if phases:
+                split = f" (setup {phases.get('setup', 0):.1f}s, call {phases.get('call', 0):.1f}s)"
+            blocks.append(f"- {_fmt_duration(t)} — {junit_results.pretty_id(full)}{split}")
+    ph = timing.get("phases") or {}
+    if sum(ph.values() or [0]) > 0:
+        tot = sum(ph.values())
+        blocks.append("⏱ Time split: " + ", ".join(
+            f"{k} {_fmt_duration(ph.get(k, 0))} ({ph.get(k, 0) / tot:.0%})" for k in ("setup", "call", "teardown")))
 
     return "\n".join(filter(None, blocks))
 
@@ -295,46 +409,236 @@ def _list_limit_from_env(var_name: str, default: int = 20) -> int:
     except Exception:
         return default
 
-def _send_text(text):
+# Delivery: one pooled session per route (proxy / direct), chats in parallel,
+# chunks of one chat strictly in order. Every chunk has an idempotency key
+# (run, chat, position, text) recorded in a small ledger once Telegram accepts
+# it. In CI the run is GITHUB_RUN_ID and the workflows cache the ledger per
+# run, so re-running a job skips chunks an earlier attempt already delivered;
+# outside CI every invocation is its own run. The direct fallback is only taken
+# when the request provably never reached the server (connect/proxy/TLS
+# failure); anything ambiguous (read timeout, dropped response) is reported as
+# "uncertain".
+
+CHUNK = 3900
+LEDGER_TTL_S = 7 * 86400  # ledger entries older than this are dropped on load
+_INVOCATION = uuid.uuid4().hex  # run id when GITHUB_RUN_ID is not set
+
+@dataclass
+class _ChatReport:
+    chat: str
+    chunks: int
+    sent: int = 0
+    skipped: int = 0
+    uncertain: int = 0
+    failed: int = 0
+    retries: int = 0
+    waited: float = 0.0
+    elapsed: float = 0.0
+    error: str = ""
+
+    @property
+    def ok(self) -> bool:
+        return self.failed == 0 and self.uncertain == 0
+
+    def describe(self) -> str:
+        parts = [f"{self.sent}/{self.chunks} sent"]
+        if self.skipped:
+            parts.append(f"{self.skipped} already sent")
+        if self.uncertain:
+            parts.append(f"{self.uncertain} uncertain")
+        if self.failed:
+            parts.append(f"{self.failed} failed")
+        if self.retries:
+            parts.append(f"{self.retries} retries, {self.waited:.1f}s waiting")
+        tail = f" — {self.error}" if self.error else ""
+        return f"{self.chat}: " + ", ".join(parts) + f" in {self.elapsed:.1f}s{tail}"
+
+
+class _Ledger:
+    """Idempotency keys of chunks Telegram has accepted (TELEGRAM_LEDGER, default report/.telegram-ledger.json)."""
+
+    def __init__(self, path):
+        self.path = pathlib.Path(path) if path else None
+        self.lock = threading.Lock()
+        self.entries = {}
+        if self.path and self.path.is_file():
+            with contextlib.suppress(Exception):
+                self.entries = json.loads(self.path.read_text(encoding="utf-8")) or {}
+        cutoff = time.time() - LEDGER_TTL_S
+        self.entries = {k: v for k, v in self.entries.items()
+                        if isinstance(v, dict) and (v.get("at") or 0) >= cutoff}
+
+    def __contains__(self, key):
+        with self.lock:
+            return key in self.entries
+
+    def add(self, key, chat, message_id):
+        with self.lock:
+            self.entries[key] = {"chat": chat, "message_id": message_id, "at": int(time.time())}
+            if self.path:
+                with contextlib.suppress(Exception):
+                    self.path.parent.mkdir(parents=True, exist_ok=True)
+                    self.path.write_text(json.dumps(self.entries), encoding="utf-8")
+
+
+def _chunk_key(chat, idx, body):
+    run = f"{os.getenv('GITHUB_REPOSITORY', '')}/{os.getenv('GITHUB_RUN_ID') or _INVOCATION}"
+    return hashlib.sha256(f"{run}|{chat}|{idx}|{body}".encode("utf-8")).hexdigest()[:32]
+
+
+def _sessions(workers):
+    """[(label, session)]: via TELEGRAM_PROXY/HTTPS_PROXY first, then direct when a proxy is configured."""
     import requests
+    from requests.adapters import HTTPAdapter
+
+    def pooled(**attrs):
+        s = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, workers))
+        s.mount("https://", adapter)
+        s.mount("http://", adapter)
+        for k, v in attrs.items():
+            setattr(s, k, v)
+        return s
+
+    proxies = _prepare_proxies()
+    if not proxies:
+        return [("direct", pooled())]
+    return [("proxy", pooled(proxies=proxies)), ("direct", pooled(trust_env=False, proxies={}))]
+
+
+def _never_sent(exc) -> bool:
+    """Connection-level failures where the request provably did not reach the server."""
+    import requests
+    from urllib3.exceptions import NewConnectionError, ProxyError
+
+    if isinstance(exc, (requests.exceptions.ConnectTimeout, requests.exceptions.ProxyError,
+                        requests.exceptions.SSLError)):
+        return True
+    reason = getattr(exc.args[0], "reason", None) if exc.args else None
+    return isinstance(reason, (NewConnectionError, ProxyError))
+
+
+def _retry_after(resp) -> float | None:
+    with contextlib.suppress(Exception):
+        return float((resp.json().get("parameters") or {})["retry_after"])
+    with contextlib.suppress(Exception):
+        return float(resp.headers["Retry-After"])
+    return None
+
+
+def _backoff(attempt: int) -> float:
+    # Full jitter, capped
+    return random.uniform(0, min(30.0, 1.0 * 2 ** attempt))
+
+
+def _post_chunk(sessions, url, data, rep, max_retries):
+    """One chunk: ("sent", message_id) | ("failed", reason) | ("uncertain", reason).
+
+    `sessions` is the calling chat's own route order; it is reordered in place.
+    """
+    import requests
+
+    for attempt in range(max_retries + 1):
+        pause, reason = None, ""
+        routes = list(sessions)
+        for route in routes:
+            label, sess = route
+            try:
+                r = sess.post(url, data=data, timeout=(10, 30))
+            except requests.exceptions.RequestException as e:
+                if not _never_sent(e):
+                    return "uncertain", f"{label}: {e.__class__.__name__}: {e}"
+                reason = f"{label}: {e.__class__.__name__}"
+                if route is not routes[-1]:
+                    print(f"[telegram] {data['chat_id']}: {reason}, trying next route...")
+                continue
+            if r.status_code == 429:
+                wait = _retry_after(r)
+                pause = (wait if wait is not None else _backoff(attempt)) + random.uniform(0, 1.0)
+                reason = f"429 (retry_after={wait})"
+                break
+            if r.status_code >= 500:
+                pause, reason = _backoff(attempt), f"HTTP {r.status_code}"
+                break
+            if r.ok:
+                if sessions[0] is not route:
+                    # Stick to the route that works for the remaining chunks
+                    sessions[:] = [route] + [x for x in sessions if x is not route]
+                mid = None
+                with contextlib.suppress(Exception):
+                    mid = r.json()["result"]["message_id"]
+                return "sent", mid
+            desc = ""
+            with contextlib.suppress(Exception):
+                desc = r.json().get("description") or ""
+            return "failed", f"HTTP {r.status_code} {desc}".strip()
+        else:
+            pause = _backoff(attempt)  # every route failed to connect
+        if attempt == max_retries:
+            return "failed", reason
+        rep.retries += 1
+        rep.waited += pause
+        print(f"[telegram] {data['chat_id']}: {reason}; retry {attempt + 1}/{max_retries} in {pause:.1f}s")
+        time.sleep(pause)
+    return "failed", "retries exhausted"
+
+
+def _send_chat(chat, parts, sessions, url, ledger, max_retries):
+    rep = _ChatReport(chat=chat, chunks=len(parts))
+    sessions = list(sessions)  # route preference is per chat; the pooled sessions are shared
+    t0 = time.monotonic()
+    for idx, body in enumerate(parts, 1):
+        key = _chunk_key(chat, idx, body)
+        if key in ledger:
+            rep.skipped += 1
+            continue
+        data = {"chat_id": chat, "text": body, "disable_web_page_preview": True}
+        status, info = _post_chunk(sessions, url, data, rep, max_retries)
+        if status == "sent":
+            ledger.add(key, chat, info)
+            rep.sent += 1
+            print(f"[telegram] {chat}: chunk {idx}/{len(parts)} sent")
+            continue
+        rep.error = str(info)
+        if status == "uncertain":
+            rep.uncertain += 1
+            print(f"[telegram] {chat}: chunk {idx}/{len(parts)} may not have arrived ({info}); not resending")
+            continue
+        # Later chunks would read out of context without this one
+        rep.failed += len(parts) - idx + 1
+        print(f"[telegram] {chat}: chunk {idx}/{len(parts)} failed ({info}); skipping the rest for this chat")
+        break
+    rep.elapsed = time.monotonic() - t0
+    return rep
+
+
+def _send_text(text):
     token = os.environ["TELEGRAM_BOT_TOKEN"]
     chat_env = os.environ["TELEGRAM_CHAT_ID"]
-    chat_ids = [c.strip() for c in re.split(r"[\\s,]+", chat_env) if c.strip()]
-    proxies = _prepare_proxies()
+    chat_ids = list(dict.fromkeys(c.strip() for c in re.split(r"[\s,]+", chat_env) if c.strip()))
+    api = (os.getenv("TELEGRAM_API_BASE") or "https://api.telegram.org").rstrip("/")
+    url = f"{api}/bot{token}/sendMessage"
 
     print("\n===== Telegram message preview =====\n")
     print(text)
     print()
 
-    CHUNK = 3900
     parts = [text[i:i + CHUNK] for i in range(0, len(text), CHUNK)] or [text]
+    workers = min(len(chat_ids), _list_limit_from_env("TELEGRAM_CONCURRENCY", 4)) or 1
+    max_retries = _list_limit_from_env("TELEGRAM_MAX_RETRIES", 5)
+    ledger = _Ledger(os.getenv("TELEGRAM_LEDGER", "report/.telegram-ledger.json"))
+    sessions = _sessions(workers)
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            reports = list(pool.map(lambda c: _send_chat(c, parts, sessions, url, ledger, max_retries), chat_ids))
+    finally:
+        for _, sess in sessions:
+            sess.close()
 
-    for chat in chat_ids:
-        sent = 0
-        for idx, body in enumerate(parts, 1):
-            data = {"chat_id": chat, "text": body, "disable_web_page_preview": True}
-            print(f"[telegram] Sending chunk {idx}/{len(parts)} to {chat}...")
-            try:
-                r = requests.post(
-                    f"https://api.telegram.org/bot{token}/sendMessage",
-                    data=data, timeout=30, proxies=proxies
-                )
-                r.raise_for_status()
-                print(f"[telegram] Chunk {idx} sent successfully")
-                sent += 1
-            except Exception as e:
-                print(f"[telegram] Proxy send failed for chunk {idx}: {e}")
-                print("[telegram] Retrying direct (without proxy)...")
-                with requests.Session() as s:
-                    s.trust_env = False
-                    r = s.post(
-                        f"https://api.telegram.org/bot{token}/sendMessage",
-                        data=data, timeout=60, proxies={}
-                    )
-                    r.raise_for_status()
-                    print(f"[telegram] Chunk {idx} sent successfully via direct connection.")
-                    sent += 1
-        print(f"Telegram sent OK to {chat} ({sent}/{len(parts)} chunks).")
+    print("[telegram] Delivery summary:")
+    for rep in reports:
+        print(f"[telegram]   {'OK  ' if rep.ok else 'FAIL'} {rep.describe()}")
+    return all(rep.ok for rep in reports)
 
 def main():
     s = _load_summary()
@@ -343,7 +647,10 @@ def main():
         s = {"total": 0, "passed_tests": [], "failed_tests": [], "errored_tests": [], "skipped_tests": []}
     
     msg = _build_message(s)
-    _send_text(msg)
+    if not _send_text(msg):
+        sys.exit(1)
+    # Only a delivered report becomes the baseline for the next run's diff
+    _save_summary(s)
 
 if __name__ == "__main__":
     main()
@@ -2,11 +2,12 @@
 import re
 import contextlib
 from typing import Optional
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import List
 
 from playwright.sync_api import Page, Locator
 from pages.core.base_page import BasePage
-from pages.common_helpers import ResponseLike, fill_force, is_inside_ion_searchbar
+from pages.common_helpers import Phase, ResponseLike, fill_force, is_inside_ion_searchbar
 
 
 @dataclass
@@ -15,6 +16,7 @@ class LoginResult:
     final_url: Optional[str] = None
     error: Optional[str] = None
     body: str = ""
+    phases: List[Phase] = field(default_factory=list)
 
 # -------------------- helpers --------------------
 
@@ -62,6 +64,7 @@ class LoginPage(BasePage):
                 yield p
 
     def goto(self):
+        timer = self.start_phases()
         last_err = None
         for p in self._candidate_paths():
             url = f"{self.base_url}{p}"
@@ -70,6 +73,7 @@ class LoginPage(BasePage):
                 with contextlib.suppress(Exception):
                     self.page.wait_for_timeout(250)
                 if re.search(r"/(auth/login|log[-_]?in|sign[-_]?in)(\?|/|$)", self.page.url, re.I):
+                    timer.mark("page_ready")
                     return
             except Exception as e:
                 last_err = e
@@ -353,39 +357,62 @@ class LoginPage(BasePage):
     # ----- actions -----
 
     def login(self, email: str, password: str, wait_response_ms: int = 15_000) -> ResponseLike:
+        timer = self.take_phases()
+        timer.mark_once("page_ready")
         self._switch_to_password_mode()
 
+        # Locate both fields before typing so selector time and fill time are separate phases
         email_input = self._email_input()
-        fill_force(email_input, email)
-
         pwd = self._password_input()
+        timer.mark("form_located")
+
+        fill_force(email_input, email)
         fill_force(pwd, password)
+        timer.mark("fields_filled")
 
         form_scope = self._find_form_scope(email_input) or self._find_form_scope(pwd) or self.page
 
+        btn = None
         with contextlib.suppress(Exception):
             btn = self._pick_submit(form_scope, email_input, pwd)
-            if btn:
-                btn.click(timeout=2_500)
 
         patt = re.compile(r"/(auth|login|log[-_]?in|sign|session|token)", re.I)
         status = None
         url = self.page.url
         body = ""
+        got_response = False
+        clicked = False
+        resp = None
+        # Listen before clicking so a fast auth response is not missed; the wait itself is the backend time
         with contextlib.suppress(Exception):
-            resp = self.page.wait_for_response(
+            with self.page.expect_response(
                 lambda r: (patt.search(r.url or "") is not None)
                 or (getattr(r, "request", None) and r.request.method in ("POST", "PUT", "PATCH") and patt.search(r.url or "")),
                 timeout=wait_response_ms,
-            )
+            ) as resp_info:
+                with contextlib.suppress(Exception):
+                    if btn:
+                        btn.click(timeout=2_500)
+                        clicked = True
+                timer.mark("submit_clicked", ok=clicked)
+                if not clicked:
+                    raise RuntimeError("submit not clicked; no auth response to wait for")
+            resp = resp_info.value
+        timer.mark_once("submit_clicked", ok=clicked)  # expect_response itself failed before the click
+        if resp is not None:
+            got_response = True
             with contextlib.suppress(Exception):
                 status = resp.status if hasattr(resp, "status") else resp.status()
             with contextlib.suppress(Exception):
                 url = resp.url
             with contextlib.suppress(Exception):
                 body = resp.text() or ""
+        timer.mark("auth_response", ok=got_response)
 
+        settled = False
         with contextlib.suppress(Exception):
             self.page.wait_for_load_state("domcontentloaded", timeout=5_000)
+            settled = True
+        timer.mark("navigation_settled", ok=settled)
 
-        return ResponseLike(status=status, url=url, body=body)
+        return ResponseLike(status=status, url=url, body=body, phases=timer.phases)
@@ -1,15 +1,53 @@
 from __future__ import annotations
-from dataclasses import dataclass
-from typing import Optional
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
 
 from playwright.sync_api import Locator
 
+# Phase names recorded by the login page objects, in order
+LOGIN_PHASES = ("page_ready", "form_located", "fields_filled", "submit_clicked", "auth_response", "navigation_settled")
+
+
+@dataclass
+class Phase:
+    name: str
+    at: float  # time.monotonic() when the phase ended
+    elapsed_ms: float  # since the flow started
+    duration_ms: float  # since the previous phase
+    ok: bool = True  # False when the step timed out / was not observed
+
+
+class PhaseTimer:
+    """Monotonic phase marks for a multi-step UI flow (e.g. login)."""
+
+    def __init__(self) -> None:
+        self.started_at = time.monotonic()
+        self.phases: List[Phase] = []
+
+    def mark(self, name: str, ok: bool = True) -> Phase:
+        now = time.monotonic()
+        prev = self.phases[-1].at if self.phases else self.started_at
+        ph = Phase(name, now, round((now - self.started_at) * 1000, 1), round((now - prev) * 1000, 1), ok)
+        self.phases.append(ph)
+        return ph
+
+    def mark_once(self, name: str, ok: bool = True) -> None:
+        if not any(p.name == name for p in self.phases):
+            self.mark(name, ok)
+
+
+def phase_durations(phases: List[Phase]) -> Dict[str, float]:
+    """{phase: duration_ms}; handy for record_property / reports."""
+    return {p.name: p.duration_ms for p in phases or []}
+
 
 @dataclass
 class ResponseLike:
     status: Optional[int] = None
     url: str = ""
     body: str = ""
+    phases: List[Phase] = field(default_factory=list)
 
 
 def is_inside_ion_searchbar(locator: Locator) -> bool:
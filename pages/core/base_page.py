@@ -4,6 +4,8 @@ from typing import Optional
 
 from playwright.sync_api import Page
 
+from pages.common_helpers import PhaseTimer
+
 
 class BasePage:
     """Lightweight base page with common helpers.
@@ -11,11 +13,23 @@ class BasePage:
     - Normalizes `base_url`
     - Provides `goto_path` with consistent waiting
     - Small wait helper for minor UI stabilization
+    - Phase timer for multi-step flows (goto() starts it, login() takes it)
     """
 
     def __init__(self, page: Page, base_url: str):
         self.page = page
         self.base_url = (base_url or "").rstrip("/")
+        self._phases: Optional[PhaseTimer] = None
+
+    def start_phases(self) -> PhaseTimer:
+        self._phases = PhaseTimer()
+        return self._phases
+
+    def take_phases(self) -> PhaseTimer:
+        """Return the running timer (a new one if none) and detach it for the flow's result."""
+        timer = self._phases or PhaseTimer()
+        self._phases = None
+        return timer
 
     def goto_path(self, path: str, wait_until: str = "domcontentloaded", timeout: int = 30_000):
         p = (path or "/").strip()
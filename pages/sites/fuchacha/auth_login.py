@@ -33,12 +33,14 @@ class LoginPage(BasePage):
         self.login_path = login_path if login_path.startswith("/") else f"/{login_path}"
 
     def goto(self):
+        timer = self.start_phases()
         url = f"{self.base_url}{self.login_path}"
         self.page.goto(url, wait_until="domcontentloaded")
         try:
             self.page.wait_for_timeout(200)
         except Exception:
             pass
+        timer.mark("page_ready")
 
     def _username(self) -> Optional[Locator]:
         # Labels/placeholder typically 'User Name'
@@ -67,8 +69,11 @@ class LoginPage(BasePage):
             return None
 
     def login(self, username: str, password: str, wait_response_ms: int = 15000) -> ResponseLike:
+        timer = self.take_phases()
+        timer.mark_once("page_ready")
         u = self._username()
         p = self._password()
+        timer.mark("form_located", ok=bool(u and p))
         if u:
             try:
                 u.fill("")
@@ -81,29 +86,45 @@ class LoginPage(BasePage):
                 p.fill(password)
             except Exception:
                 pass
+        timer.mark("fields_filled")
         btn = self._submit()
-        if btn:
-            try:
-                btn.click()
-            except Exception:
-                pass
-
+        clicked = False
         patt = re.compile(r"/(auth|login|session|token)", re.I)
         status = None
         url = self.page.url
         body = ""
+        got_response = False
+        resp = None
         try:
-            resp = self.page.wait_for_response(lambda r: patt.search(r.url or "") is not None, timeout=wait_response_ms)
+            # Listen before clicking so a fast auth response is not missed
+            with self.page.expect_response(lambda r: patt.search(r.url or "") is not None,
+                                           timeout=wait_response_ms) as resp_info:
+                if btn:
+                    try:
+                        btn.click()
+                        clicked = True
+                    except Exception:
+                        pass
+                timer.mark("submit_clicked", ok=clicked)
+                if not clicked:
+                    raise RuntimeError("submit not clicked; no auth response to wait for")
+            resp = resp_info.value
+        except Exception:
+            pass
+        timer.mark_once("submit_clicked", ok=clicked)  # expect_response itself failed before the click
+        if resp is not None:
+            got_response = True
             status = resp.status if hasattr(resp, "status") else None
             url = getattr(resp, "url", url)
             try:
                 body = resp.text() or ""
             except Exception:
                 body = ""
-        except Exception:
-            pass
+        timer.mark("auth_response", ok=got_response)
+        settled = True
         try:
             self.page.wait_for_load_state("domcontentloaded", timeout=5000)
         except Exception:
-            pass
-        return ResponseLike(status=status, url=url, body=body)
+            settled = False
+        timer.mark("navigation_settled", ok=settled)
+        return ResponseLike(status=status, url=url, body=body, phases=timer.phases)
@@ -38,12 +38,14 @@ class LoginPage(BasePage):
 
     # ---------- navigation ----------
     def goto(self):
+        timer = self.start_phases()
         # mở trang và chờ modal hiện
         self.page.goto(f"{self.base_url}{self.path}", wait_until="domcontentloaded")
         # bảo đảm tab Email được chọn
         email_tab = self.page.get_by_role("tab", name=re.compile(r"email", re.I))
         if email_tab.count() > 0:
             email_tab.first.click()
+        timer.mark("page_ready")
 
     # ---------- locators ----------
     def _email(self) -> Locator:
@@ -78,9 +80,21 @@ class LoginPage(BasePage):
           - final_url: page.url after attempt
           - error: exception message if any internal errors
           - body: response text if captured
+          - phases: page_ready → form_located → fields_filled → submit_clicked →
+            auth_response → navigation_settled (monotonic marks)
         """
         result = LoginResult()
+        timer = self.take_phases()
+        result.phases = timer.phases
+        timer.mark_once("page_ready")
         try:
+            located = False
+            with contextlib.suppress(Exception):
+                self.page.locator("input[type='email'], input[name='email']").first.wait_for(
+                    state="visible", timeout=2000)
+                located = True
+            timer.mark("form_located", ok=located)
+
             # Fill email
             try:
                 self.page.fill("input[type='email']", email, timeout=2000)
@@ -94,6 +108,7 @@ class LoginPage(BasePage):
             except Exception:
                 with contextlib.suppress(Exception):
                     self.page.fill("input[name='password']", password, timeout=2000)
+            timer.mark("fields_filled")
 
             # Try to capture a login-related response (best-effort)
             resp = None
@@ -111,11 +126,14 @@ class LoginPage(BasePage):
                         except Exception:
                             with contextlib.suppress(Exception):
                                 self.page.press("input[type='password']", "Enter", timeout=2000)
+                    timer.mark("submit_clicked")
                 resp = resp_info.value
             except TimeoutError:
                 resp = None
             except Exception:
                 resp = None
+            timer.mark_once("submit_clicked", ok=False)
+            timer.mark("auth_response", ok=resp is not None)
 
             if resp is not None:
                 try:
@@ -129,12 +147,15 @@ class LoginPage(BasePage):
                     result.body = None
 
             # Prefer waiting for networkidle/load rather than fixed sleeps
+            settled = True
             if wait_for_navigation:
                 try:
                     self.page.wait_for_load_state("networkidle", timeout=10000)
                 except Exception:
+                    settled = False
                     with contextlib.suppress(Exception):
                         self.page.wait_for_load_state("load", timeout=5000)
+            timer.mark("navigation_settled", ok=settled)
 
             try:
                 result.final_url = getattr(self.page, "url", None)
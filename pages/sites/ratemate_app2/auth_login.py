@@ -1,18 +1,20 @@
 from __future__ import annotations
+import contextlib
 import re
 import time
 from typing import Optional
 
 from playwright.sync_api import Page, Locator
 from pages.core.base_page import BasePage
-from pages.common_helpers import fill_force
+from pages.common_helpers import ResponseLike, fill_force
 
 
 class LoginPage(BasePage):
     """Login modal with tabs 'Phone number' / 'Email' and a 'Sign in' button (ratemate_app2).
 
     Heuristic behavior similar to ratemate variant: ensure Email tab is active,
-    fill email/password, click Sign in.
+    fill email/password, click Sign in. `login()` returns a ResponseLike with
+    the auth response (if one was seen) and the phase timings.
     """
 
     def __init__(self, page: Page, base_url: str, path: str):
@@ -21,6 +23,7 @@ class LoginPage(BasePage):
 
     # ---------- navigation ----------
     def goto(self):
+        timer = self.start_phases()
         self.goto_path(self.path, wait_until="domcontentloaded")
         # try ensure Email tab
         try:
@@ -54,6 +57,7 @@ class LoginPage(BasePage):
                 self.wait_briefly(300)
         except Exception:
             pass
+        timer.mark("page_ready")
 
     # ---------- locators ----------
     def _email(self) -> Locator:
@@ -75,7 +79,9 @@ class LoginPage(BasePage):
         return self.page.get_by_role("button", name=re.compile(r"sign\s*in|login|log\s*in|continue", re.I)).first
 
     # ---------- actions ----------
-    def login(self, email: str, password: str) -> None:
+    def login(self, email: str, password: str, wait_response_ms: int = 10_000) -> ResponseLike:
+        timer = self.take_phases()
+        timer.mark_once("page_ready")
         # Ensure auth panel open (click Sign in if present)
         try:
             ion = self.page.locator("ion-button:has-text('Sign in')").or_(
@@ -87,10 +93,13 @@ class LoginPage(BasePage):
         except Exception:
             pass
         # ensure auth modal/content visible
+        located = True
         try:
             self.page.locator("ion-input input").first.wait_for(state="visible", timeout=5_000)
         except Exception:
+            located = False
             self.wait_briefly(500)
+        timer.mark("form_located", ok=located)
         try:
             e = self._email()
             fill_force(e, email)
@@ -143,5 +152,39 @@ class LoginPage(BasePage):
                 pass
         if p:
             fill_force(p, password)
-        self._submit().click()
+        timer.mark("fields_filled", ok=bool(p))
+
+        patt = re.compile(r"/(auth|login|log[-_]?in|sign|session|token)", re.I)
+        resp = None
+        click_error: Optional[Exception] = None
+        try:
+            with self.page.expect_response(lambda r: patt.search(r.url or "") is not None,
+                                           timeout=wait_response_ms) as resp_info:
+                try:
+                    self._submit().click()
+                except Exception as e:
+                    click_error = e
+                    raise
+                timer.mark("submit_clicked")
+            resp = resp_info.value
+        except Exception:
+            # A failed click is still an error for the caller; a missing auth response is not
+            if click_error is not None:
+                raise click_error
+        timer.mark("auth_response", ok=resp is not None)
+
         self.wait_briefly(300)
+        settled = False
+        with contextlib.suppress(Exception):
+            self.page.wait_for_load_state("domcontentloaded", timeout=5_000)
+            settled = True
+        timer.mark("navigation_settled", ok=settled)
+
+        out = ResponseLike(url=self.page.url, phases=timer.phases)
+        if resp is not None:
+            with contextlib.suppress(Exception):
+                out.status = resp.status
+                out.url = resp.url
+            with contextlib.suppress(Exception):
+                out.body = resp.text() or ""
+        return out
@@ -64,6 +64,8 @@ def _load_site_config() -> Dict:
         routes_public = routes
 
     locales = cfg.get("locales") if isinstance(cfg.get("locales"), list) else None
+    perf_budgets = cfg.get("perf_budgets") if isinstance(cfg.get("perf_budgets"), dict) else None
+    memory_budget = cfg.get("memory_budget") if isinstance(cfg.get("memory_budget"), dict) else None
 
     out = {
         "base_url": (str(base_url).rstrip("/") if base_url else None),
@@ -72,6 +74,8 @@ def _load_site_config() -> Dict:
         "routes_public": routes_public,
         "routes_protected": routes_protected,
         "locales": locales,
+        "perf_budgets": perf_budgets,
+        "memory_budget": memory_budget,
     }
     return {k: v for k, v in out.items() if v}
 
@@ -169,6 +173,18 @@ def credentials() -> dict:
     return {"email": pick("EMAIL"), "password": pick("PASSWORD")}
 
 
+@pytest.fixture(scope="session")
+def perf_budgets() -> Dict[str, Dict]:
+    """`perf_budgets` from the site config: {route_or_prefix: {metric: limit}}."""
+    return _load_site_config().get("perf_budgets") or {}
+
+
+@pytest.fixture(scope="session")
+def memory_budget() -> Dict[str, float]:
+    """`memory_budget` from the site config: max growth per route cycle, e.g. {heap_slope_kb: 256}."""
+    return _load_site_config().get("memory_budget") or {}
+
+
 @pytest.fixture(scope="session")
 def public_routes() -> List[str]:
     raw = os.environ.get("PUBLIC_ROUTES", "/,/login")
@@ -0,0 +1,284 @@
+# -*- coding: utf-8 -*-
+"""
+Opt-in span tracing of Playwright calls (E2E_TRACE_SPANS=1).
+
+Wraps the sync `Page`/`Locator` methods the page objects use (goto, click,
+fill, wait_for*, evaluate, ...) and records nested spans under the test's
+setup/call/teardown phases and fixture setups. The `expect_*` context managers
+get one span covering their whole `with` block (the action inside plus the
+wait for the event). Per test, a Chrome Trace Event
+file is written to report/spans/ (open in https://ui.perfetto.dev or
+chrome://tracing); at the end the slowest call sites (file:line + method,
+summed over the run) are printed and saved as report/spans/callsites.json.
+
+Nothing is patched unless the variable is set, so the default run pays no
+overhead. E2E_TRACE_TOP sets the table size (default 15).
+"""
+import functools
+import json
+import os
+import pathlib
+import re
+import sys
+import threading
+import time
+
+import pytest
+
+PAGE_METHODS = (
+    "goto", "reload", "go_back", "click", "fill", "press", "type", "check", "hover", "select_option",
+    "wait_for_selector", "wait_for_load_state", "wait_for_url", "wait_for_timeout", "wait_for_function",
+    "evaluate", "screenshot", "content", "set_content",
+)
+# Context managers: the span opens on __enter__ and closes on __exit__
+PAGE_CONTEXT_METHODS = ("expect_response", "expect_request", "expect_navigation")
+LOCATOR_METHODS = (
+    "click", "dblclick", "fill", "press", "type", "press_sequentially", "check", "uncheck", "hover",
+    "select_option", "wait_for", "evaluate", "is_visible", "is_enabled", "is_checked", "text_content",
+    "inner_text", "input_value", "get_attribute", "count", "screenshot",
+)
+
+_OUT = pathlib.Path("report/spans")
+_THIS = str(pathlib.Path(__file__).resolve())
+_SKIP_DIRS: tuple[str, ...] = ()  # Playwright's own package, filled in when tracing is enabled
+
+
+def _enabled() -> bool:
+    return (os.getenv("E2E_TRACE_SPANS") or "").strip().lower() in {"1", "true", "yes", "on"}
+
+
+class _Tracer:
+    def __init__(self):
+        self.events: list[dict] = []
+        self.callsites: dict[str, list[float]] = {}  # key -> [count, total_ms, max_ms]
+        self.tids: dict[int, int] = {}
+        self.pid = os.getpid()
+
+    def _tid(self) -> int:
+        ident = threading.get_ident()
+        return self.tids.setdefault(ident, len(self.tids) + 1)
+
+    def span(self, name: str, cat: str, args: dict | None = None):
+        return _Span(self, name, cat, args)
+
+    def add(self, name: str, cat: str, start_ns: int, end_ns: int, args: dict | None) -> None:
+        self.events.append({
+            "name": name, "cat": cat, "ph": "X", "pid": self.pid, "tid": self._tid(),
+            "ts": start_ns / 1000.0, "dur": (end_ns - start_ns) / 1000.0, "args": args or {},
+        })
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "cat", "args", "start")
+
+    def __init__(self, tracer, name, cat, args):
+        self.tracer, self.name, self.cat, self.args = tracer, name, cat, args
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter_ns()
+        if exc_type is not None:
+            self.args = {**(self.args or {}), "error": exc_type.__name__}
+        self.tracer.add(self.name, self.cat, self.start, end, self.args)
+        return False
+
+
+def _call_site() -> str:
+    """First frame outside Playwright and this plugin, as 'path:line (function)'."""
+    f = sys._getframe(2)
+    while f is not None:
+        fn = f.f_code.co_filename
+        if fn != _THIS and not fn.startswith(_SKIP_DIRS):
+            try:
+                rel = os.path.relpath(fn)
+            except ValueError:
+                rel = fn
+            return f"{rel}:{f.f_lineno} ({f.f_code.co_name})"
+        f = f.f_back
+    return "?"
+
+
+class _Call:
+    """One traced Playwright call: a span plus its call-site totals."""
+
+    __slots__ = ("tracer", "name", "site", "span", "t0")
+
+    def __init__(self, tracer: _Tracer, name: str, site: str, span_args: dict):
+        self.tracer, self.name, self.site = tracer, name, site
+        self.span = tracer.span(name, "playwright", span_args)
+
+    def __enter__(self):
+        self.t0 = time.perf_counter_ns()
+        self.span.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.span.__exit__(exc_type, exc, tb)
+        ms = (time.perf_counter_ns() - self.t0) / 1e6
+        st = self.tracer.callsites.setdefault(f"{self.name} @ {self.site}", [0, 0.0, 0.0])
+        st[0] += 1
+        st[1] += ms
+        st[2] = max(st[2], ms)
+        return False
+
+
+class _TracedContext:
+    """Wraps an `expect_*` EventContextManager so the span covers the whole `with` block."""
+
+    def __init__(self, cm, call: _Call):
+        self._cm, self._call = cm, call
+
+    def __enter__(self):
+        self._call.__enter__()
+        try:
+            return self._cm.__enter__()
+        except BaseException as e:
+            self._call.__exit__(type(e), e, e.__traceback__)
+            raise
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            return self._cm.__exit__(exc_type, exc, tb)
+        finally:
+            self._call.__exit__(exc_type, exc, tb)
+
+
+def _wrap(tracer: _Tracer, cls_name: str, name: str, orig, context: bool = False):
+    @functools.wraps(orig)
+    def wrapper(self, *args, **kwargs):
+        site = _call_site()
+        arg0 = args[0] if args and isinstance(args[0], (str, int, float)) else None
+        span_args = {"site": site}
+        if arg0 is not None:
+            span_args["arg"] = str(arg0)[:200]
+        if cls_name == "Locator":
+            span_args["selector"] = getattr(self, "_impl_obj", None) and getattr(self._impl_obj, "_selector", None)
+        call = _Call(tracer, f"{cls_name}.{name}", site, span_args)
+        if context:
+            return _TracedContext(orig(self, *args, **kwargs), call)
+        with call:
+            return orig(self, *args, **kwargs)
+    wrapper.__rm_traced__ = True
+    return wrapper
+
+
+def _patch(tracer: _Tracer) -> None:
+    global _SKIP_DIRS
+    import playwright
+    from playwright.sync_api import Locator, Page
+
+    _SKIP_DIRS = (os.path.dirname(os.path.abspath(playwright.__file__)),)
+
+    for cls, methods, context in ((Page, PAGE_METHODS, False), (Page, PAGE_CONTEXT_METHODS, True),
+                                  (Locator, LOCATOR_METHODS, False)):
+        for name in methods:
+            orig = getattr(cls, name, None)
+            if orig is None:
+                print(f"[spans] WARN: {cls.__name__}.{name} not found in this Playwright version, not traced")
+                continue
+            if getattr(orig, "__rm_traced__", False):
+                continue
+            setattr(cls, name, _wrap(tracer, cls.__name__, name, orig, context))
+
+
+def _test_file(nodeid: str) -> pathlib.Path:
+    return _OUT / (re.sub(r"[^\w.-]+", "_", nodeid.replace("::", "__")).strip("_")[:150] + ".trace.json")
+
+
+def pytest_configure(config):
+    if not _enabled():
+        return
+    tracer = _Tracer()
+    try:
+        _patch(tracer)
+    except Exception as e:  # pragma: no cover - playwright missing
+        print(f"[spans] WARN: tracing disabled: {e}")
+        return
+    config._rm_tracer = tracer
+    _OUT.mkdir(parents=True, exist_ok=True)
+    if not hasattr(config, "workerinput"):
+        for old in _OUT.glob("callsites*.json"):
+            old.unlink()
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_protocol(item, nextitem):
+    tracer = getattr(item.config, "_rm_tracer", None)
+    if tracer is None:
+        yield
+        return
+    tracer.events = []
+    with tracer.span(item.nodeid, "test"):
+        yield
+    data = {"traceEvents": tracer.events, "displayTimeUnit": "ms", "otherData": {"test": item.nodeid}}
+    _test_file(item.nodeid).write_text(json.dumps(data), encoding="utf-8")
+
+
+def _phase_wrapper(phase: str):
+    @pytest.hookimpl(hookwrapper=True)
+    def hook(item):
+        tracer = getattr(item.config, "_rm_tracer", None)
+        if tracer is None:
+            yield
+            return
+        with tracer.span(phase, "phase"):
+            yield
+    return hook
+
+
+pytest_runtest_setup = _phase_wrapper("setup")
+pytest_runtest_call = _phase_wrapper("call")
+pytest_runtest_teardown = _phase_wrapper("teardown")
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_fixture_setup(fixturedef, request):
+    tracer = getattr(request.config, "_rm_tracer", None)
+    if tracer is None:
+        yield
+        return
+    with tracer.span(f"fixture:{fixturedef.argname}", "fixture", {"scope": fixturedef.scope}):
+        yield
+
+
+def pytest_sessionfinish(session):
+    tracer = getattr(session.config, "_rm_tracer", None)
+    if tracer is None:
+        return
+    wid = getattr(session.config, "workerinput", {}).get("workerid", "main")
+    (_OUT / f"callsites-{wid}.json").write_text(json.dumps(tracer.callsites), encoding="utf-8")
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    if getattr(config, "_rm_tracer", None) is None or hasattr(config, "workerinput"):
+        return
+    merged: dict[str, list[float]] = {}
+    for f in _OUT.glob("callsites-*.json"):
+        try:
+            data = json.loads(f.read_text(encoding="utf-8")) or {}
+        except Exception:
+            continue
+        for key, (n, total, mx) in data.items():
+            st = merged.setdefault(key, [0, 0.0, 0.0])
+            st[0] += n
+            st[1] += total
+            st[2] = max(st[2], mx)
+    if not merged:
+        return
+    try:
+        top_n = int(os.getenv("E2E_TRACE_TOP", "15"))
+    except ValueError:
+        top_n = 15
+    ranked = sorted(merged.items(), key=lambda kv: -kv[1][1])
+    (_OUT / "callsites.json").write_text(json.dumps(
+        [{"call": k, "count": n, "total_ms": round(t, 1), "max_ms": round(m, 1)} for k, (n, t, m) in ranked],
+        indent=2), encoding="utf-8")
+    tr = terminalreporter
+    tr.section(f"slowest Playwright call sites (top {top_n})")
+    tr.write_line(f"{'total ms':>10} {'count':>6} {'max ms':>9}  call")
+    for key, (n, total, mx) in ranked[:top_n]:
+        tr.write_line(f"{total:10.0f} {n:6d} {mx:9.0f}  {key}")
+    tr.write_line(f"Per-test traces: {_OUT}/*.trace.json (open in https://ui.perfetto.dev)")
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""
+Fixture and phase timing (on by default; E2E_FIXTURE_TIMING=0 disables it).
+
+Times every fixture's setup and teardown, keyed by fixture name and scope, and
+each test's setup / call / teardown phases, so browser/context creation and
+login fixtures can be told apart from the test body. Results are written to
+report/fixture-timing.json (merged across xdist workers) and shown as an extra
+table at the top of the pytest-html report.
+"""
+import html
+import json
+import os
+import pathlib
+import time
+
+import pytest
+
+_OUT = pathlib.Path("report")
+_FILE = "fixture-timing.json"
+_TOP = 15
+_timing = None  # set in pytest_configure; TestReport carries no config
+
+
+def _enabled() -> bool:
+    return (os.getenv("E2E_FIXTURE_TIMING") or "1").strip().lower() not in {"0", "false", "no", "off"}
+
+
+class _Timing:
+    def __init__(self):
+        self.fixtures: dict[str, dict] = {}  # "name|scope" -> stats
+        self.tests: dict[str, dict[str, float]] = {}
+        self._teardown_start: dict[int, float] = {}
+
+    def _stats(self, name: str, scope: str) -> dict:
+        return self.fixtures.setdefault(f"{name}|{scope}", {
+            "fixture": name, "scope": scope, "setup_count": 0, "setup_s": 0.0, "setup_max_s": 0.0,
+            "teardown_count": 0, "teardown_s": 0.0, "teardown_max_s": 0.0,
+        })
+
+    def add(self, name: str, scope: str, phase: str, seconds: float) -> None:
+        st = self._stats(name, scope)
+        st[f"{phase}_count"] += 1
+        st[f"{phase}_s"] += seconds
+        st[f"{phase}_max_s"] = max(st[f"{phase}_max_s"], seconds)
+
+
+def pytest_configure(config):
+    global _timing
+    if _enabled():
+        _timing = config._rm_timing = _Timing()
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_fixture_setup(fixturedef, request):
+    timing = getattr(request.config, "_rm_timing", None)
+    # Direct parametrization shows up as a pseudo fixture per argument
+    if timing is None or getattr(fixturedef.func, "__name__", "") == "get_direct_param_fixture_func":
+        yield
+        return
+    t0 = time.perf_counter()
+    yield
+    timing.add(fixturedef.argname, fixturedef.scope, "setup", time.perf_counter() - t0)
+
+    # Finalizers run last-in first-out, so this one fires right before the
+    # fixture's own teardown; pytest_fixture_post_finalizer closes the interval.
+    def _mark(key=id(fixturedef)):
+        timing._teardown_start[key] = time.perf_counter()
+    fixturedef.addfinalizer(_mark)
+
+
+def pytest_fixture_post_finalizer(fixturedef, request):
+    timing = getattr(request.config, "_rm_timing", None)
+    if timing is None:
+        return
+    t0 = timing._teardown_start.pop(id(fixturedef), None)
+    if t0 is not None:
+        timing.add(fixturedef.argname, fixturedef.scope, "teardown", time.perf_counter() - t0)
+
+
+def pytest_runtest_logreport(report):
+    if _timing is None:
+        return
+    _timing.tests.setdefault(report.nodeid, {})[report.when] = round(report.duration, 4)
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_sessionfinish(session):
+    timing = getattr(session.config, "_rm_timing", None)
+    if timing is None:
+        return
+    if hasattr(session.config, "workerinput"):
+        wid = session.config.workerinput.get("workerid", "gw")
+        _OUT.mkdir(parents=True, exist_ok=True)
+        (_OUT / f".fixture-timing-{wid}.json").write_text(
+            json.dumps({"fixtures": timing.fixtures}), encoding="utf-8")
+        return
+    # Controller (or single process): fold in worker fixture stats; test phases arrive via logreport
+    fixtures = {k: dict(v) for k, v in timing.fixtures.items()}
+    for f in _OUT.glob(".fixture-timing-*.json"):
+        try:
+            data = json.loads(f.read_text(encoding="utf-8")) or {}
+        except Exception:
+            continue
+        finally:
+            f.unlink(missing_ok=True)
+        for key, v in (data.get("fixtures") or {}).items():
+            st = fixtures.setdefault(key, {**v, **{k: 0 for k in v if k.endswith(("_count", "_s"))}})
+            for k, val in v.items():
+                if k.endswith("_max_s"):
+                    st[k] = max(st[k], val)
+                elif k.endswith(("_count", "_s")):
+                    st[k] += val
+    if not timing.tests and not fixtures:
+        return
+    phases = {w: round(sum(t.get(w, 0.0) for t in timing.tests.values()), 3) for w in ("setup", "call", "teardown")}
+    ranked = sorted(fixtures.values(), key=lambda s: -(s["setup_s"] + s["teardown_s"]))
+    session.config._rm_timing_summary = summary = {
+        "phases": phases,
+        "fixtures": [{**s, **{k: round(v, 4) for k, v in s.items() if k.endswith("_s")}} for s in ranked],
+        "tests": timing.tests,
+    }
+    _OUT.mkdir(parents=True, exist_ok=True)
+    (_OUT / _FILE).write_text(json.dumps(summary, ensure_ascii=False, indent=1), encoding="utf-8")
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_html_results_summary(prefix, summary, postfix, session):
+    data = getattr(session.config, "_rm_timing_summary", None)
+    if not data:
+        return
+    ph = data["phases"]
+    total = sum(ph.values()) or 1.0
+    rows = "".join(
+        f"<tr><td>{html.escape(s['fixture'])}</td><td>{s['scope']}</td><td>{s['setup_count']}</td>"
+        f"<td>{s['setup_s']:.2f}</td><td>{s['setup_max_s']:.2f}</td><td>{s['teardown_s']:.2f}</td>"
+        f"<td>{s['teardown_max_s']:.2f}</td></tr>"
+        for s in data["fixtures"][:_TOP])
+    prefix.append(
+        "<h2>Fixture timing</h2>"
+        f"<p>Test phases: setup {ph['setup']:.1f}s ({ph['setup'] / total:.0%}), "
+        f"call {ph['call']:.1f}s ({ph['call'] / total:.0%}), "
+        f"teardown {ph['teardown']:.1f}s ({ph['teardown'] / total:.0%})</p>"
+        "<table><tr><th>fixture</th><th>scope</th><th>setups</th><th>setup s</th><th>max</th>"
+        f"<th>teardown s</th><th>max</th></tr>{rows}</table>")
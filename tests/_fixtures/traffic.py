@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""
+Opt-in XHR/fetch capture for protocol-level replay (tools/replay_traffic.py).
+
+E2E_CAPTURE_TRAFFIC=1 writes one scenario per browser test to report/traffic/;
+any other value is used as the output directory. Credentials are templated as
+{{email}}/{{password}} and bearer tokens as {{token}} (see tools/load/scenario.py).
+"""
+import contextlib
+import os
+import pathlib
+
+import pytest
+
+
+def _capture_dir() -> pathlib.Path | None:
+    raw = (os.getenv("E2E_CAPTURE_TRAFFIC") or "").strip()
+    if not raw or raw.lower() in {"0", "false", "no", "off"}:
+        return None
+    return pathlib.Path("report/traffic" if raw.lower() in {"1", "true", "yes", "on"} else raw)
+
+
+@pytest.fixture(autouse=True)
+def _capture_traffic(request):
+    out_dir = _capture_dir()
+    if out_dir is None or "context" not in request.fixturenames:
+        yield
+        return
+
+    from tools.load.scenario import ScenarioRecorder, save_scenario, scenario_filename
+
+    context = request.getfixturevalue("context")
+    creds = request.getfixturevalue("credentials")
+    rec = ScenarioRecorder(request.node.nodeid, request.getfixturevalue("base_url"),
+                           {"email": creds.get("email", ""), "password": creds.get("password", "")})
+
+    def on_finished(req):
+        if req.resource_type not in ("xhr", "fetch"):
+            return
+        with contextlib.suppress(Exception):
+            resp = req.response()
+            data = None
+            if resp is not None and "json" in (resp.headers.get("content-type") or ""):
+                with contextlib.suppress(Exception):
+                    data = resp.json()
+            rec.add(req.method, req.url, req.all_headers(), req.post_data,
+                    resp.status if resp is not None else None, data, req.resource_type)
+
+    context.on("requestfinished", on_finished)
+    try:
+        yield
+    finally:
+        with contextlib.suppress(Exception):
+            context.remove_listener("requestfinished", on_finished)
+        if rec.steps:
+            save_scenario(out_dir / scenario_filename(request.node.nodeid), rec.to_json())
@@ -0,0 +1,257 @@
+# -*- coding: utf-8 -*-
+"""
+Opt-in network waterfall per test (E2E_WATERFALL=1).
+
+Every request a browser test triggers is logged from its context: URL, type,
+method, status, `request.timing` phases (dns/connect/tls/wait/download), sizes
+and cache source (service worker, 304 revalidation, or served without a
+transfer). Per test, report/waterfall/<test>.json and a small .html waterfall
+are written; the slowest request is also added to the JUnit properties
+(`slowest_request`).
+
+At the end of the session the endpoints are grouped by route template
+(`/api/product/42` -> `/api/product/{id}`, see tools/crawl/templates.py) and
+ranked by p95 time and by size into report/waterfall/summary.json plus a
+terminal table (E2E_WATERFALL_TOP rows, default 10).
+"""
+import contextlib
+import html
+import json
+import os
+import pathlib
+import re
+from urllib.parse import urlsplit
+
+import pytest
+
+_OUT = pathlib.Path("report/waterfall")
+_API_TYPES = ("xhr", "fetch", "document", "eventsource", "websocket")
+
+
+def _enabled() -> bool:
+    return (os.getenv("E2E_WATERFALL") or "").strip().lower() in {"1", "true", "yes", "on"}
+
+
+def _top_n() -> int:
+    try:
+        return max(1, int(os.getenv("E2E_WATERFALL_TOP", "10")))
+    except ValueError:
+        return 10
+
+
+def _phase(t: dict, start: str, end: str) -> float | None:
+    a, b = t.get(start, -1), t.get(end, -1)
+    return round(b - a, 1) if a is not None and b is not None and a >= 0 and b >= a else None
+
+
+def _entry(req, failure: str | None = None) -> dict:
+    t = dict(req.timing or {})
+    resp = None
+    with contextlib.suppress(Exception):
+        resp = req.response()
+    sizes = {}
+    with contextlib.suppress(Exception):
+        sizes = req.sizes()
+    status = resp.status if resp is not None else None
+    body = sizes.get("responseBodySize") or 0
+    headers = sizes.get("responseHeadersSize") or 0
+    cache = None
+    if resp is not None and getattr(resp, "from_service_worker", False):
+        cache = "service_worker"
+    elif status == 304:
+        cache = "revalidated"
+    elif resp is not None and 200 <= (status or 0) < 300 and body == 0 and headers == 0:
+        cache = "cache"
+    return {
+        "url": req.url,
+        "method": req.method,
+        "type": req.resource_type,
+        "status": status,
+        "failure": failure,
+        "start": t.get("startTime"),  # epoch ms
+        "dns_ms": _phase(t, "domainLookupStart", "domainLookupEnd"),
+        "connect_ms": _phase(t, "connectStart", "connectEnd"),
+        "tls_ms": _phase(t, "secureConnectionStart", "connectEnd"),
+        "wait_ms": _phase(t, "requestStart", "responseStart"),
+        "download_ms": _phase(t, "responseStart", "responseEnd"),
+        "total_ms": round(t["responseEnd"], 1) if (t.get("responseEnd") or -1) >= 0 else None,
+        "bytes": body + headers,
+        "cache": cache,
+    }
+
+
+def endpoint_key(method: str, url: str, base_url: str = "") -> str:
+    from tools.crawl.templates import template_for
+
+    parts = urlsplit(url)
+    base = urlsplit(base_url) if base_url else None
+    host = "" if base and parts.netloc == base.netloc else parts.netloc
+    path = parts.path + (f"?{parts.query}" if parts.query else "")
+    return f"{method} {host}{template_for(path)}"
+
+
+def _write_html(path: pathlib.Path, nodeid: str, entries: list[dict]) -> None:
+    starts = [e["start"] for e in entries if e.get("start")]
+    t0 = min(starts) if starts else 0
+    end = max(((e["start"] or t0) - t0 + (e["total_ms"] or 0)) for e in entries) or 1
+    rows = []
+    for e in sorted(entries, key=lambda e: e.get("start") or 0):
+        left = ((e["start"] or t0) - t0) / end * 100
+        width = max(0.3, (e["total_ms"] or 0) / end * 100)
+        color = "#c0392b" if e["failure"] or (e["status"] or 0) >= 400 else "#2e86de"
+        rows.append(
+            f"<tr><td>{e['status'] or e['failure'] or ''}</td><td>{html.escape(e['type'] or '')}</td>"
+            f"<td title='{html.escape(e['url'])}'>{html.escape(e['method'] + ' ' + e['url'][:100])}</td>"
+            f"<td>{e['total_ms'] if e['total_ms'] is not None else ''}</td><td>{e['bytes']}</td>"
+            f"<td>{e['cache'] or ''}</td><td class=bar><div style='margin-left:{left:.2f}%;width:{width:.2f}%;"
+            f"background:{color}'></div></td></tr>")
+    path.write_text(
+        "<!doctype html><meta charset=utf-8><title>Waterfall</title><style>"
+        "body{font:12px sans-serif}table{border-collapse:collapse;width:100%}td{padding:2px 4px;"
+        "white-space:nowrap;overflow:hidden;max-width:40em}.bar{width:40%}.bar div{height:10px}</style>"
+        f"<h3>{html.escape(nodeid)}</h3><p>{len(entries)} requests, {end:.0f} ms</p>"
+        "<table><tr><th>status</th><th>type</th><th>request</th><th>ms</th><th>bytes</th><th>cache</th>"
+        "<th>timeline</th></tr>" + "".join(rows) + "</table>", encoding="utf-8")
+
+
+def _stem(nodeid: str) -> str:
+    return re.sub(r"[^\w.-]+", "_", nodeid.replace("::", "__")).strip("_")[:150]
+
+
+@pytest.fixture(autouse=True)
+def _network_waterfall(request):
+    if not _enabled() or "context" not in request.fixturenames:
+        yield
+        return
+
+    context = request.getfixturevalue("context")
+    base_url = request.getfixturevalue("base_url")
+    entries: list[dict] = []
+
+    def on_finished(req):
+        with contextlib.suppress(Exception):
+            entries.append(_entry(req))
+
+    def on_failed(req):
+        with contextlib.suppress(Exception):
+            entries.append(_entry(req, req.failure or "failed"))
+
+    context.on("requestfinished", on_finished)
+    context.on("requestfailed", on_failed)
+    try:
+        yield
+    finally:
+        with contextlib.suppress(Exception):
+            context.remove_listener("requestfinished", on_finished)
+            context.remove_listener("requestfailed", on_failed)
+        if entries:
+            _record(request, entries, base_url)
+
+
+def _record(request, entries: list[dict], base_url: str) -> None:
+    from tools.load.histogram import Histogram
+
+    _OUT.mkdir(parents=True, exist_ok=True)
+    nodeid = request.node.nodeid
+    slowest = sorted((e for e in entries if e["total_ms"] is not None), key=lambda e: -e["total_ms"])
+    data = {"test": nodeid, "requests": entries,
+            "slowest": [{"url": e["url"], "total_ms": e["total_ms"], "wait_ms": e["wait_ms"]} for e in slowest[:5]]}
+    stem = _stem(nodeid)
+    (_OUT / f"{stem}.json").write_text(json.dumps(data, ensure_ascii=False, indent=1), encoding="utf-8")
+    _write_html(_OUT / f"{stem}.html", nodeid, entries)
+    if slowest:
+        e = slowest[0]
+        request.node.user_properties.append(("slowest_request", f"{e['total_ms']:.0f}ms {e['method']} {e['url']}"))
+
+    agg = request.config._rm_waterfall
+    for e in entries:
+        key = endpoint_key(e["method"], e["url"], base_url)
+        st = agg.setdefault(key, {"type": e["type"], "count": 0, "failed": 0, "bytes": 0, "max_bytes": 0,
+                                  "cached": 0, "hist": Histogram(), "worst": None})
+        st["count"] += 1
+        st["failed"] += bool(e["failure"] or (e["status"] or 0) >= 400)
+        st["bytes"] += e["bytes"]
+        st["max_bytes"] = max(st["max_bytes"], e["bytes"])
+        st["cached"] += bool(e["cache"])
+        if e["total_ms"] is not None:
+            st["hist"].record(e["total_ms"])
+            if st["worst"] is None or e["total_ms"] > st["worst"][0]:
+                st["worst"] = (e["total_ms"], nodeid)
+
+
+def pytest_configure(config):
+    if not _enabled():
+        return
+    config._rm_waterfall = {}
+    if not hasattr(config, "workerinput") and _OUT.is_dir():
+        for old in _OUT.glob("endpoints-*.json"):
+            old.unlink()
+
+
+def pytest_sessionfinish(session):
+    agg = getattr(session.config, "_rm_waterfall", None)
+    if agg is None:
+        return
+    _OUT.mkdir(parents=True, exist_ok=True)
+    wid = getattr(session.config, "workerinput", {}).get("workerid", "main")
+    dump = {k: {**v, "hist": v["hist"].to_dict()} for k, v in agg.items()}
+    (_OUT / f"endpoints-{wid}.json").write_text(json.dumps(dump), encoding="utf-8")
+
+
+def _merge_endpoints() -> dict:
+    from tools.load.histogram import Histogram
+
+    merged: dict = {}
+    for f in _OUT.glob("endpoints-*.json"):
+        try:
+            data = json.loads(f.read_text(encoding="utf-8")) or {}
+        except Exception:
+            continue
+        for key, v in data.items():
+            h = Histogram.from_dict(v["hist"])
+            st = merged.get(key)
+            if st is None:
+                merged[key] = {**v, "hist": h}
+                continue
+            for k in ("count", "failed", "bytes", "cached"):
+                st[k] += v[k]
+            st["max_bytes"] = max(st["max_bytes"], v["max_bytes"])
+            st["hist"].merge(h)
+            if v["worst"] and (not st["worst"] or v["worst"][0] > st["worst"][0]):
+                st["worst"] = v["worst"]
+    return merged
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    if getattr(config, "_rm_waterfall", None) is None or hasattr(config, "workerinput"):
+        return
+    merged = _merge_endpoints()
+    if not merged:
+        return
+    rows = []
+    for key, st in merged.items():
+        s = st["hist"].summary()
+        rows.append({"endpoint": key, "type": st["type"], "count": st["count"], "failed": st["failed"],
+                     "cached": st["cached"], "p50_ms": s["p50_ms"], "p95_ms": s["p95_ms"], "max_ms": s["max_ms"],
+                     "avg_bytes": round(st["bytes"] / st["count"]) if st["count"] else 0,
+                     "max_bytes": st["max_bytes"], "worst_test": st["worst"][1] if st["worst"] else None})
+    n = _top_n()
+    slowest = sorted((r for r in rows if r["p95_ms"] is not None and r["type"] in _API_TYPES),
+                     key=lambda r: -r["p95_ms"])
+    largest = sorted(rows, key=lambda r: -r["max_bytes"])
+    (_OUT / "summary.json").write_text(json.dumps(
+        {"slowest": slowest[:50], "largest": largest[:50], "endpoints": len(rows)}, ensure_ascii=False, indent=2),
+        encoding="utf-8")
+
+    tr = terminalreporter
+    tr.section(f"slowest endpoints by p95 (top {n})")
+    tr.write_line(f"{'p95 ms':>8} {'p50 ms':>8} {'count':>6} {'fail':>5}  endpoint  (worst in)")
+    for r in slowest[:n]:
+        tr.write_line(f"{r['p95_ms']:8.0f} {r['p50_ms']:8.0f} {r['count']:6d} {r['failed']:5d}  "
+                      f"{r['endpoint']}  ({r['worst_test']})")
+    tr.section(f"largest responses (top {n})")
+    tr.write_line(f"{'max KB':>8} {'avg KB':>8} {'count':>6} {'cached':>6}  endpoint")
+    for r in largest[:n]:
+        tr.write_line(f"{r['max_bytes'] / 1024:8.1f} {r['avg_bytes'] / 1024:8.1f} {r['count']:6d} "
+                      f"{r['cached']:6d}  {r['endpoint']}")
+    tr.write_line(f"Per-test waterfalls: {_OUT}/*.html; ranking: {_OUT}/summary.json")
@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+"""
+Web-vitals collection and budget checks for the opt-in perf mode (E2E_PERF=1).
+
+Budgets come from `perf_budgets` in config/sites/<site>.yml, keyed by route or
+prefix (longest prefix wins, "/" acts as a default):
+
+  perf_budgets:
+    "/": {lcp_ms: 4000}
+    "/en/store": {lcp_ms: 2500, cls: 0.1, longtask_ms: 300}
+
+Budget keys are the metric names returned by `collect_vitals`.
+
+The SPA memory check (E2E_MEMORY=1) uses `soft_navigate` / `memory_sample` /
+`slope` with `memory_budget` from the same file.
+"""
+import contextlib
+import statistics
+from typing import Dict, Iterable, List, Optional
+
+# Installed before any page script runs; buffered observers also pick up
+# entries emitted before the observer was attached.
+VITALS_INIT_JS = """
+(() => {
+  if (window.__rmVitals) return;
+  const v = window.__rmVitals = { lcp: null, cls: 0, longtasks: 0, longtaskMs: 0 };
+  const observe = (type, cb) => {
+    try { new PerformanceObserver((list) => list.getEntries().forEach(cb)).observe({ type, buffered: true }); }
+    catch (e) {}
+  };
+  observe('largest-contentful-paint', (e) => { v.lcp = e.renderTime || e.loadTime || e.startTime; });
+  observe('layout-shift', (e) => { if (!e.hadRecentInput) v.cls += e.value; });
+  observe('longtask', (e) => { v.longtasks += 1; v.longtaskMs += e.duration; });
+})();
+"""
+
+_READ_JS = """
+() => {
+  const v = window.__rmVitals || {};
+  const nav = performance.getEntriesByType('navigation')[0];
+  const ms = (x) => (typeof x === 'number' && x > 0 ? Math.round(x) : null);
+  return {
+    lcp_ms: ms(v.lcp),
+    cls: typeof v.cls === 'number' ? Math.round(v.cls * 1000) / 1000 : null,
+    longtask_count: v.longtasks ?? null,
+    longtask_ms: ms(v.longtaskMs) ?? (v.longtasks === 0 ? 0 : null),
+    ttfb_ms: nav ? ms(nav.responseStart - nav.startTime) : null,
+    dcl_ms: nav ? ms(nav.domContentLoadedEventEnd - nav.startTime) : null,
+    load_ms: nav ? ms(nav.loadEventEnd - nav.startTime) : null,
+  };
+}
+"""
+
+
+def collect_vitals(page, settle_ms: int = 1000, timeout_ms: int = 30_000) -> Dict[str, Optional[float]]:
+    """Read vitals for the page's current navigation (after load plus a short settle)."""
+    with contextlib.suppress(Exception):
+        page.wait_for_load_state("load", timeout=timeout_ms)
+    # LCP/CLS keep updating shortly after load
+    with contextlib.suppress(Exception):
+        page.wait_for_timeout(settle_ms)
+    return page.evaluate(_READ_JS) or {}
+
+
+def budget_for(path: str, budgets: Dict[str, Dict]) -> Dict:
+    """Budget of the longest matching route prefix ("/" matches everything)."""
+    best, best_len = {}, -1
+    p = (path or "/").rstrip("/") or "/"
+    for prefix, budget in (budgets or {}).items():
+        pre = (str(prefix).rstrip("/") or "/")
+        hit = pre == "/" or p == pre or p.startswith(pre + "/")
+        if hit and isinstance(budget, dict) and len(pre) > best_len:
+            best, best_len = budget, len(pre)
+    return best
+
+
+def median_metrics(samples: Iterable[Dict]) -> Dict[str, Optional[float]]:
+    samples = list(samples)
+    keys = {k for s in samples for k in s}
+    out = {}
+    for k in sorted(keys):
+        vals = [s[k] for s in samples if isinstance(s.get(k), (int, float))]
+        out[k] = statistics.median(vals) if vals else None
+    return out
+
+
+def check_budget(measured: Dict, budget: Dict, samples: Optional[List[Dict]] = None) -> List[str]:
+    """Human-readable violations of `budget` by the (median) `measured` values."""
+    out = []
+    for key, limit in (budget or {}).items():
+        val = measured.get(key)
+        if val is None or not isinstance(limit, (int, float)):
+            continue
+        if val > limit:
+            msg = f"{key} {val:g} > budget {limit:g}"
+            if samples:
+                msg += " (samples: " + ", ".join(
+                    f"{s.get(key):g}" if isinstance(s.get(key), (int, float)) else "-" for s in samples) + ")"
+            out.append(msg)
+    return out
+
+
+# ----- SPA memory (Chromium / CDP) -----
+
+# Navigate inside the app without a reload: click a matching link if there is
+# one, otherwise push the route and let the router react to popstate. The
+# render signature (title plus the start of the main content) is kept to tell
+# afterwards whether the router actually rendered something else.
+SOFT_NAV_JS = """
+(path) => {
+  window.__rmRenderSig = () => {
+    const root = document.querySelector('main, [role=main]') || document.body;
+    const text = ((root && root.innerText) || '').replace(/\\s+/g, ' ').trim();
+    return document.title + '|' + text.length + '|' + text.slice(0, 500);
+  };
+  window.__rmSoftNav = window.__rmRenderSig();
+  const same = (el) => { try { return new URL(el.href, location.href).pathname === path; } catch (e) { return false; } };
+  const a = Array.from(document.querySelectorAll('a[href]')).find(same);
+  if (a) { a.click(); return 'click'; }
+  history.pushState({}, '', path);
+  window.dispatchEvent(new PopStateEvent('popstate', { state: {} }));
+  return 'history';
+}
+"""
+
+# "reload" when the marker is gone, "stale" when the render signature did not change
+_SOFT_NAV_CHECK_JS = """
+() => {
+  if (window.__rmSoftNav === undefined) return 'reload';
+  return window.__rmRenderSig() === window.__rmSoftNav ? 'stale' : 'soft';
+}
+"""
+
+MEMORY_METRICS = ("JSHeapUsedSize", "Nodes", "JSEventListeners", "Documents")
+
+
+def soft_navigate(page, path: str, settle_ms: int = 500, timeout_ms: int = 10_000,
+                  ready: Optional[str] = None) -> str:
+    """
+    SPA navigation to `path`. Returns "soft" when the route rendered in place, "reload" when the
+    page did a full reload instead, "stale" when the router ignored it (title and main content
+    unchanged, or the `ready` selector never became visible).
+    """
+    page.evaluate(SOFT_NAV_JS, path)
+    with contextlib.suppress(Exception):
+        page.wait_for_url(f"**{path}*", timeout=timeout_ms)
+    with contextlib.suppress(Exception):
+        page.wait_for_load_state("networkidle", timeout=timeout_ms)
+    with contextlib.suppress(Exception):
+        page.wait_for_timeout(settle_ms)
+    status = page.evaluate(_SOFT_NAV_CHECK_JS)
+    if ready and status != "reload":
+        try:
+            page.locator(ready).first.wait_for(state="visible", timeout=timeout_ms)
+            status = "soft"
+        except Exception:
+            status = "stale"
+    return status
+
+
+def memory_sample(cdp, gc: bool = True) -> Dict[str, float]:
+    """Post-GC `Performance.getMetrics` values (needs `Performance.enable` on the session)."""
+    if gc:
+        # Twice: the first pass can leave objects that only become collectable afterwards
+        cdp.send("HeapProfiler.collectGarbage")
+        cdp.send("HeapProfiler.collectGarbage")
+    metrics = {m["name"]: m["value"] for m in (cdp.send("Performance.getMetrics") or {}).get("metrics", [])}
+    return {k: metrics[k] for k in MEMORY_METRICS if k in metrics}
+
+
+def slope(values: List[float]) -> Optional[float]:
+    """Least-squares growth per step of an evenly spaced series."""
+    n = len(values)
+    if n < 2:
+        return None
+    mx = (n - 1) / 2
+    my = sum(values) / n
+    den = sum((i - mx) ** 2 for i in range(n))
+    return sum((i - mx) * (v - my) for i, v in enumerate(values)) / den
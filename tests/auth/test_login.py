@@ -1,8 +1,9 @@
 # tests/auth/test_login.py
 import contextlib
+import json
 import pytest
 from pages.auth.login_page import LoginPage
-from pages.common_helpers import ResponseLike as LoginResult
+from pages.common_helpers import ResponseLike as LoginResult, phase_durations
 
 from tests._helpers.auth import LOGIN_URL_RE, has_error, auth_state_ok
 
@@ -14,13 +15,15 @@ def _login_page(page, base_url, auth_paths) -> LoginPage:
 @pytest.mark.auth
 @pytest.mark.smoke
 @pytest.mark.tc(id="RM-LOGIN-001", title="Login with valid credentials", area="Auth", severity="High")
-def test_login_success(new_page, site, base_url, auth_paths, credentials):
+def test_login_success(new_page, site, base_url, auth_paths, credentials, record_property):
     if not (credentials.get("email") and credentials.get("password")):
         pytest.skip("Missing E2E_EMAIL/E2E_PASSWORD; skipping login_success")
 
     login: LoginPage = _login_page(new_page, base_url, auth_paths)
     login.goto()
     resp: LoginResult = login.login(credentials["email"], credentials["password"])
+    # Phase durations (ms) end up as a JUnit property for latency tracking
+    record_property("login_phases", json.dumps(phase_durations(getattr(resp, "phases", None) or [])))
 
     if LOGIN_URL_RE.search(new_page.url):
         with contextlib.suppress(Exception):
@@ -6,6 +6,10 @@ pytest_plugins = [
     "tests._fixtures.config",
     "tests._fixtures.playwright",
     "tests._fixtures.roles",
+    "tests._fixtures.traffic",
+    "tests._fixtures.spans",
+    "tests._fixtures.waterfall",
+    "tests._fixtures.timing",
 ]
 
 
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[2]
+
+
+def _chromium_installed() -> bool:
+    try:
+        from playwright.sync_api import sync_playwright
+
+        with sync_playwright() as pw:
+            return Path(pw.chromium.executable_path).exists()
+    except Exception:
+        return False
+
+
+@pytest.mark.perf
+def test_load_runner_against_standin(tmp_path):
+    """
+    Fully local load run: tools/load_runner.py against the stand-in server with the generic LoginPage
+    (no site-specific page objects), two users sharing one shard's driver. A deadlock in the driver
+    bridge shows up as a timeout here rather than a hung CI job.
+    """
+    if not _chromium_installed():
+        pytest.skip("Chromium not installed (python -m playwright install chromium)")
+    out = tmp_path / "load.json"
+    cmd = [sys.executable, str(ROOT / "tools" / "load_runner.py"), "--standin", "--site", "standin",
+           "--flow", "login", "--users", "2", "--shards", "1", "--ramp-up", "0", "--duration", "60",
+           "--iterations", "1", "--routes", "/en/store", "--out", str(out)]
+    try:
+        proc = subprocess.run(cmd, cwd=ROOT, capture_output=True, text=True, timeout=180)
+    except subprocess.TimeoutExpired:
+        pytest.fail("load runner did not finish within 180s (driver bridge deadlock?)")
+    assert proc.returncode == 0, f"exit {proc.returncode}\n{proc.stdout[-2000:]}\n{proc.stderr[-2000:]}"
+
+    report = json.loads(out.read_text(encoding="utf-8"))
+    assert report["iterations"] == 2
+    assert not report["errors"], report["errors"]
+    for step in ("open_login", "login", "visit /en/store"):
+        assert report["steps"][step]["count"] == 2, step
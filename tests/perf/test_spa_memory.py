@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+import contextlib
+import json
+import os
+import re
+import statistics
+
+import pytest
+
+from pages.auth.login_page import LoginPage
+from tests._helpers.perf import memory_sample, slope, soft_navigate
+
+MEMORY_ENABLED = (os.getenv("E2E_MEMORY") or "").strip().lower() in ("1", "true", "yes", "on")
+WARMUP = max(0, int(os.getenv("E2E_MEMORY_WARMUP", "2")))
+# At least three post-warm-up cycles, or the slope has nothing to fit
+CYCLES = max(WARMUP + 3, int(os.getenv("E2E_MEMORY_CYCLES", "10")))
+TIMEOUT_MS = int(os.getenv("NAV_TIMEOUT_MS", "60000"))
+
+# Per-cycle growth allowed when the site config has no `memory_budget`
+DEFAULT_BUDGET = {"heap_slope_kb": 512, "nodes_slope": 200, "listeners_slope": 50}
+
+
+def _norm(p: str) -> str:
+    s = (p or "").strip()
+    if s and not s.startswith("/"):
+        s = "/" + s
+    return re.sub(r"/+$", "", s)
+
+
+@pytest.mark.perf
+@pytest.mark.skipif(not MEMORY_ENABLED, reason="SPA memory sampling is opt-in (set E2E_MEMORY=1)")
+def test_spa_memory_growth(browser, browser_name, browser_context_args, base_url, credentials, auth_paths,
+                           protected_routes, memory_budget, record_property):
+    """
+    Cycle through the protected routes E2E_MEMORY_CYCLES times in one page using SPA navigation,
+    sample JS heap / DOM nodes / listeners after a forced GC on every route of every cycle, and
+    fail when the per-cycle growth exceeds `memory_budget` (heap_slope_kb, nodes_slope,
+    listeners_slope). Growth is the least-squares slope of each route's samples after
+    E2E_MEMORY_WARMUP cycles, taken as the median over routes.
+    """
+    if browser_name != "chromium":
+        pytest.skip("CDP heap sampling is Chromium-only")
+    email, password = credentials.get("email", ""), credentials.get("password", "")
+    if not email or not password:
+        pytest.skip("Missing E2E_EMAIL/E2E_PASSWORD; protected routes need a session")
+    routes = [r for r in dict.fromkeys(_norm(p) for p in protected_routes) if r]
+    if len(routes) < 2:
+        pytest.skip("need at least two protected routes to cycle through")
+
+    budget = {**DEFAULT_BUDGET, **(memory_budget or {})}
+    if os.getenv("E2E_MEMORY_SLOPE_KB"):
+        budget["heap_slope_kb"] = float(os.environ["E2E_MEMORY_SLOPE_KB"])
+
+    ctx = browser.new_context(**browser_context_args)
+    try:
+        page = ctx.new_page()
+        page.set_default_timeout(30_000)
+        lp = LoginPage(page, base_url, auth_paths["login"])
+        lp.goto()
+        lp.login(email, password)
+        with contextlib.suppress(Exception):
+            page.wait_for_load_state("domcontentloaded", timeout=8_000)
+        page.goto(f"{base_url}{routes[0]}", wait_until="domcontentloaded", timeout=TIMEOUT_MS)
+        with contextlib.suppress(Exception):
+            page.wait_for_load_state("networkidle", timeout=10_000)
+
+        cdp = ctx.new_cdp_session(page)
+        cdp.send("Performance.enable")
+        samples: dict[str, list] = {path: [] for path in routes}  # route -> one sample per cycle
+        reloads = 0
+        for _ in range(CYCLES):
+            for path in routes[1:] + routes[:1]:
+                status = soft_navigate(page, path)
+                if status == "stale":
+                    # Sampling the previous route over and over would measure nothing
+                    pytest.skip(f"router did not react: soft navigation to {path} left the title and "
+                                f"main content unchanged")
+                if status == "reload":
+                    reloads += 1
+                samples[path].append(memory_sample(cdp))
+    finally:
+        with contextlib.suppress(Exception):
+            ctx.close()
+
+    def growth(metric: str) -> float:
+        # Same route, same DOM each cycle: only a leak makes its post-GC figures climb
+        slopes = [slope([s.get(metric, 0.0) for s in per_route[WARMUP:]]) for per_route in samples.values()]
+        return statistics.median([v for v in slopes if v is not None] or [0.0])
+
+    measured = {
+        "heap_slope_kb": growth("JSHeapUsedSize") / 1024,
+        "nodes_slope": growth("Nodes"),
+        "listeners_slope": growth("JSEventListeners"),
+    }
+    record_property("memory", json.dumps({"routes": routes, "cycles": CYCLES, "warmup": WARMUP,
+                                          "full_reloads": reloads, "slopes": measured, "budget": budget,
+                                          "samples": samples}))
+    if reloads:
+        # A full reload resets the heap and would hide a leak
+        pytest.fail(f"{reloads} route change(s) reloaded the page; soft navigation did not stay in the SPA")
+
+    over = [f"{k} {measured[k]:.1f} > {budget[k]:g}" for k in measured
+            if isinstance(budget.get(k), (int, float)) and measured[k] > budget[k]]
+    heap_mb = ", ".join(f"{s.get('JSHeapUsedSize', 0) / 1048576:.1f}" for s in samples[routes[0]])
+    assert not over, (f"memory grows per route cycle: {'; '.join(over)} "
+                      f"(post-GC heap MB per cycle on {routes[0]}: {heap_mb})")
@@ -5,7 +5,9 @@ from typing import List, Tuple
 import yaml
 import pytest
 import contextlib
+import json
 from pages.auth.login_page import LoginPage
+from tests._helpers.perf import VITALS_INIT_JS, budget_for, check_budget, collect_vitals, median_metrics
 
 # ===== helpers =====
 def _norm(p: str) -> str:
@@ -64,6 +66,8 @@ def _is_login_like(page) -> bool:
 
 # ===== config =====
 TIMEOUT_MS = int(os.getenv("NAV_TIMEOUT_MS", "60000"))
+PERF_ENABLED = (os.getenv("E2E_PERF") or "").strip().lower() in ("1", "true", "yes", "on")
+PERF_SAMPLES = max(1, int(os.getenv("E2E_PERF_SAMPLES", "3")))
 
 # login paths, accept many variants
 _LOGIN_PATHS_RAW = [
@@ -251,3 +255,52 @@ def test_routes_access(new_page, base_url, case):
 
     # Note: Additional assertions may be added per-site if needed
 
+
+
+@pytest.mark.perf
+@pytest.mark.skipif(not PERF_ENABLED, reason="perf budgets are opt-in (set E2E_PERF=1)")
+@pytest.mark.parametrize("case", CASES, ids=lambda c: f"{c['kind']}:{c['path']}")
+def test_routes_perf_budget(browser, browser_context_args, base_url, credentials, auth_paths, perf_budgets,
+                            record_property, case):
+    """
+    Load the route E2E_PERF_SAMPLES times (fresh context each, so every sample is a cold load)
+    and compare the median LCP / CLS / long tasks / navigation timing with `perf_budgets`.
+    Protected routes are measured logged in.
+    """
+    path = _norm(case["path"]) or "/"
+    budget = budget_for(path, perf_budgets)
+    if not budget:
+        pytest.skip(f"no perf budget for {path}")
+
+    storage_state = None
+    if case["kind"] == "protected":
+        email, password = credentials.get("email", ""), credentials.get("password", "")
+        if not email or not password:
+            pytest.skip("Missing E2E_EMAIL/E2E_PASSWORD; protected routes are measured logged in")
+        ctx = browser.new_context(**browser_context_args)
+        try:
+            page = ctx.new_page()
+            lp = LoginPage(page, base_url, auth_paths["login"])
+            lp.goto()
+            lp.login(email, password)
+            with contextlib.suppress(Exception):
+                page.wait_for_load_state("domcontentloaded", timeout=8_000)
+            storage_state = ctx.storage_state()
+        finally:
+            ctx.close()
+
+    samples = []
+    for _ in range(PERF_SAMPLES):
+        ctx = browser.new_context(**{**browser_context_args, "storage_state": storage_state})
+        try:
+            ctx.add_init_script(VITALS_INIT_JS)
+            page = ctx.new_page()
+            page.goto(f"{base_url}{path}", wait_until="domcontentloaded", timeout=TIMEOUT_MS)
+            samples.append(collect_vitals(page, timeout_ms=TIMEOUT_MS))
+        finally:
+            ctx.close()
+
+    measured = median_metrics(samples)
+    record_property("perf", json.dumps({"path": path, "median": measured, "budget": budget}))
+    violations = check_budget(measured, budget, samples)
+    assert not violations, f"perf budget exceeded for {path} (median of {len(samples)}): " + "; ".join(violations)
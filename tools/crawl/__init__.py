@@ -0,0 +1 @@
+"""Building blocks for tools/discover_routes.py (crawl engine, URL helpers)."""
@@ -0,0 +1,744 @@
+# -*- coding: utf-8 -*-
+"""
+Concurrent BFS crawl engine used by tools/discover_routes.py.
+
+N pages (spread over one or more browser contexts) pull from a shared frontier.
+Requests to the same host are throttled by `HostPoliteness` (max in-flight +
+min delay between navigations). Classification matches the historical
+single-page crawler: 401/403 or a redirect to a login-like path => protected.
+
+With `state_path` set, the frontier, finished pages (classification, outlinks,
+response hash/ETag) are checkpointed to disk so a crawl can be resumed. In
+incremental mode, pages known from the last crawl are first re-validated with a
+plain HTTP request (If-None-Match / If-Modified-Since, then body hash) from a
+standalone request context; Chromium is only launched (and the login run) when
+some page changed or is new, and only those pages are re-rendered.
+
+Parameterised routes (`/product/1`, `/product/2`, ...) are grouped by
+`TemplateIndex`: only `template_max_crawl` instances per template are crawled
+and the result keeps `template_samples` of them plus the template itself.
+
+Public pages are fingerprinted with a DOM SimHash; a page within
+`dedupe_threshold` bits of an already-seen page is recorded as
+`duplicate_of` that page and its outlinks are not expanded. Fingerprints are
+taken after the load event plus a short network settle, pages with too little
+rendered content (an SPA shell) are not fingerprinted at all, and a page's
+fingerprint is reserved as soon as it is computed so concurrent visits see it.
+
+Before crawling, routes found statically (JS bundle route tables, sitemap.xml,
+robots.txt; see tools/crawl/seeds.py) prefill the frontier. Links are read
+with a single evaluate per page from the harvester installed as an init script
+(tools/crawl/harvest.py), which also records pushState/replaceState targets.
+With click_explore="auto", nav items are only probed (clicked in-page, history
+suppressed) when static seeding found nothing.
+
+With dual_identity, every route is opened by an anonymous and an
+authenticated page side by side; `classify_dual` compares final URL, status
+and content fingerprint to label it public / protected / role_restricted and
+keeps that evidence. Slow navigations are retried with a longer timeout
+instead of being taken as "protected".
+"""
+
+from __future__ import annotations
+import asyncio
+import contextlib
+import hashlib
+import re
+import sys
+import time
+import urllib.parse as up
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Optional, Pattern
+
+from playwright.async_api import async_playwright
+
+from tools.crawl.frontier import Frontier, canonical_path
+from tools.crawl.harvest import HARVEST_INIT_JS, HARVEST_JS
+from tools.crawl.metrics import METRICS_INIT_JS, METRICS_JS
+from tools.crawl.seeds import collect_seeds
+from tools.crawl.simhash import FINGERPRINT_JS, SimhashIndex, fingerprintable, hamming, page_features, simhash
+from tools.crawl.state import CrawlState, PageRecord, PageStore, load_state, save_state
+from tools.crawl.templates import TemplateIndex
+from tools.crawl.urls import LOGIN_PATH_RE, internal_path, norm_path
+from tools.crawl.visited import VisitedSet, approx_bytes
+
+
+@dataclass
+class CrawlConfig:
+    base_url: str
+    start: str
+    max_pages: int = 80
+    max_depth: int = 2
+    allow_re: Optional[Pattern] = None
+    ignore_re: Optional[Pattern] = None
+    nav_selectors: list[str] = field(default_factory=list)
+    concurrency: int = 4
+    contexts: int = 1
+    host_max_inflight: int = 4
+    host_min_delay_ms: int = 0
+    nav_timeout_ms: int = 12_000
+    settle_ms: int = 1500  # max wait for network idle after `load` before fingerprinting
+    login: bool = False
+    login_path: Optional[str] = None
+    email: Optional[str] = None
+    password: Optional[str] = None
+    screenshot_dir: Optional[Path] = None
+    progress_every_s: float = 2.0
+    state_path: Optional[Path] = None
+    checkpoint_every_s: float = 30.0
+    resume: bool = False
+    incremental: bool = False
+    template_samples: int = 3
+    template_max_crawl: int = 5
+    dedupe_threshold: Optional[int] = 3  # None disables near-duplicate detection
+    static_seeds: bool = True
+    click_explore: str = "auto"  # auto | always | never
+    dual_identity: bool = False
+    prefix_budgets: dict[str, int] = field(default_factory=dict)  # {"/en/product": 50}
+    locales: list[str] = field(default_factory=list)  # ["en", "vi"]: /en/x and /x are one frontier entry
+    visited_backend: str = "memory"  # memory | bloom | bloom+sqlite (see visited.py)
+    visited_fp_rate: float = 0.001
+    visited_capacity: int = 10000  # initial Bloom capacity; grows as needed
+    visited_path: Optional[Path] = None  # SQLite spill file prefix for bloom+sqlite
+    metrics: bool = True  # navigation timing / bytes / requests / JS heap per route
+
+
+@dataclass
+class CrawlResult:
+    public: set[str] = field(default_factory=set)
+    protected: set[str] = field(default_factory=set)
+    role_restricted: set[str] = field(default_factory=set)
+    unreachable: set[str] = field(default_factory=set)
+    evidence: dict[str, dict] = field(default_factory=dict)
+    visited: int = 0
+    elapsed_s: float = 0.0
+    logged_in: bool = False
+    unchanged: int = 0  # incremental: pages served from HTTP validation only
+    templates: dict = field(default_factory=dict)
+    duplicates: dict[str, str] = field(default_factory=dict)
+    sources: dict[str, list[str]] = field(default_factory=dict)
+    frontier: dict = field(default_factory=dict)  # queued / deduped / over_budget counters
+    visited_set: dict = field(default_factory=dict)  # backend, items, memory_bytes, est_fp_rate
+    metrics: dict[str, dict] = field(default_factory=dict)  # path -> load metrics (see metrics.py)
+
+    @property
+    def pages_per_sec(self) -> float:
+        return self.visited / self.elapsed_s if self.elapsed_s > 0 else 0.0
+
+
+def _blocked(obs: dict) -> bool:
+    return obs.get("status") in (401, 403) or bool(obs.get("login"))
+
+
+def classify_dual(path: str, anon: dict, auth: dict, same_content_bits: int = 12) -> tuple[str, str]:
+    """Label a route from anonymous vs authenticated observations; return (kind, reason).
+
+    Each observation is {status, final_path, login, simhash} or {error}.
+    """
+    anon_err, auth_err = "error" in anon, "error" in auth
+    if anon_err and auth_err:
+        return "unreachable", "both identities failed to load"
+    if auth_err:
+        return ("public", "anonymous loads; authenticated failed") if not _blocked(anon) else (
+            "unreachable", "anonymous blocked; authenticated failed")
+    auth_ok = not _blocked(auth) and (auth.get("status") or 200) < 400
+    if anon_err:
+        return ("protected", "authenticated loads; anonymous failed") if auth_ok else (
+            "unreachable", "anonymous failed; authenticated blocked")
+    anon_ok = not _blocked(anon) and (anon.get("status") or 200) < 400
+    if not auth_ok:
+        if _blocked(auth) or auth.get("status") in (401, 403):
+            return "role_restricted", f"authenticated blocked (status={auth.get('status')}, final={auth.get('final_path')})"
+        return "unreachable", f"authenticated status {auth.get('status')}"
+    if not anon_ok:
+        return "protected", f"anonymous blocked (status={anon.get('status')}, final={anon.get('final_path')})"
+    # Both load. An anonymous redirect away from the route (e.g. to a landing page) still means gated.
+    if anon.get("final_path") != auth.get("final_path") and auth.get("final_path") == path.split("?", 1)[0]:
+        return "protected", f"anonymous redirected to {anon.get('final_path')}"
+    if anon.get("simhash") and auth.get("simhash"):
+        bits = hamming(int(anon["simhash"], 16), int(auth["simhash"], 16))
+        if bits > same_content_bits:
+            return "public", f"both load; content differs by {bits} bits (personalised)"
+    return "public", "both identities load the same page"
+
+
+class HostPoliteness:
+    """Per-host cap on concurrent navigations plus a minimum delay between them."""
+
+    def __init__(self, max_inflight: int = 4, min_delay_ms: int = 0):
+        self.max_inflight = max(1, int(max_inflight))
+        self.min_delay_s = max(0, int(min_delay_ms)) / 1000.0
+        self._sems: dict[str, asyncio.Semaphore] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._last: dict[str, float] = {}
+
+    @contextlib.asynccontextmanager
+    async def slot(self, url: str):
+        host = up.urlparse(url).netloc.lower()
+        sem = self._sems.setdefault(host, asyncio.Semaphore(self.max_inflight))
+        async with sem:
+            if self.min_delay_s:
+                lock = self._locks.setdefault(host, asyncio.Lock())
+                async with lock:
+                    loop = asyncio.get_running_loop()
+                    wait = self._last.get(host, 0.0) + self.min_delay_s - loop.time()
+                    if wait > 0:
+                        await asyncio.sleep(wait)
+                    self._last[host] = loop.time()
+            yield
+
+
+async def try_login(page, base_url: str, login_path: str | None, email: str | None, password: str | None) -> bool:
+    if not (email and password):
+        return False
+    # Heuristics for login form
+    try:
+        if login_path:
+            await page.goto(f"{base_url}{norm_path(login_path)}", wait_until="domcontentloaded", timeout=12_000)
+        user = page.locator("input[type='email'], input[name*='user' i], input[id*='user' i], input[name*='account' i]").first
+        pwd = page.locator("input[type='password']").first
+        if await user.count() == 0 or await pwd.count() == 0:
+            return False
+        await user.fill(email)
+        await pwd.fill(password)
+        submit = page.get_by_role("button", name=re.compile(r"(login|log\s*in|sign\s*in|continue|submit)", re.I)).first
+        if await submit.count() == 0:
+            submit = page.locator("button[type='submit'], input[type='submit']").first
+        if await submit.count():
+            await submit.click()
+        await page.wait_for_load_state("domcontentloaded", timeout=10_000)
+        # If we are not at login page anymore assume success
+        return not LOGIN_PATH_RE.search(up.urlparse(page.url).path)
+    except Exception:
+        return False
+
+
+class Crawler:
+    """Shared-frontier crawler; call `run()` (blocking) or `await crawl()`."""
+
+    def __init__(self, cfg: CrawlConfig):
+        self.cfg = cfg
+        self.result = CrawlResult()
+        self.visited = self._visited_set("visited")
+        seen = self._visited_set("frontier") if cfg.visited_backend != "memory" else None
+        self.queue = Frontier(cfg.prefix_budgets, cfg.locales, seen_set=seen)
+        self.politeness = HostPoliteness(cfg.host_max_inflight, cfg.host_min_delay_ms)
+        # With the SQLite-backed visited set, finished page records are kept on disk too
+        self.pages = PageStore(self._scratch_path("pages") if cfg.visited_backend == "bloom+sqlite" else None)
+        self.previous: dict[str, PageRecord] = {}
+        self.templates = TemplateIndex(cfg.template_samples, cfg.template_max_crawl,
+                                       seen_set=self._visited_set("templates"))
+        self.fingerprints = SimhashIndex(cfg.dedupe_threshold) if cfg.dedupe_threshold is not None else None
+        self._active: dict[str, int] = {}
+        self._capped: dict[str, int] = {}  # popped after max_pages was reached; kept for --resume
+        self._sources: dict[str, list[str]] = {}  # queued, claimed or reported paths only
+        self._click_nav = cfg.click_explore == "always"
+        self._inflight = 0
+        self._t0 = 0.0
+
+    def _scratch_path(self, name: str) -> Path:
+        base = self.cfg.visited_path or Path("report/discover/crawl")
+        return base.with_name(f"{base.name}.{name}.sqlite")
+
+    def _visited_set(self, name: str) -> VisitedSet:
+        cfg = self.cfg
+        return VisitedSet(cfg.visited_backend, cfg.visited_fp_rate, cfg.visited_capacity,
+                          sqlite_path=self._scratch_path(name))
+
+    def run(self) -> CrawlResult:
+        return asyncio.run(self.crawl())
+
+    # ----- frontier -----
+    def _accept(self, href: str | None) -> str | None:
+        pth = internal_path(href, self.cfg.base_url)
+        if not pth:
+            return None
+        pth = canonical_path(pth)
+        if self.cfg.ignore_re and self.cfg.ignore_re.search(pth):
+            return None
+        if self.cfg.allow_re and not self.cfg.allow_re.search(pth):
+            return None
+        return pth
+
+    def _note_source(self, path: str, source: str, new: bool = True) -> None:
+        """Record how `path` was found; with new=False only for paths already tracked."""
+        srcs = self._sources.setdefault(path, []) if new else self._sources.get(path)
+        if srcs is not None and source not in srcs:
+            srcs.append(source)
+
+    def _enqueue(self, hrefs, depth: int, source: str = "crawl", nav: Optional[set] = None) -> list[str]:
+        """Queue acceptable hrefs at `depth`; return the accepted paths (the page's outlinks)."""
+        links: list[str] = []
+        for href in hrefs or []:
+            pth = self._accept(href)
+            if not pth:
+                continue
+            links.append(pth)
+            # Sources only for paths that get queued (or already are known): links dropped by depth,
+            # template cap or budget would otherwise accumulate for the whole crawl
+            queued = False
+            if depth <= self.cfg.max_depth and pth not in self.visited:
+                # Known entries go straight to the frontier (it dedupes); new ones count against their template cap
+                if self.queue.seen(pth) or self.templates.admit(pth):
+                    queued = self.queue.push(pth, depth, nav=bool(nav and pth in nav))
+            self._note_source(pth, source, new=queued)
+        return links
+
+    def _claim(self, path: str, depth: int) -> bool:
+        if path in self.visited or depth > self.cfg.max_depth:
+            return False
+        if self.result.visited >= self.cfg.max_pages:
+            self._capped.setdefault(path, depth)
+            return False
+        self.visited.add(path)
+        self.result.visited += 1
+        return True
+
+    def _record(self, path: str, rec: PageRecord) -> None:
+        self.pages[path] = rec
+        self.previous.pop(path, None)
+        if rec.duplicate_of:
+            self.result.duplicates[path] = rec.duplicate_of
+            return
+        if rec.metrics:
+            self.result.metrics[path] = rec.metrics
+        if rec.evidence:
+            self.result.evidence[path] = rec.evidence
+        if rec.kind == "unreachable":
+            self.result.unreachable.add(path)
+            return
+        if rec.simhash and self.fingerprints is not None:
+            self.fingerprints.add(path, int(rec.simhash, 16))
+        self.templates.observe(path, rec.kind)
+        getattr(self.result, rec.kind, self.result.public).add(path)
+
+    # ----- page work -----
+    async def _settle(self, page) -> None:
+        """Let client-side rendering finish: `load`, then a bounded wait for network idle."""
+        with contextlib.suppress(Exception):
+            await page.wait_for_load_state("load", timeout=min(self.cfg.nav_timeout_ms, 5000))
+        if self.cfg.settle_ms > 0:
+            with contextlib.suppress(Exception):
+                await page.wait_for_load_state("networkidle", timeout=self.cfg.settle_ms)
+
+    async def _page_simhash(self, page) -> Optional[int]:
+        await self._settle(page)
+        with contextlib.suppress(Exception):
+            data = await page.evaluate(FINGERPRINT_JS) or {}
+            paths, text = data.get("paths") or [], data.get("text") or ""
+            # Unrendered shell (still loading / failed render): nothing to compare
+            if fingerprintable(paths, text):
+                return simhash(page_features(paths, text))
+        return None
+
+    async def _fingerprint(self, page, path: str, rec: PageRecord, h: Optional[int] = None) -> None:
+        """Set rec.simhash and, if a near-identical page was already seen, rec.duplicate_of."""
+        if self.fingerprints is None or rec.kind != "public":
+            return
+        h = h if h is not None else await self._page_simhash(page)
+        if h is None:
+            return
+        rec.simhash = f"{h:016x}"
+        dup = self.fingerprints.find(h)
+        if dup and dup != path:
+            rec.duplicate_of = dup
+        else:
+            # Reserve now, not in _record: near-duplicates being visited concurrently must see it
+            self.fingerprints.add(path, h)
+
+    async def _collect_metrics(self, page, rec: PageRecord) -> None:
+        if not self.cfg.metrics:
+            return
+        with contextlib.suppress(Exception):
+            # Link extraction usually outlasts the load event; don't hold the crawl up for slow ones
+            await page.wait_for_load_state("load", timeout=min(self.cfg.nav_timeout_ms, 5000))
+        with contextlib.suppress(Exception):
+            rec.metrics = {"status": rec.status, **(await page.evaluate(METRICS_JS) or {})}
+
+    async def _extract_links(self, page, depth: int) -> list[str]:
+        """One evaluate: link attributes + SPA navigations recorded by the harvester init script."""
+        data = await page.evaluate(HARVEST_JS, {
+            "selectors": self.cfg.nav_selectors,
+            "probe": self._click_nav,
+            "limit": 20,
+        }) or {}
+        nav = {p for p in map(self._accept, data.get("nav") or []) if p}
+        links = self._enqueue(data.get("links"), depth + 1, nav=nav)
+        links += self._enqueue(data.get("history"), depth + 1, source="history")
+        return list(dict.fromkeys(links))
+
+    async def _visit(self, page, path: str, depth: int) -> None:
+        url = f"{self.cfg.base_url}{path}"
+        self._inflight += 1
+        try:
+            async with self.politeness.slot(url):
+                resp = await page.goto(url, wait_until="domcontentloaded", timeout=self.cfg.nav_timeout_ms)
+            status = resp.status if resp else None
+            final_path = up.urlparse(page.url).path or "/"
+            protected = status in (401, 403) or bool(LOGIN_PATH_RE.search(final_path))
+            rec = PageRecord(kind="protected" if protected else "public", depth=depth, status=status,
+                             final_path=final_path)
+            if resp is not None:
+                headers = resp.headers or {}
+                rec.etag = headers.get("etag") or None
+                rec.last_modified = headers.get("last-modified") or None
+                with contextlib.suppress(Exception):
+                    rec.sha256 = hashlib.sha256(await resp.body()).hexdigest()
+            await self._fingerprint(page, path, rec)
+            if not rec.duplicate_of:
+                rec.links = await self._extract_links(page, depth)
+            await self._collect_metrics(page, rec)
+            self._record(path, rec)
+        except Exception:
+            # On navigation error consider path protected (may require auth) and continue
+            if self.fingerprints is not None:
+                self.fingerprints.discard(path)
+            self._record(path, PageRecord(kind="protected", depth=depth))
+            if self.cfg.screenshot_dir:
+                safe = path.strip("/").replace("/", "_") or "home"
+                with contextlib.suppress(Exception):
+                    await page.screenshot(path=str(self.cfg.screenshot_dir / f"err_{safe}.png"))
+        finally:
+            self._inflight -= 1
+
+    async def _observe(self, page, url: str) -> tuple[dict, object]:
+        """Navigate and describe where we landed; one retry with a doubled timeout."""
+        obs: dict = {}
+        for timeout in (self.cfg.nav_timeout_ms, self.cfg.nav_timeout_ms * 2):
+            try:
+                async with self.politeness.slot(url):
+                    resp = await page.goto(url, wait_until="domcontentloaded", timeout=timeout)
+                final_path = up.urlparse(page.url).path or "/"
+                obs = {
+                    "status": resp.status if resp else None,
+                    "final_path": final_path,
+                    "login": bool(LOGIN_PATH_RE.search(final_path)),
+                }
+                h = await self._page_simhash(page)
+                if h is not None:
+                    obs["simhash"] = f"{h:016x}"
+                return obs, resp
+            except Exception as e:
+                obs = {"error": f"{type(e).__name__}: {str(e).splitlines()[0][:160] if str(e) else ''}"}
+        return obs, None
+
+    async def _visit_dual(self, page, anon, path: str, depth: int) -> None:
+        url = f"{self.cfg.base_url}{path}"
+        self._inflight += 1
+        try:
+            (auth_obs, resp), (anon_obs, _) = await asyncio.gather(self._observe(page, url), self._observe(anon, url))
+            kind, reason = classify_dual(path, anon_obs, auth_obs)
+            rec = PageRecord(kind=kind, depth=depth, status=auth_obs.get("status"),
+                             final_path=auth_obs.get("final_path"),
+                             evidence={"verdict": kind, "reason": reason, "anon": anon_obs, "auth": auth_obs})
+            if resp is not None:
+                headers = resp.headers or {}
+                rec.etag = headers.get("etag") or None
+                rec.last_modified = headers.get("last-modified") or None
+                with contextlib.suppress(Exception):
+                    rec.sha256 = hashlib.sha256(await resp.body()).hexdigest()
+            h = int(auth_obs["simhash"], 16) if auth_obs.get("simhash") else None
+            await self._fingerprint(page, path, rec, h)
+            if kind != "unreachable" and not rec.duplicate_of:
+                # Harvest from whichever identity actually rendered the route
+                source_page = page if "error" not in auth_obs and not _blocked(auth_obs) else anon
+                with contextlib.suppress(Exception):
+                    rec.links = await self._extract_links(source_page, depth)
+            if "error" not in auth_obs:
+                await self._collect_metrics(page, rec)
+            self._record(path, rec)
+        finally:
+            self._inflight -= 1
+
+    async def _revalidate(self, request, path: str, depth: int, prev: PageRecord) -> bool:
+        """Incremental mode: True if `path` is unchanged since the last crawl (no browser render)."""
+        headers = {}
+        if prev.etag:
+            headers["If-None-Match"] = prev.etag
+        if prev.last_modified:
+            headers["If-Modified-Since"] = prev.last_modified
+        url = f"{self.cfg.base_url}{path}"
+        try:
+            async with self.politeness.slot(url):
+                resp = await request.get(url, headers=headers, timeout=self.cfg.nav_timeout_ms)
+            if resp.status == 304:
+                unchanged = True
+            else:
+                final_path = (up.urlparse(resp.url).path or "/") if resp.url else prev.final_path
+                unchanged = (
+                    resp.status == prev.status
+                    and final_path == prev.final_path
+                    and prev.sha256 is not None
+                    and hashlib.sha256(await resp.body()).hexdigest() == prev.sha256
+                )
+        except Exception:
+            return False
+        if not unchanged:
+            return False
+        prev.depth = depth
+        if prev.duplicate_of and prev.duplicate_of not in self.pages:
+            return False  # its original has not been seen in this crawl yet; render again
+        self._record(path, prev)
+        self.result.unchanged += 1
+        self._enqueue(prev.links, depth + 1)
+        return True
+
+    async def _prevalidate(self, request) -> int:
+        """
+        Incremental mode, before any browser exists: drain the frontier through `_revalidate`
+        with a standalone request context. Unchanged pages are recorded and their stored links
+        followed; changed, new or unconfirmable pages are put back for the browser workers.
+        Returns how many were put back.
+        """
+        cfg = self.cfg
+        deferred: list[tuple[str, int]] = []
+        while not self.queue.empty():
+            path, depth = await self.queue.get()
+            try:
+                if path in self.visited or depth > cfg.max_depth:
+                    continue
+                if self.result.visited >= cfg.max_pages:
+                    self._claim(path, depth)  # records it as capped
+                    continue
+                prev = self.previous.get(path)
+                if prev and await self._revalidate(request, path, depth, prev):
+                    self._claim(path, depth)
+                else:
+                    deferred.append((path, depth))
+            finally:
+                self.queue.task_done()
+        for path, depth in deferred:
+            self.queue.requeue(path, depth)
+        return len(deferred)
+
+    async def _worker(self, page, anon=None) -> None:
+        while True:
+            path, depth = await self.queue.get()
+            try:
+                if self._claim(path, depth):
+                    self._active[path] = depth
+                    try:
+                        prev = self.previous.get(path) if self.cfg.incremental else None
+                        if prev and await self._revalidate(page.context.request, path, depth, prev):
+                            pass
+                        elif anon is not None:
+                            await self._visit_dual(page, anon, path, depth)
+                        else:
+                            await self._visit(page, path, depth)
+                    except Exception as e:
+                        # One broken page must not take the worker down (queue.join() would never return)
+                        reason = f"{type(e).__name__}: {e}"[:300]
+                        print(f"[discover] WARN: {path}: {reason}", file=sys.stderr)
+                        self._record(path, PageRecord(kind="unreachable", depth=depth,
+                                                      evidence={"verdict": "unreachable", "reason": reason}))
+                    finally:
+                        self._active.pop(path, None)
+            finally:
+                self.queue.task_done()
+
+    async def _seed(self, request) -> None:
+        """Prefill the frontier with statically extracted routes (fetched through `request`)."""
+        cfg = self.cfg
+
+        async def fetch(url: str):
+            with contextlib.suppress(Exception):
+                async with self.politeness.slot(url):
+                    resp = await request.get(url, timeout=cfg.nav_timeout_ms)
+                if resp.ok:
+                    return await resp.text()
+            return None
+
+        found = await collect_seeds(fetch, cfg.base_url, cfg.start)
+        seeded = 0
+        for route, srcs in found.items():
+            for src in srcs:
+                seeded += len(self._enqueue([route], 1, source=src))
+        if cfg.click_explore == "auto":
+            self._click_nav = seeded == 0
+        by_source: dict[str, int] = {}
+        for srcs in found.values():
+            for src in srcs:
+                kind = src.split(":", 1)[0]
+                by_source[kind] = by_source.get(kind, 0) + 1
+        summary = ", ".join(f"{k}={v}" for k, v in sorted(by_source.items())) or "none"
+        print(f"[discover] Static seeds: {seeded} routes ({summary}); "
+              f"click exploration {'on' if self._click_nav else 'off'}", file=sys.stderr)
+
+    # ----- checkpoints -----
+    def _snapshot(self, complete: bool = False) -> CrawlState:
+        queued = self.queue.pending()
+        frontier = [] if complete else [*self._active.items(), *self._capped.items(), *queued]
+        return CrawlState(
+            base_url=self.cfg.base_url,
+            start=self.cfg.start,
+            frontier=frontier,
+            pages=self.pages,
+            previous={} if complete else dict(self.previous),
+            complete=complete,
+        )
+
+    def _restore(self) -> None:
+        cfg = self.cfg
+        state = load_state(cfg.state_path) if cfg.state_path else None
+        if state and state.base_url != cfg.base_url:
+            print(f"[discover] WARN: state file is for {state.base_url}; starting fresh", file=sys.stderr)
+            state = None
+        if cfg.resume and state and not state.complete:
+            for path, rec in state.pages.items():
+                self.visited.add(path)
+                self.queue.mark_seen(path, rec.depth)
+                self.templates.admit(path)
+                self._record(path, rec)
+            self.result.visited = len(self.visited)
+            self.previous = dict(state.previous)
+            for item in state.frontier:
+                self.queue.put_nowait(item)
+            print(f"[discover] Resuming: {len(state.pages)} pages done, {len(state.frontier)} queued",
+                  file=sys.stderr)
+            return
+        if cfg.incremental and state:
+            # Finished crawl -> its pages; interrupted crawl -> whatever it had validated so far
+            self.previous = {**state.previous, **state.pages}
+            print(f"[discover] Incremental: {len(self.previous)} known pages to re-validate", file=sys.stderr)
+        self.queue.put_nowait((cfg.start, 0))
+
+    async def _checkpoint(self) -> None:
+        while True:
+            await asyncio.sleep(self.cfg.checkpoint_every_s)
+            with contextlib.suppress(Exception):
+                save_state(self.cfg.state_path, self._snapshot())
+
+    async def _progress(self) -> None:
+        while True:
+            await asyncio.sleep(self.cfg.progress_every_s)
+            elapsed = time.monotonic() - self._t0
+            rate = self.result.visited / elapsed if elapsed > 0 else 0.0
+            print(
+                f"[discover] {self.result.visited} pages | {rate:.2f} pages/s | "
+                f"queued {self.queue.qsize()} | in-flight {self._inflight} | unchanged {self.result.unchanged}",
+                file=sys.stderr,
+            )
+
+    # ----- lifecycle -----
+    async def _open_contexts(self, browser) -> list:
+        cfg = self.cfg
+        first = await browser.new_context()
+        await first.add_init_script(HARVEST_INIT_JS)
+        await first.add_init_script(METRICS_INIT_JS)
+        if cfg.login or LOGIN_PATH_RE.search(cfg.start):
+            page = await first.new_page()
+            self.result.logged_in = await try_login(page, cfg.base_url, cfg.login_path or cfg.start, cfg.email, cfg.password)
+            await page.close()
+        if self.result.logged_in:
+            print("[discover] Logged in successfully; will treat redirects to login as protected", file=sys.stderr)
+        contexts = [first]
+        # Extra contexts share the same identity (cookies/storage) as the first one
+        state = await first.storage_state() if self.result.logged_in else None
+        for _ in range(max(1, cfg.contexts) - 1):
+            ctx = await browser.new_context(storage_state=state)
+            await ctx.add_init_script(HARVEST_INIT_JS)
+            await ctx.add_init_script(METRICS_INIT_JS)
+            contexts.append(ctx)
+        return contexts
+
+    async def _crawl_browser(self, pw, seeded: bool = False) -> None:
+        cfg = self.cfg
+        browser = await pw.chromium.launch(headless=True)
+        try:
+            contexts = await self._open_contexts(browser)
+            n_pages = max(1, cfg.concurrency)
+            pages = [await contexts[i % len(contexts)].new_page() for i in range(n_pages)]
+            if cfg.static_seeds:
+                if not seeded:
+                    await self._seed(contexts[0].request)
+            elif cfg.click_explore == "auto":
+                self._click_nav = True
+            anon_pages = [None] * n_pages
+            if cfg.dual_identity:
+                if self.result.logged_in:
+                    anon_ctx = await browser.new_context()
+                    await anon_ctx.add_init_script(HARVEST_INIT_JS)
+                    anon_pages = [await anon_ctx.new_page() for _ in range(n_pages)]
+                else:
+                    print("[discover] WARN: --dual-identity needs a successful login; crawling with one identity",
+                          file=sys.stderr)
+            workers = [asyncio.create_task(self._worker(p, a)) for p, a in zip(pages, anon_pages)]
+            background = [asyncio.create_task(self._progress())]
+            if cfg.state_path:
+                background.append(asyncio.create_task(self._checkpoint()))
+            try:
+                await self.queue.join()
+            finally:
+                # Snapshot before cancelling: cancelled workers drop their in-flight paths from _active
+                # Complete only when the frontier drained and max_pages cut nothing off
+                state = self._snapshot(complete=self.queue.empty() and not self._capped and not self._active)
+                for t in (*workers, *background):
+                    t.cancel()
+                await asyncio.gather(*workers, *background, return_exceptions=True)
+                if cfg.state_path:
+                    save_state(cfg.state_path, state)
+        finally:
+            await browser.close()
+
+    async def crawl(self) -> CrawlResult:
+        cfg = self.cfg
+        self._t0 = time.monotonic()
+        async with async_playwright() as pw:
+            self._restore()
+            self._note_source(canonical_path(cfg.start), "start")
+            seeded = changed = False
+            if cfg.incremental and self.previous:
+                # Plain HTTP first: the browser (and the login) is only needed for pages that changed
+                request = await pw.request.new_context()
+                try:
+                    if cfg.static_seeds:
+                        await self._seed(request)
+                        seeded = True
+                    changed = await self._prevalidate(request) > 0
+                finally:
+                    await request.dispose()
+                print(f"[discover] Incremental: {self.result.unchanged} unchanged over HTTP, "
+                      f"{self.queue.qsize()} to render", file=sys.stderr)
+                if not changed:
+                    print("[discover] Incremental: nothing changed since the last crawl; browser not started",
+                          file=sys.stderr)
+                    if cfg.state_path:
+                        save_state(cfg.state_path, self._snapshot(complete=not self._capped))
+            if changed or not (cfg.incremental and self.previous):
+                await self._crawl_browser(pw, seeded)
+        self.result.elapsed_s = time.monotonic() - self._t0
+        self.result.frontier = self.queue.stats()
+        self.result.visited_set = self.visited.stats()
+        if self.queue.seen_set is not None:
+            fs = self.queue.seen_set.stats()
+            self.result.visited_set["frontier_memory_bytes"] = fs["memory_bytes"]
+            self.result.visited_set["frontier_est_fp_rate"] = fs["est_fp_rate"]
+            self.queue.seen_set.close()
+        self.visited.close()
+        self.result.visited_set.update(self.pages.stats())
+        self.pages.close()
+        # Everything else the crawl holds in RAM, so the reported figure is not just the compact sets
+        r = self.result
+        other = {
+            "frontier": self.queue.memory_bytes(),
+            "templates": self.templates.memory_bytes(),
+            "sources": approx_bytes(self._sources),
+            "capped": approx_bytes(self._capped),
+            "results": sum(approx_bytes(x) for x in (r.public, r.protected, r.role_restricted, r.unreachable,
+                                                      r.duplicates, r.evidence, r.metrics)),
+            "previous": approx_bytes({p: asdict(rec) for p, rec in self.previous.items()}),
+        }
+        r.visited_set["other_memory_bytes"] = sum(other.values())
+        r.visited_set["memory_breakdown"] = other
+        if isinstance(self.templates.seen_set, VisitedSet):
+            self.templates.seen_set.close()
+        # Parameterised routes are represented by their samples only
+        self.result.public = set(self.templates.collapse(self.result.public))
+        self.result.protected = set(self.templates.collapse(self.result.protected))
+        self.result.role_restricted = set(self.templates.collapse(self.result.role_restricted))
+        self.result.templates = self.templates.to_json()
+        reported = (self.result.public | self.result.protected | self.result.role_restricted
+                    | set(self.result.duplicates))
+        self.result.sources = {p: self._sources.get(p, ["crawl"]) for p in sorted(reported)}
+        return self.result
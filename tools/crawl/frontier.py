@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+"""
+Crawl frontier: canonicalise and dedupe at enqueue time, pop by priority.
+
+- `canonical_path` drops the fragment and tracking parameters (utm_*, gclid,
+  fbclid, ...), sorts the remaining query, squeezes `//` and strips the
+  trailing slash, so `/x`, `/x/`, `/x#top` and `/x?utm_source=a` are one entry.
+- `dedup_key` additionally removes a leading locale segment (`/en/x` ~ `/x`)
+  when that segment is one of the configured site locales; the first variant
+  seen is the one crawled. With no locales configured nothing is stripped, so
+  `/QR`, `/my/orders` or `/id/123` are never mistaken for locale prefixes.
+- Entries pop by (depth, nav prominence, arrival order): shallow pages first,
+  and at equal depth links found in navigation before body links.
+- Per-prefix budgets (`{"/en/product": 50}`, longest prefix wins) cap how many
+  paths under a prefix are ever queued.
+
+Each path is queued at most once (again only if later found at a smaller
+depth), so the queue never holds more than the number of distinct paths.
+With a compact `seen_set` (see visited.py) the seen keys live there instead of
+in a dict, and a path is never re-queued.
+"""
+
+from __future__ import annotations
+import asyncio
+import itertools
+import re
+import urllib.parse as up
+from typing import Iterable, Optional
+
+from tools.crawl.visited import approx_bytes
+
+TRACKING_PARAMS = {"gclid", "fbclid", "msclkid", "dclid", "yclid", "mc_cid", "mc_eid", "_ga", "_gl", "igshid"}
+
+
+def _is_tracking(key: str) -> bool:
+    k = key.lower()
+    return k.startswith("utm_") or k in TRACKING_PARAMS
+
+
+def canonical_path(path: str) -> str:
+    raw, _, query = (path or "/").split("#", 1)[0].partition("?")
+    raw = re.sub(r"/{2,}", "/", "/" + raw.lstrip("/"))
+    if len(raw) > 1:
+        raw = raw.rstrip("/") or "/"
+    params = [(k, v) for k, v in up.parse_qsl(query, keep_blank_values=True) if not _is_tracking(k)]
+    return f"{raw}?{up.urlencode(sorted(params))}" if params else raw
+
+
+def parse_locales(raw: Optional[str]) -> frozenset[str]:
+    """`"en, vi,zh-TW"` -> {"en", "vi", "zh-tw"} (lower-cased, blanks dropped)."""
+    return frozenset(c.strip().lower() for c in (raw or "").split(",") if c.strip())
+
+
+def dedup_key(path: str, locales: Iterable[str] = ()) -> str:
+    p = canonical_path(path)
+    if locales:
+        raw, sep, query = p.partition("?")
+        head, _, rest = raw[1:].partition("/")
+        if head.lower() in locales:
+            p = "/" + rest + (sep + query if sep else "")
+    return p
+
+
+def parse_budgets(specs: Iterable[str]) -> dict[str, int]:
+    """`["/en/product=50", ...]` -> {"/en/product": 50}."""
+    out: dict[str, int] = {}
+    for spec in specs or []:
+        prefix, sep, n = str(spec).rpartition("=")
+        if not sep or not prefix.startswith("/"):
+            raise ValueError(f"bad prefix budget {spec!r} (expected /prefix=N)")
+        out[canonical_path(prefix)] = int(n)
+    return out
+
+
+class Frontier:
+    """Priority frontier with an asyncio.Queue-like interface (get/task_done/join/qsize/empty)."""
+
+    def __init__(self, budgets: Optional[dict[str, int]] = None, locales: Iterable[str] = (), seen_set=None):
+        self.budgets = dict(budgets or {})
+        self.seen_set = seen_set
+        self.locales = frozenset(str(c).lower() for c in locales or ())
+        self._q: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        self._seq = itertools.count()
+        self._seen: dict[str, tuple[int, str]] = {}  # dedup key -> (smallest depth, path variant kept)
+        self._used: dict[str, int] = {}  # budget prefix -> paths admitted
+        self.pushed = 0
+        self.deduped = 0
+        self.over_budget: dict[str, int] = {}
+
+    def _prefix(self, path: str) -> Optional[str]:
+        best = None
+        for prefix in self.budgets:
+            if (path == prefix or path.startswith(prefix.rstrip("/") + "/")) and (best is None or len(prefix) > len(best)):
+                best = prefix
+        return best
+
+    def _count_budget(self, path: str, force: bool = False) -> bool:
+        """Charge `path` to its prefix budget; False (and counted as over budget) if exhausted."""
+        prefix = self._prefix(path)
+        if not prefix:
+            return True
+        if not force and self._used.get(prefix, 0) >= self.budgets[prefix]:
+            self.over_budget[prefix] = self.over_budget.get(prefix, 0) + 1
+            return False
+        self._used[prefix] = self._used.get(prefix, 0) + 1
+        return True
+
+    def seen(self, path: str) -> bool:
+        key = dedup_key(path, self.locales)
+        return key in (self.seen_set if self.seen_set is not None else self._seen)
+
+    def mark_seen(self, path: str, depth: int = 0) -> None:
+        """Register an already-crawled path (resume) so it is neither queued again nor over budget."""
+        path = canonical_path(path)
+        key = dedup_key(path, self.locales)
+        if self.seen_set is not None:
+            if key not in self.seen_set:
+                self._count_budget(path, force=True)
+                self.seen_set.add(key)
+            return
+        prev = self._seen.get(key)
+        if prev is None:
+            self._count_budget(path, force=True)
+            self._seen[key] = (depth, path)
+        elif depth < prev[0]:
+            self._seen[key] = (depth, prev[1])
+
+    def push(self, path: str, depth: int, nav: bool = False) -> bool:
+        """Queue `path` unless already seen (at this depth or shallower) or over its prefix budget."""
+        path = canonical_path(path)
+        key = dedup_key(path, self.locales)
+        if self.seen_set is not None:
+            if key in self.seen_set:
+                self.deduped += 1
+                return False
+            if not self._count_budget(path):
+                return False
+            self.seen_set.add(key)
+        else:
+            prev = self._seen.get(key)
+            if prev is not None:
+                if prev[0] <= depth:
+                    self.deduped += 1
+                    return False
+                path = prev[1]  # found again closer to the start: re-queue the variant already chosen
+            elif not self._count_budget(path):
+                return False
+            self._seen[key] = (depth, path)
+        self._q.put_nowait((depth, 0 if nav else 1, next(self._seq), path))
+        self.pushed += 1
+        return True
+
+    # asyncio.Queue-style interface used by the crawler workers
+    def put_nowait(self, item: tuple[str, int]) -> None:
+        self.push(*item)
+
+    def requeue(self, path: str, depth: int) -> None:
+        """Put back an entry that was already popped (no dedupe or budget check)."""
+        self._q.put_nowait((depth, 1, next(self._seq), path))
+
+    async def get(self) -> tuple[str, int]:
+        depth, _, _, path = await self._q.get()
+        return path, depth
+
+    def task_done(self) -> None:
+        self._q.task_done()
+
+    async def join(self) -> None:
+        await self._q.join()
+
+    def qsize(self) -> int:
+        return self._q.qsize()
+
+    def empty(self) -> bool:
+        return self._q.empty()
+
+    def pending(self) -> list[tuple[str, int]]:
+        """Queued entries in pop order, without draining (for checkpoints)."""
+        return [(path, depth) for depth, _, _, path in sorted(getattr(self._q, "_queue", ()))]
+
+    def memory_bytes(self) -> int:
+        """Queued entries plus the in-memory seen dict (a compact `seen_set` reports its own)."""
+        return approx_bytes(list(getattr(self._q, "_queue", ()))) + approx_bytes(self._seen)
+
+    def stats(self) -> dict:
+        return {
+            "queued": self.pushed,
+            "deduped": self.deduped,
+            "over_budget": dict(sorted(self.over_budget.items())),
+        }
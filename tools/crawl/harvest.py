@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""
+In-page link harvester for the discovery crawler.
+
+`HARVEST_INIT_JS` is installed with `context.add_init_script` and wraps
+`history.pushState`/`replaceState`/`window.open` plus popstate/hashchange, so
+every SPA navigation target the app produces is recorded in `window.__rmHarvest`.
+
+`HARVEST_JS` is then evaluated once per page. It returns every link-like
+attribute (href, routerLink, ion-* tab/url, data-href/link/route/url/path)
+together with the recorded navigation targets, and the subset found in
+navigation chrome (nav/header/aside/menus/tab bars or the nav selectors) so the
+frontier can prefer them. With `probe` on it also clicks
+up to `limit` items per nav selector *inside the page*: while probing, history
+updates are recorded but suppressed so the page stays where it is.
+"""
+
+from __future__ import annotations
+
+HARVEST_INIT_JS = """
+(() => {
+  if (window.__rmHarvest) return;
+  const seen = new Set();
+  const state = { probing: false };
+  const rec = (u) => { try { if (u !== undefined && u !== null && u !== '') seen.add(String(u)); } catch (e) {} };
+  for (const fn of ['pushState', 'replaceState']) {
+    const orig = history[fn];
+    history[fn] = function (data, title, url) {
+      rec(url);
+      if (state.probing) return;
+      return orig.apply(this, arguments);
+    };
+  }
+  const origOpen = window.open;
+  window.open = function (url) {
+    rec(url);
+    if (state.probing) return null;
+    return origOpen.apply(this, arguments);
+  };
+  window.addEventListener('popstate', () => rec(location.href));
+  window.addEventListener('hashchange', () => rec(location.href));
+  window.__rmHarvest = { seen, state };
+})();
+"""
+
+HARVEST_JS = """
+async ({ selectors, probe, limit }) => {
+  const H = window.__rmHarvest || { seen: new Set(), state: {} };
+  const links = new Set();
+  const nav = new Set();
+  const add = (v, isNav) => {
+    if (typeof v === 'string' && v.trim()) { links.add(v.trim()); if (isNav) nav.add(v.trim()); }
+  };
+  const NAV = 'nav, header, aside, [role="navigation"], [role="menu"], ion-menu, ion-tab-bar, ion-tabs';
+  const navEls = new Set();
+  for (const sel of selectors || []) {
+    try { document.querySelectorAll(sel).forEach((el) => navEls.add(el)); } catch (e) {}
+  }
+  const resolve = (v) => { try { return new URL(v, location.href).href; } catch (e) { return v; } };
+  const ATTRS = ['href', 'routerLink', 'routerlink', 'ng-reflect-router-link',
+                 'data-href', 'data-link', 'data-route', 'data-url', 'data-path'];
+  const SEL = 'a[href], [routerLink], [routerlink], [ng-reflect-router-link], [data-href], [data-link], '
+            + '[data-route], [data-url], [data-path], ion-router-link, ion-tab-button, ion-item[href], '
+            + 'ion-button[href], ion-route';
+  document.querySelectorAll(SEL).forEach((el) => {
+    const isNav = navEls.has(el) || !!el.closest(NAV);
+    for (const a of ATTRS) add(el.getAttribute(a), isNav);
+    const tag = el.tagName.toLowerCase();
+    // ion-tab-button "tab" and ion-route "url" are relative to the current route
+    if (tag === 'ion-tab-button' && el.getAttribute('tab')) add(resolve(el.getAttribute('tab')), true);
+    if (tag === 'ion-route' && el.getAttribute('url')) add(el.getAttribute('url'), isNav);
+  });
+  if (probe) {
+    H.state.probing = true;
+    try {
+      for (const sel of selectors || []) {
+        let items = [];
+        try { items = Array.from(document.querySelectorAll(sel)); } catch (e) { continue; }
+        for (const el of items.slice(0, limit || 20)) {
+          // Anchors were collected above; clicking them would leave the page
+          if (el.closest('a[href]')) continue;
+          try { el.click(); } catch (e) {}
+          await new Promise((r) => setTimeout(r, 30));
+        }
+      }
+    } finally {
+      H.state.probing = false;
+    }
+  }
+  return { links: Array.from(links), nav: Array.from(nav), history: Array.from(H.seen) };
+}
+"""
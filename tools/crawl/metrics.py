@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""
+Per-route load metrics gathered while crawling (first-pass performance survey).
+
+`METRICS_INIT_JS` enlarges the resource-timing buffer (default 250 entries) so
+request counts on heavy pages are not truncated. `METRICS_JS` is evaluated
+after a page is processed and returns Navigation Timing (TTFB,
+DOMContentLoaded, load; ms from navigation start), bytes transferred (document
++ resources), request count and, on Chromium, the used JS heap.
+"""
+
+from __future__ import annotations
+from typing import Optional
+
+METRICS_INIT_JS = """
+(() => { try { performance.setResourceTimingBufferSize(5000); } catch (e) {} })();
+"""
+
+METRICS_JS = """
+() => {
+  const nav = performance.getEntriesByType('navigation')[0];
+  const res = performance.getEntriesByType('resource');
+  const ms = (v) => (typeof v === 'number' && v > 0 ? Math.round(v) : null);
+  let bytes = nav ? (nav.transferSize || 0) : 0;
+  for (const r of res) bytes += r.transferSize || 0;
+  const mem = performance.memory;
+  return {
+    ttfb_ms: nav ? ms(nav.responseStart - nav.startTime) : null,
+    dcl_ms: nav ? ms(nav.domContentLoadedEventEnd - nav.startTime) : null,
+    load_ms: nav ? ms(nav.loadEventEnd - nav.startTime) : null,
+    transfer_bytes: bytes,
+    requests: res.length + (nav ? 1 : 0),
+    js_heap_bytes: mem ? mem.usedJSHeapSize : null,
+  };
+}
+"""
+
+
+def top(metrics: dict[str, dict], key: str, n: int = 5) -> list[tuple[str, float]]:
+    """Routes with the largest `key` value (missing values ignored)."""
+    vals = [(p, m[key]) for p, m in metrics.items() if isinstance(m, dict) and m.get(key) is not None]
+    return sorted(vals, key=lambda pv: pv[1], reverse=True)[:n]
+
+
+def fmt_bytes(n: Optional[float]) -> str:
+    if n is None:
+        return "-"
+    for unit in ("B", "KiB", "MiB"):
+        if abs(n) < 1024 or unit == "MiB":
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+    return f"{n:.1f} MiB"
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""
+Static route seeding: find routes without clicking through the UI.
+
+Sources:
+  - JS bundles referenced by the start page (plus lazy chunks they import):
+    Angular/Ionic `path: '...'` route entries, React-router style `path:"/..."`,
+    `<ion-route url="...">` and compiled `routerLink` attributes
+  - /sitemap.xml (and sitemaps listed in robots.txt, one level of sitemap index)
+  - robots.txt Allow/Disallow literal paths
+
+`collect_seeds` takes an async `fetch(url) -> str | None` so it is independent of
+the HTTP client (the crawler passes the browser context's request API).
+"""
+
+from __future__ import annotations
+import re
+import urllib.parse as up
+from typing import Awaitable, Callable, Optional
+
+from tools.crawl.urls import norm_base
+
+Fetch = Callable[[str], Awaitable[Optional[str]]]
+
+_SCRIPT_SRC_RE = re.compile(r"<script[^>]+src=[\"']([^\"']+\.m?js[^\"']*)[\"']", re.I)
+_PRELOAD_RE = re.compile(r"<link[^>]+rel=[\"']modulepreload[\"'][^>]+href=[\"']([^\"']+)[\"']", re.I)
+_CHUNK_RE = re.compile(r"""(?:import\(\s*|["'])(\.{0,2}/?[\w./-]*?(?:chunk|module|lazy|src_app)[\w.-]*\.js)["']""", re.I)
+_PATH_RE = re.compile(r"""\bpath\s*:\s*["'`]([^"'`\s]{0,120})["'`]""")
+_ION_ROUTE_RE = re.compile(r"""ion-route[^>]*?\burl\s*=\s*\\?["']([^"'\\]+)""", re.I)
+_ROUTERLINK_RE = re.compile(r"""routerLink\\?["']?\s*[,:=]\s*\\?["'](/[^"'\\\s]{1,120})""")
+_LOC_RE = re.compile(r"<loc>\s*([^<\s]+)\s*</loc>", re.I)
+_LOCALE_PREFIX_RE = re.compile(r"^/([a-z]{2}(?:-[a-z]{2})?)(?:/|$)", re.I)
+
+MAX_BUNDLES = 40
+MAX_SITEMAPS = 10
+
+
+def _usable_route(p: str) -> bool:
+    if not p or p in ("**", "*") or len(p) > 120:
+        return False
+    # Parameterised (":id"), wildcard or file-like entries cannot be visited as-is
+    if ":" in p or "*" in p or "{" in p or " " in p:
+        return False
+    if re.search(r"\.(js|css|json|png|jpe?g|svg|ico|woff2?|map)$", p, re.I):
+        return False
+    return True
+
+
+def extract_script_urls(html: str, page_url: str) -> list[str]:
+    base = norm_base(page_url)
+    out = []
+    for src in _SCRIPT_SRC_RE.findall(html or "") + _PRELOAD_RE.findall(html or ""):
+        url = up.urljoin(page_url, src)
+        if norm_base(url) == base and url not in out:
+            out.append(url)
+    return out
+
+
+def extract_chunk_urls(js: str, bundle_url: str) -> list[str]:
+    out = []
+    for ref in _CHUNK_RE.findall(js or ""):
+        url = up.urljoin(bundle_url, ref)
+        if norm_base(url) == norm_base(bundle_url) and url not in out:
+            out.append(url)
+    return out
+
+
+def extract_bundle_routes(js: str) -> set[str]:
+    """Route strings as written in the bundle (relative Angular child paths included)."""
+    found = set()
+    for rx in (_PATH_RE, _ION_ROUTE_RE, _ROUTERLINK_RE):
+        for p in rx.findall(js or ""):
+            p = p.strip()
+            if _usable_route(p):
+                found.add(p)
+    return found
+
+
+def extract_sitemap_locs(xml: str) -> list[str]:
+    return [loc.strip() for loc in _LOC_RE.findall(xml or "")]
+
+
+def parse_robots(txt: str) -> tuple[list[str], list[str]]:
+    """Return (literal Allow/Disallow paths, Sitemap URLs)."""
+    paths, sitemaps = [], []
+    for line in (txt or "").splitlines():
+        key, _, val = line.partition(":")
+        key, val = key.strip().lower(), val.split("#", 1)[0].strip()
+        if key == "sitemap" and val:
+            sitemaps.append(val)
+        elif key in ("allow", "disallow") and val.startswith("/") and _usable_route(val.rstrip("$")):
+            paths.append(val.rstrip("$"))
+    return paths, sitemaps
+
+
+def absolutize(route: str, start: str) -> list[str]:
+    """Map a bundle route to site paths; relative child paths also get the start page's locale prefix."""
+    if route.startswith("/"):
+        return [route]
+    out = ["/" + route]
+    m = _LOCALE_PREFIX_RE.match(start or "")
+    if m and not _LOCALE_PREFIX_RE.match("/" + route):
+        out.insert(0, f"/{m.group(1)}/{route}")
+    return out
+
+
+async def collect_seeds(fetch: Fetch, base_url: str, start: str) -> dict[str, list[str]]:
+    """Return {path_or_url: [source, ...]} for routes found statically."""
+    found: dict[str, list[str]] = {}
+
+    def add(route: str, source: str) -> None:
+        srcs = found.setdefault(route, [])
+        if source not in srcs:
+            srcs.append(source)
+
+    # JS bundles (BFS over lazy chunks)
+    start_url = f"{base_url}{start}"
+    html = await fetch(start_url) or ""
+    queue = extract_script_urls(html, start_url)
+    seen_bundles: set[str] = set()
+    while queue and len(seen_bundles) < MAX_BUNDLES:
+        url = queue.pop(0)
+        if url in seen_bundles:
+            continue
+        seen_bundles.add(url)
+        js = await fetch(url)
+        if not js:
+            continue
+        name = up.urlparse(url).path.rsplit("/", 1)[-1]
+        for route in extract_bundle_routes(js):
+            for p in absolutize(route, start):
+                add(p, f"bundle:{name}")
+        queue += [u for u in extract_chunk_urls(js, url) if u not in seen_bundles]
+
+    # robots.txt + sitemaps
+    robots_paths, sitemaps = parse_robots(await fetch(f"{base_url}/robots.txt") or "")
+    for p in robots_paths:
+        add(p, "robots")
+    sitemaps = sitemaps or [f"{base_url}/sitemap.xml"]
+    seen_maps: set[str] = set()
+    while sitemaps and len(seen_maps) < MAX_SITEMAPS:
+        sm = sitemaps.pop(0)
+        if sm in seen_maps:
+            continue
+        seen_maps.add(sm)
+        xml = await fetch(sm) or ""
+        for loc in extract_sitemap_locs(xml):
+            if loc.endswith(".xml") and "<sitemapindex" in xml:
+                sitemaps.append(loc)
+            else:
+                add(loc, "sitemap")
+    return found
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""
+Structural page fingerprints (64-bit SimHash) for near-duplicate detection.
+
+Features are DOM tag paths (`body>div>ul>li`, weighted by how often they occur)
+and word 3-gram shingles of the visible text. Two pages whose fingerprints
+differ in at most `threshold` bits are considered the same page type, e.g.
+filter/sort variants of a listing.
+"""
+
+from __future__ import annotations
+import hashlib
+import re
+from collections import Counter
+from typing import Iterable, Optional
+
+BITS = 64
+# Below this many distinct tag paths, and with no text, a page is an unrendered
+# app shell (`body>app-root`) rather than content worth comparing.
+MIN_TAG_PATHS = 12
+
+# One evaluate call: capped tag paths + visible text of the rendered page.
+FINGERPRINT_JS = """
+() => {
+  const SKIP = new Set(['SCRIPT', 'STYLE', 'NOSCRIPT', 'TEMPLATE', 'SVG', 'LINK', 'META']);
+  const paths = [];
+  const walk = (el, prefix, depth) => {
+    if (paths.length >= 4000 || depth > 24) return;
+    for (const child of el.children) {
+      if (SKIP.has(child.tagName.toUpperCase())) continue;
+      const p = prefix + '>' + child.tagName.toLowerCase();
+      paths.push(p);
+      walk(child, p, depth + 1);
+    }
+  };
+  if (document.body) walk(document.body, 'body', 0);
+  const text = document.body ? (document.body.innerText || '').slice(0, 20000) : '';
+  return { paths, text };
+}
+"""
+
+_WORD_RE = re.compile(r"\w+", re.U)
+
+
+def _h64(feature: str) -> int:
+    return int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def page_features(paths: Iterable[str], text: str, shingle: int = 3) -> Counter:
+    feats: Counter = Counter()
+    for p in paths or []:
+        feats["t:" + p] += 1
+    words = _WORD_RE.findall((text or "").lower())
+    for i in range(max(0, len(words) - shingle + 1)):
+        feats["w:" + " ".join(words[i:i + shingle])] += 1
+    return feats
+
+
+def fingerprintable(paths: Iterable[str], text: str, shingle: int = 3) -> bool:
+    """True if the page has enough rendered content for its fingerprint to mean anything."""
+    if len(set(paths or [])) >= MIN_TAG_PATHS:
+        return True
+    return len(_WORD_RE.findall(text or "")) >= shingle
+
+
+def simhash(features: Counter) -> int:
+    acc = [0] * BITS
+    for feat, weight in features.items():
+        h = _h64(feat)
+        for b in range(BITS):
+            acc[b] += weight if (h >> b) & 1 else -weight
+    out = 0
+    for b in range(BITS):
+        if acc[b] > 0:
+            out |= 1 << b
+    return out
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+class SimhashIndex:
+    """Find a stored fingerprint within `threshold` bits.
+
+    Pigeonhole banding: split the 64 bits into threshold+1 bands; two hashes
+    within the threshold must agree exactly on at least one band, so only
+    hashes sharing a band value are compared.
+    """
+
+    def __init__(self, threshold: int = 3):
+        self.threshold = max(0, int(threshold))
+        n = self.threshold + 1
+        width = BITS // n
+        self._bands = [(i * width, BITS if i == n - 1 else (i + 1) * width) for i in range(n)]
+        self._buckets: list[dict[int, list[tuple[int, str]]]] = [{} for _ in self._bands]
+        self._keys: dict[str, int] = {}
+
+    def _band_values(self, h: int):
+        for lo, hi in self._bands:
+            yield (h >> lo) & ((1 << (hi - lo)) - 1)
+
+    def find(self, h: int) -> Optional[str]:
+        for bucket, val in zip(self._buckets, self._band_values(h)):
+            for other, key in bucket.get(val, ()):
+                if hamming(h, other) <= self.threshold:
+                    return key
+        return None
+
+    def add(self, key: str, h: int) -> None:
+        if key in self._keys:
+            return
+        self._keys[key] = h
+        for bucket, val in zip(self._buckets, self._band_values(h)):
+            bucket.setdefault(val, []).append((h, key))
+
+    def discard(self, key: str) -> None:
+        h = self._keys.pop(key, None)
+        if h is None:
+            return
+        for bucket, val in zip(self._buckets, self._band_values(h)):
+            entries = bucket.get(val, [])
+            entries[:] = [e for e in entries if e[1] != key]
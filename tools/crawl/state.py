@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+"""
+On-disk crawl checkpoints for resumable / incremental discovery.
+
+The state file is plain JSON so it can be inspected or cached by CI:
+
+  {
+    "version": 1, "base_url": ..., "start": ..., "saved_at": ..., "complete": false,
+    "frontier": [[path, depth], ...],          # queued + in-flight at save time
+    "pages": {path: PageRecord, ...},          # finished in this crawl
+    "previous": {path: PageRecord, ...}        # last crawl, not yet re-validated
+  }
+
+Records are streamed into the file one by one, so a `PageStore` backed by
+SQLite is never materialised in memory to write a checkpoint.
+"""
+
+from __future__ import annotations
+import json
+import os
+import sqlite3
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Iterator, Optional
+
+STATE_VERSION = 1
+
+
+@dataclass
+class PageRecord:
+    kind: str  # public | protected | role_restricted | unreachable
+    depth: int = 0
+    status: Optional[int] = None
+    final_path: Optional[str] = None
+    sha256: Optional[str] = None
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    links: list[str] = field(default_factory=list)
+    simhash: Optional[str] = None  # 64-bit DOM fingerprint, hex
+    duplicate_of: Optional[str] = None
+    evidence: Optional[dict] = None  # dual-identity observations behind `kind`
+    metrics: Optional[dict] = None  # ttfb_ms, dcl_ms, load_ms, transfer_bytes, requests, js_heap_bytes
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "PageRecord":
+        known = {k: d[k] for k in cls.__dataclass_fields__ if k in d}
+        return cls(**known)
+
+
+class PageStore:
+    """path -> PageRecord for the pages finished in this crawl.
+
+    In memory by default. With `sqlite_path` each record is a JSON row in a
+    scratch SQLite table (recreated each run), so outlinks, metrics and evidence
+    of a very large crawl stay on disk.
+    """
+
+    def __init__(self, sqlite_path: Optional[Path] = None):
+        self._mem: Optional[dict[str, PageRecord]] = {} if sqlite_path is None else None
+        self._mem_bytes = 0
+        self._db: Optional[sqlite3.Connection] = None
+        self._n = 0
+        self._pending = 0
+        if sqlite_path is not None:
+            sqlite_path.parent.mkdir(parents=True, exist_ok=True)
+            for suffix in ("", "-journal", "-wal"):
+                Path(str(sqlite_path) + suffix).unlink(missing_ok=True)
+            self._db = sqlite3.connect(str(sqlite_path))
+            self._db.execute("PRAGMA journal_mode=OFF")
+            self._db.execute("PRAGMA synchronous=OFF")
+            self._db.execute("CREATE TABLE pages (path TEXT PRIMARY KEY, rec TEXT NOT NULL) WITHOUT ROWID")
+
+    @staticmethod
+    def _dump(rec: PageRecord) -> str:
+        return json.dumps(asdict(rec), ensure_ascii=False, separators=(",", ":"))
+
+    def __setitem__(self, path: str, rec: PageRecord) -> None:
+        if self._mem is not None:
+            old = self._mem.get(path)
+            if old is not None:
+                self._mem_bytes -= len(self._dump(old))
+            else:
+                self._n += 1
+            self._mem[path] = rec
+            self._mem_bytes += len(self._dump(rec))
+            return
+        if path not in self:
+            self._n += 1
+        self._db.execute("INSERT OR REPLACE INTO pages (path, rec) VALUES (?, ?)", (path, self._dump(rec)))
+        self._pending += 1
+        if self._pending >= 200:
+            self._db.commit()
+            self._pending = 0
+
+    def get(self, path: str) -> Optional[PageRecord]:
+        if self._mem is not None:
+            return self._mem.get(path)
+        row = self._db.execute("SELECT rec FROM pages WHERE path = ?", (path,)).fetchone()
+        return PageRecord.from_dict(json.loads(row[0])) if row else None
+
+    def __contains__(self, path: str) -> bool:
+        if self._mem is not None:
+            return path in self._mem
+        return self._db.execute("SELECT 1 FROM pages WHERE path = ?", (path,)).fetchone() is not None
+
+    def __len__(self) -> int:
+        return self._n
+
+    def items(self) -> Iterator[tuple[str, PageRecord]]:
+        if self._mem is not None:
+            yield from list(self._mem.items())  # a copy: workers may record pages meanwhile
+            return
+        for path, rec in self._db.execute("SELECT path, rec FROM pages ORDER BY path"):
+            yield path, PageRecord.from_dict(json.loads(rec))
+
+    def stats(self) -> dict:
+        """Record count plus the bytes they hold in memory (serialised size) and on disk."""
+        out = {"records": self._n, "records_memory_bytes": self._mem_bytes}
+        if self._db is not None:
+            page_count = self._db.execute("PRAGMA page_count").fetchone()[0]
+            page_size = self._db.execute("PRAGMA page_size").fetchone()[0]
+            out["records_disk_bytes"] = int(page_count) * int(page_size)
+        return out
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.commit()
+            self._db.close()
+
+
+@dataclass
+class CrawlState:
+    base_url: str
+    start: str
+    frontier: list[tuple[str, int]] = field(default_factory=list)
+    pages: dict[str, PageRecord] | PageStore = field(default_factory=dict)
+    previous: dict[str, PageRecord] = field(default_factory=dict)
+    complete: bool = False
+
+    def to_json(self, records: bool = True) -> dict:
+        out = {
+            "version": STATE_VERSION,
+            "base_url": self.base_url,
+            "start": self.start,
+            "saved_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "complete": self.complete,
+            "frontier": [[p, d] for p, d in self.frontier],
+        }
+        if records:
+            out["pages"] = {p: asdict(r) for p, r in self.pages.items()}
+            out["previous"] = {p: asdict(r) for p, r in self.previous.items()}
+        return out
+
+    @classmethod
+    def from_json(cls, data: dict) -> "CrawlState":
+        return cls(
+            base_url=str(data.get("base_url") or ""),
+            start=str(data.get("start") or "/"),
+            frontier=[(str(p), int(d)) for p, d in (data.get("frontier") or [])],
+            pages={p: PageRecord.from_dict(r) for p, r in (data.get("pages") or {}).items()},
+            previous={p: PageRecord.from_dict(r) for p, r in (data.get("previous") or {}).items()},
+            complete=bool(data.get("complete")),
+        )
+
+
+def load_state(path: Path) -> Optional[CrawlState]:
+    if not path or not path.is_file():
+        return None
+    try:
+        data = json.loads(path.read_text(encoding="utf-8")) or {}
+    except Exception as e:
+        print(f"[discover] WARN: unreadable state file {path}: {e}", file=sys.stderr)
+        return None
+    if data.get("version") != STATE_VERSION:
+        print(f"[discover] WARN: ignoring state file {path} (version {data.get('version')})", file=sys.stderr)
+        return None
+    return CrawlState.from_json(data)
+
+
+def save_state(path: Path, state: CrawlState) -> None:
+    """Write atomically so a crash mid-write never corrupts the last checkpoint."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as fh:
+        fh.write(json.dumps(state.to_json(records=False), ensure_ascii=False)[:-1])
+        for name in ("pages", "previous"):
+            fh.write(f', "{name}": {{')
+            for i, (p, rec) in enumerate(getattr(state, name).items()):
+                fh.write(("," if i else "") + json.dumps(p, ensure_ascii=False) + ": "
+                         + json.dumps(asdict(rec), ensure_ascii=False))
+            fh.write("}")
+        fh.write("}")
+    os.replace(tmp, path)
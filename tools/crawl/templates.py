@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""
+Route-template inference: collapse parameterised paths during discovery.
+
+`/en/product/1`, `/en/product/2`, ... share the template `/en/product/{id}`.
+Numeric, UUID and long hex segments are always treated as parameters; slugs
+only when they clearly look like record keys (contain a digit, or 4+ words), so
+static routes such as `/system-manage` or `/customer-channels` stay literal.
+Query strings collapse to `?{query}`.
+"""
+
+from __future__ import annotations
+import re
+from typing import Iterable
+
+from tools.crawl.visited import approx_bytes
+
+_NUM_RE = re.compile(r"^\d+$")
+_UUID_RE = re.compile(r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$", re.I)
+_HEX_RE = re.compile(r"^(?=.*\d)[0-9a-f]{16,}$", re.I)
+_SLUG_RE = re.compile(r"^[a-z0-9]+(?:[-_][a-z0-9]+)+$", re.I)
+_LOCALE_RE = re.compile(r"^[a-z]{2}(?:-[a-z]{2})?$", re.I)
+_RANK = {"public": 0, "protected": 1, "role_restricted": 2}
+
+
+def segment_param(seg: str, index: int = 1) -> str | None:
+    """Return the placeholder for a path segment, or None if it is literal."""
+    if not seg:
+        return None
+    if _NUM_RE.match(seg):
+        return "{id}"
+    if _UUID_RE.match(seg):
+        return "{uuid}"
+    if _HEX_RE.match(seg):
+        return "{id}"
+    if index == 0 and _LOCALE_RE.match(seg):
+        return None
+    if _SLUG_RE.match(seg):
+        words = re.split(r"[-_]", seg)
+        if any(ch.isdigit() for ch in seg) or len(words) >= 4:
+            return "{slug}"
+    return None
+
+
+def template_for(path: str) -> str:
+    """`/en/product/42?tab=1` -> `/en/product/{id}?{query}`; literal paths are returned unchanged."""
+    raw, _, query = (path or "/").partition("?")
+    segs = raw.split("/")
+    out = []
+    # segs[0] is "" for absolute paths; index counts real segments
+    for i, seg in enumerate(segs):
+        out.append((segment_param(seg, i - 1) or seg) if i else seg)
+    tpl = "/".join(out) or "/"
+    return f"{tpl}?{{query}}" if query else tpl
+
+
+def is_templated(path: str) -> bool:
+    return template_for(path) != path
+
+
+class TemplateIndex:
+    """Tracks instances per template: caps how many are crawled and keeps a few samples.
+
+    Only the admitted instances (at most `max_crawl` per template) are kept as paths; the
+    others are a count per template, deduplicated through `seen_set` (any set-like with
+    `add`/`in`, e.g. a compact VisitedSet) when given, a plain set otherwise.
+    """
+
+    def __init__(self, samples: int = 3, max_crawl: int = 5, seen_set=None):
+        self.samples = max(1, int(samples))
+        self.max_crawl = max(self.samples, int(max_crawl))
+        self.seen_set = seen_set if seen_set is not None else set()
+        self._admitted: dict[str, set[str]] = {}
+        self._seen: dict[str, int] = {}
+        self._samples: dict[str, list[str]] = {}
+        self._kind: dict[str, str] = {}
+
+    def _count(self, tpl: str, path: str) -> None:
+        if path not in self.seen_set:
+            self.seen_set.add(path)
+            self._seen[tpl] = self._seen.get(tpl, 0) + 1
+
+    def admit(self, path: str) -> bool:
+        """True if `path` may be crawled (literal, already admitted, or template under its cap)."""
+        tpl = template_for(path)
+        if tpl == path:
+            return True
+        self._count(tpl, path)
+        admitted = self._admitted.setdefault(tpl, set())
+        if path in admitted:
+            return True
+        if len(admitted) >= self.max_crawl:
+            return False
+        admitted.add(path)
+        return True
+
+    def observe(self, path: str, kind: str) -> None:
+        """Record a crawled instance; the first `samples` ones represent the template."""
+        tpl = template_for(path)
+        if tpl == path:
+            return
+        self._count(tpl, path)
+        lst = self._samples.setdefault(tpl, [])
+        if path not in lst and len(lst) < self.samples:
+            lst.append(path)
+            # A template takes the most restrictive kind among its samples
+            if _RANK.get(kind, 0) > _RANK.get(self._kind.get(tpl, ""), -1):
+                self._kind[tpl] = kind
+
+    def collapse(self, paths: Iterable[str]) -> list[str]:
+        """Keep literal paths and template samples only."""
+        keep = []
+        for p in paths:
+            tpl = template_for(p)
+            if tpl == p or p in self._samples.get(tpl, ()):
+                keep.append(p)
+        return keep
+
+    def memory_bytes(self) -> int:
+        seen = self.seen_set.memory_bytes() if hasattr(self.seen_set, "memory_bytes") else approx_bytes(self.seen_set)
+        return seen + sum(approx_bytes(d) for d in (self._admitted, self._seen, self._samples, self._kind))
+
+    def to_json(self) -> dict:
+        return {
+            tpl: {
+                "kind": self._kind.get(tpl, "public"),
+                "samples": sorted(samples),
+                "seen": self._seen.get(tpl, 0),
+            }
+            for tpl, samples in sorted(self._samples.items())
+        }
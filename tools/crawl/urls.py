@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+"""URL helpers shared by the discovery crawler."""
+
+from __future__ import annotations
+import re
+import urllib.parse as up
+
+LOGIN_PATH_RE = re.compile(r"/log[-_]?in|/sign[-_]?in", re.I)
+
+
+def norm_base(url: str) -> str:
+    p = up.urlparse(url)
+    scheme = p.scheme or "https"
+    netloc = p.netloc
+    return f"{scheme}://{netloc}".rstrip("/")
+
+
+def norm_path(path: str) -> str:
+    if not path:
+        return "/"
+    if path.startswith("http://") or path.startswith("https://"):
+        return up.urlparse(path).path or "/"
+    return ("/" + path.lstrip("/")).split("#", 1)[0]
+
+
+def internal_path(href: str | None, base_url: str) -> str | None:
+    """Return the normalized path for an in-site href, or None if it should be ignored."""
+    if not href:
+        return None
+    if href.startswith("mailto:") or href.startswith("tel:") or href.startswith("javascript:"):
+        return None
+    u = up.urlparse(href)
+    if u.scheme and u.netloc and norm_base(href) != base_url:
+        return None  # external
+    return norm_path(u.path if u.scheme else href)
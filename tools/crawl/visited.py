@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+"""
+Visited-set backends for large crawls.
+
+- `memory`: a plain Python set (exact; default, fine up to tens of thousands of paths)
+- `bloom`: a scalable Bloom filter. A few bytes per path; a path can be wrongly
+  reported as visited (and skipped) with probability ~ the configured rate
+- `bloom+sqlite`: the Bloom filter answers "definitely new" in memory; a hit is
+  confirmed against an exact on-disk SQLite set, so nothing is skipped by mistake
+
+All backends expose `add`, `in`, `len()` and `stats()` (memory used, estimated
+false-positive rate). `approx_bytes` sizes the crawler's other in-memory
+structures so the reported figure covers them too.
+"""
+
+from __future__ import annotations
+import hashlib
+import math
+import sqlite3
+import sys
+from pathlib import Path
+from typing import Optional
+
+BACKENDS = ("memory", "bloom", "bloom+sqlite")
+
+
+def _hashes(key: str) -> tuple[int, int]:
+    d = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+    return int.from_bytes(d[:8], "big"), int.from_bytes(d[8:], "big") | 1
+
+
+class BloomFilter:
+    """Fixed-capacity Bloom filter; k indexes by double hashing (h1 + i*h2) mod m."""
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = max(1, int(capacity))
+        self.error_rate = error_rate
+        self.m = max(8, int(math.ceil(-self.capacity * math.log(error_rate) / (math.log(2) ** 2))))
+        self.k = max(1, int(round(self.m / self.capacity * math.log(2))))
+        self.bits = bytearray((self.m + 7) // 8)
+        self.count = 0
+
+    def _indexes(self, h1: int, h2: int):
+        m = self.m
+        return ((h1 + i * h2) % m for i in range(self.k))
+
+    def contains(self, h1: int, h2: int) -> bool:
+        bits = self.bits
+        return all(bits[i >> 3] & (1 << (i & 7)) for i in self._indexes(h1, h2))
+
+    def add(self, h1: int, h2: int) -> None:
+        bits = self.bits
+        for i in self._indexes(h1, h2):
+            bits[i >> 3] |= 1 << (i & 7)
+        self.count += 1
+
+    def fp_rate(self) -> float:
+        return (1.0 - math.exp(-self.k * self.count / self.m)) ** self.k
+
+
+class ScalableBloomFilter:
+    """Chain of Bloom filters (Almeida et al.): each new one is `growth`x larger with a
+    `ratio`x tighter error rate, so the compound rate stays below error_rate / (1 - ratio)."""
+
+    def __init__(self, error_rate: float = 0.001, initial_capacity: int = 10000, growth: int = 2, ratio: float = 0.5):
+        if not 0 < error_rate < 1:
+            raise ValueError("error_rate must be in (0, 1)")
+        self.error_rate = error_rate
+        self.growth = growth
+        self.ratio = ratio
+        self.filters = [BloomFilter(initial_capacity, error_rate * (1 - ratio))]
+
+    def __contains__(self, key: str) -> bool:
+        h1, h2 = _hashes(key)
+        return any(f.contains(h1, h2) for f in reversed(self.filters))
+
+    def add(self, key: str) -> bool:
+        """Add `key`; return False if it (probably) was already present."""
+        h1, h2 = _hashes(key)
+        if any(f.contains(h1, h2) for f in self.filters):
+            return False
+        cur = self.filters[-1]
+        if cur.count >= cur.capacity:
+            cur = BloomFilter(cur.capacity * self.growth, cur.error_rate * self.ratio)
+            self.filters.append(cur)
+        cur.add(h1, h2)
+        return True
+
+    def __len__(self) -> int:
+        return sum(f.count for f in self.filters)
+
+    def memory_bytes(self) -> int:
+        return sum(len(f.bits) for f in self.filters)
+
+    def fp_rate(self) -> float:
+        ok = 1.0
+        for f in self.filters:
+            ok *= 1.0 - f.fp_rate()
+        return 1.0 - ok
+
+
+class SqliteSet:
+    """Exact string set on disk (WITHOUT ROWID primary key, no journal: it is scratch data)."""
+
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        for suffix in ("", "-journal", "-wal"):
+            Path(str(path) + suffix).unlink(missing_ok=True)
+        self.path = path
+        self.db = sqlite3.connect(str(path))
+        self.db.execute("PRAGMA journal_mode=OFF")
+        self.db.execute("PRAGMA synchronous=OFF")
+        self.db.execute("CREATE TABLE seen (key TEXT PRIMARY KEY) WITHOUT ROWID")
+        self._pending = 0
+
+    def __contains__(self, key: str) -> bool:
+        return self.db.execute("SELECT 1 FROM seen WHERE key = ?", (key,)).fetchone() is not None
+
+    def add(self, key: str) -> None:
+        self.db.execute("INSERT OR IGNORE INTO seen (key) VALUES (?)", (key,))
+        self._pending += 1
+        if self._pending >= 1000:
+            self.db.commit()
+            self._pending = 0
+
+    def disk_bytes(self) -> int:
+        page_count = self.db.execute("PRAGMA page_count").fetchone()[0]
+        page_size = self.db.execute("PRAGMA page_size").fetchone()[0]
+        return int(page_count) * int(page_size)
+
+    def close(self) -> None:
+        self.db.commit()
+        self.db.close()
+
+
+def approx_bytes(obj) -> int:
+    """Rough deep size of plain containers (dict/list/set/tuple of str/int/...); shared objects count twice."""
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(approx_bytes(k) + approx_bytes(v) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(approx_bytes(v) for v in obj)
+    return size
+
+
+class VisitedSet:
+    """Set-like facade over the configured backend."""
+
+    def __init__(self, backend: str = "memory", error_rate: float = 0.001, capacity: int = 10000,
+                 sqlite_path: Optional[Path] = None):
+        if backend not in BACKENDS:
+            raise ValueError(f"unknown visited backend {backend!r} (choose from {', '.join(BACKENDS)})")
+        self.backend = backend
+        self._set: Optional[set[str]] = set() if backend == "memory" else None
+        self._bloom = ScalableBloomFilter(error_rate, capacity) if backend != "memory" else None
+        self._disk: Optional[SqliteSet] = None
+        if backend == "bloom+sqlite":
+            self._disk = SqliteSet(sqlite_path or Path("report/discover/visited.sqlite"))
+        self._n = 0
+        self._confirm_misses = 0  # Bloom said "seen", SQLite said no (false positives avoided)
+
+    def __contains__(self, key: str) -> bool:
+        if self._set is not None:
+            return key in self._set
+        if key not in self._bloom:
+            return False
+        if self._disk is None:
+            return True
+        if key in self._disk:
+            return True
+        self._confirm_misses += 1
+        return False
+
+    def add(self, key: str) -> None:
+        if self._set is not None:
+            if key not in self._set:
+                self._set.add(key)
+                self._n += 1
+            return
+        if self._disk is not None:
+            if key in self:
+                return
+            self._bloom.add(key)
+            self._disk.add(key)
+            self._n += 1
+        elif self._bloom.add(key):
+            self._n += 1
+
+    def __len__(self) -> int:
+        return self._n
+
+    def memory_bytes(self) -> int:
+        if self._set is not None:
+            return sys.getsizeof(self._set) + sum(sys.getsizeof(k) for k in self._set)
+        return self._bloom.memory_bytes()
+
+    def stats(self) -> dict:
+        out = {"backend": self.backend, "items": self._n, "memory_bytes": self.memory_bytes(), "est_fp_rate": 0.0}
+        if self._bloom is not None:
+            out["bloom_filters"] = len(self._bloom.filters)
+            # With the SQLite confirmation the visited answer itself is exact
+            out["est_fp_rate"] = 0.0 if self._disk is not None else self._bloom.fp_rate()
+            out["bloom_fp_rate"] = self._bloom.fp_rate()
+        if self._disk is not None:
+            out["disk_bytes"] = self._disk.disk_bytes()
+            out["false_positives_caught"] = self._confirm_misses
+        return out
+
+    def close(self) -> None:
+        if self._disk is not None:
+            self._disk.close()
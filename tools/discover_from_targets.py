@@ -7,7 +7,14 @@ Load discover targets from YAML and run auto-discover + generated tests.
 Usage:
   python tools/discover_from_targets.py \
     --file config/discover/targets.yml \
-    --emit-tests --emit-yaml --run-tests
+    --emit-tests --emit-yaml --run-tests [--jobs N]
+
+Targets run in parallel (at most --jobs commands at once, default: CPU count).
+Within a target, seeds are discovered one after another (they write the same
+config/discovered/<site>.json); generated tests then run per browser, up to the
+target's `max_parallel` (YAML, default 1) at a time. Output lines are prefixed
+with `[site]` / `[site:browser]`; a summary table and a combined exit code
+(non-zero if any step failed) are printed at the end.
 
 Notes:
 - Do not put secrets in the YAML. Use environment variables (E2E_*).
@@ -19,24 +26,154 @@ import argparse
 import os
 import subprocess
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Dict
 
 import yaml
 
-
-def sh(args: list[str], cwd: str | None = None, env: dict[str, str] | None = None) -> int:
-    print("$", " ".join(args))
-    return subprocess.call(args, cwd=cwd, env=env or os.environ.copy())
+_print_lock = threading.Lock()
+
+
+def _out(line: str) -> None:
+    with _print_lock:
+        print(line, flush=True)
+
+
+def sh(args: list[str], cwd: str | None = None, env: dict[str, str] | None = None, prefix: str = "") -> int:
+    """Run a command, streaming its combined output line by line with `prefix`."""
+    _out(f"{prefix}$ " + " ".join(args))
+    proc = subprocess.Popen(args, cwd=cwd, env=env or os.environ.copy(), stdout=subprocess.PIPE,
+                            stderr=subprocess.STDOUT, text=True, encoding="utf-8", errors="replace", bufsize=1)
+    assert proc.stdout is not None
+    for line in proc.stdout:
+        _out(f"{prefix}{line.rstrip()}")
+    return proc.wait()
+
+
+@dataclass
+class Step:
+    site: str
+    name: str  # "discover <seed>" | "pytest <browser>"
+    rc: int
+    seconds: float
+
+
+class Runner:
+    """Runs target steps with a global cap on concurrent commands."""
+
+    def __init__(self, jobs: int, workdir: Path):
+        self.slots = threading.BoundedSemaphore(max(1, jobs))
+        self.workdir = workdir
+        self.steps: list[Step] = []
+        self._lock = threading.Lock()
+
+    def run(self, site: str, name: str, cmd: list[str], env: dict[str, str], prefix: str) -> int:
+        with self.slots:
+            t0 = time.monotonic()
+            try:
+                rc = sh(cmd, cwd=str(self.workdir), env=env, prefix=prefix)
+            except Exception as e:
+                _out(f"{prefix}ERROR: {e}")
+                rc = 1
+            step = Step(site, name, rc, time.monotonic() - t0)
+        with self._lock:
+            self.steps.append(step)
+        return rc
+
+
+def _target_env(site: str, base_url: str, login_path: str) -> dict[str, str]:
+    env = os.environ.copy()
+    env["SITE"] = site
+    if base_url:
+        env["BASE_URL"] = base_url
+    if login_path:
+        env["LOGIN_PATH"] = login_path
+    return env
+
+
+def run_target(t: Dict[str, Any], defaults: Dict[str, Any], args, runner: Runner, out_report: Path) -> None:
+    site = str(t.get("site") or "").strip()
+    seeds = t.get("seeds") or []
+    base_url = (t.get("base_url") or "").strip()
+    login_path = (t.get("login_path") or "").strip()
+
+    # Build args for discover
+    allow = t.get("allow") or defaults.get("allow") or []
+    deny = t.get("deny") or defaults.get("deny") or []
+    navs = t.get("nav_selectors") or defaults.get("nav_selectors") or []
+    login_first = bool(t.get("login_first", defaults.get("login_first", True)))
+    concurrency = t.get("concurrency", defaults.get("concurrency"))
+
+    for url in seeds:
+        cmd = [sys.executable, "tools/discover_routes.py", "--url", url, "--emit-tests", "--emit-yaml",
+               "--screenshot-dir", str(out_report)]
+        if login_first:
+            cmd.append("--login-first")
+        if concurrency:
+            cmd += ["--concurrency", str(int(concurrency))]
+        for a in allow:
+            cmd += ["--allow", a]
+        for d in deny:
+            cmd += ["--deny", d]
+        for sel in navs:
+            cmd += ["--nav-selectors", sel]
+        rc = runner.run(site, f"discover {url}", cmd, _target_env(site, base_url, login_path), f"[{site}] ")
+        if rc != 0:
+            _out(f"[{site}] WARN: discover exited {rc} for {url}")
+
+    # Run generated tests for this site
+    if not args.run_tests:
+        return
+    gen_file = runner.workdir / "tests" / "generated" / f"test_{site}_routes_generated.py"
+    if not gen_file.is_file():
+        _out(f"[targets] No generated file for site={site}: {gen_file}")
+        return
+    browsers = t.get("browsers") or defaults.get("browsers") or ["chromium"]
+    markers = str(t.get("markers") or defaults.get("markers") or "smoke").strip()
+    max_parallel = int(t.get("max_parallel", defaults.get("max_parallel", 1)) or 1)
+
+    def run_browser(br: str) -> int:
+        cmd = [sys.executable, "-m", "pytest", "-vv", str(gen_file), "--browser", br,
+               "--screenshot=only-on-failure", "--video=off", "--tracing=retain-on-failure"]
+        if markers:
+            cmd += ["-m", markers]
+        return runner.run(site, f"pytest {br}", cmd, _target_env(site, base_url, login_path), f"[{site}:{br}] ")
+
+    with ThreadPoolExecutor(max_workers=max(1, max_parallel)) as pool:
+        list(pool.map(run_browser, browsers))
+
+
+def _failed(step: Step) -> bool:
+    # pytest exit 5 = nothing selected (e.g. marker filter); not a failure of the run
+    return step.rc != 0 and not (step.name.startswith("pytest") and step.rc == 5)
+
+
+def print_summary(steps: list[Step]) -> None:
+    rows = [(s.site, s.name, "ok" if not _failed(s) else f"FAIL ({s.rc})", f"{s.seconds:.1f}s") for s in steps]
+    head = ("site", "step", "result", "time")
+    widths = [max(len(str(r[i])) for r in rows + [head]) for i in range(4)]
+    fmt = "  ".join(f"{{:<{w}}}" for w in widths)
+    _out("")
+    _out("[targets] Summary")
+    _out(fmt.format(*head))
+    _out(fmt.format(*("-" * w for w in widths)))
+    for r in rows:
+        _out(fmt.format(*r))
 
 
 def main(argv: list[str] | None = None) -> int:
-    ap = argparse.ArgumentParser(description=__doc__)
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
     ap.add_argument("--file", default="config/discover/targets.yml", help="YAML file listing discovery targets")
     ap.add_argument("--emit-tests", action="store_true", default=True, help="Generate pytest modules for each site")
     ap.add_argument("--emit-yaml", action="store_true", default=True, help="Write discovered data to config/discovered/")
     ap.add_argument("--run-tests", action="store_true", default=True, help="Run generated tests after discovery")
     ap.add_argument("--workdir", default=".", help="Working directory for commands")
+    ap.add_argument("--jobs", type=int, default=os.cpu_count() or 1,
+                    help="Max commands (discover/pytest) running at once across all targets (default: CPU count)")
     args = ap.parse_args(argv)
 
     p = Path(args.file)
@@ -55,66 +192,29 @@ def main(argv: list[str] | None = None) -> int:
     out_report = workdir / "report" / "discover"
     out_report.mkdir(parents=True, exist_ok=True)
 
+    valid = []
     for t in targets:
         if not isinstance(t, dict):
             continue
-        site = str(t.get("site") or "").strip()
-        seeds = t.get("seeds") or []
-        base_url = (t.get("base_url") or "").strip()
-        login_path = (t.get("login_path") or "").strip()
-        if not site or not seeds:
+        if not str(t.get("site") or "").strip() or not (t.get("seeds") or []):
             print(f"[targets] skip invalid target: {t}")
             continue
+        valid.append(t)
+    if not valid:
+        return 2
 
-        # Build args for discover
-        allow = t.get("allow") or defaults.get("allow") or []
-        deny = t.get("deny") or defaults.get("deny") or []
-        navs = t.get("nav_selectors") or defaults.get("nav_selectors") or []
-        login_first = bool(t.get("login_first", defaults.get("login_first", True)))
-
-        for url in seeds:
-            cmd = [sys.executable, "tools/discover_routes.py", "--url", url, "--emit-tests", "--emit-yaml",
-                   "--screenshot-dir", str(out_report)]
-            if login_first:
-                cmd.append("--login-first")
-            for a in allow:
-                cmd += ["--allow", a]
-            for d in deny:
-                cmd += ["--deny", d]
-            for sel in navs:
-                cmd += ["--nav-selectors", sel]
-            env = os.environ.copy()
-            if base_url:
-                env["BASE_URL"] = base_url
-            if login_path:
-                env["LOGIN_PATH"] = login_path
-            env["SITE"] = site
-            rc = sh(cmd, cwd=str(workdir), env=env)
-            if rc != 0:
-                print(f"[discover] WARN: discover exited {rc} for {url}")
-
-        # Run generated tests for this site
-        if args.run_tests:
-            gen_file = workdir / "tests" / "generated" / f"test_{site}_routes_generated.py"
-            if gen_file.is_file():
-                browsers = t.get("browsers") or defaults.get("browsers") or ["chromium"]
-                markers = str(t.get("markers") or defaults.get("markers") or "smoke").strip()
-                for br in browsers:
-                    cmd = [sys.executable, "-m", "pytest", "-vv", str(gen_file), "--browser", br,
-                           "--screenshot=only-on-failure", "--video=off", "--tracing=retain-on-failure"]
-                    if markers:
-                        cmd += ["-m", markers]
-                    env = os.environ.copy()
-                    env["SITE"] = site
-                    if base_url:
-                        env["BASE_URL"] = base_url
-                    if login_path:
-                        env["LOGIN_PATH"] = login_path
-                    sh(cmd, cwd=str(workdir), env=env)
-            else:
-                print(f"[targets] No generated file for site={site}: {gen_file}")
-
-    return 0
+    runner = Runner(args.jobs, workdir)
+    t0 = time.monotonic()
+    with ThreadPoolExecutor(max_workers=len(valid)) as pool:
+        futures = [pool.submit(run_target, t, defaults, args, runner, out_report) for t in valid]
+        for f in futures:
+            f.result()
+
+    order = {str(t.get("site")).strip(): i for i, t in enumerate(valid)}
+    print_summary(sorted(runner.steps, key=lambda st: order.get(st.site, 0)))
+    failed = [s for s in runner.steps if _failed(s)]
+    _out(f"[targets] {len(runner.steps)} steps, {len(failed)} failed, {time.monotonic() - t0:.1f}s wall")
+    return 1 if failed else 0
 
 
 if __name__ == "__main__":
@@ -14,13 +14,24 @@ Usage examples:
   # Explicit base + start
   python tools/discover_routes.py --base https://example.com --start /login --emit-tests
 
+  # Re-crawl cheaply: only pages whose ETag/body hash changed are rendered again
+  python tools/discover_routes.py --url https://example.com/login --incremental
+
+  # Crawl with 8 parallel pages, be polite to the host (2 in flight, 250 ms apart)
+  python tools/discover_routes.py --url https://example.com/login --concurrency 8 \
+    --host-max-inflight 2 --host-min-delay-ms 250
+
 Environment (optional):
   E2E_EMAIL / E2E_PASSWORD  Credentials to attempt login (clarifies protected routes)
   SITE                      Site key (default: derived from host)
   LOGIN_PATH                Known login path (optional override)
 
 Output:
-  - JSON at config/discovered/<site>.json (base_url, login_path, public, protected)
+  - JSON at config/discovered/<site>.json (base_url, login_path, public, protected,
+    templates: {"/product/{id}": {kind, samples, seen}}, duplicate_of: {path: original},
+    sources: {path: ["start" | "crawl" | "bundle:<file>" | "sitemap" | "robots"]},
+    role_restricted; with --dual-identity also unreachable + evidence per route)
+  - Crawl checkpoint at report/discover/<site>.state.json (used by --resume/--incremental)
   - If --emit-tests, writes tests/generated/test_<site>_routes_generated.py
 """
 
@@ -30,27 +41,15 @@ import json
 import os
 import re
 import sys
-import time
 import urllib.parse as up
-from collections import deque
 from pathlib import Path
 
-from playwright.sync_api import sync_playwright
-
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
-def norm_base(url: str) -> str:
-    p = up.urlparse(url)
-    scheme = p.scheme or "https"
-    netloc = p.netloc
-    return f"{scheme}://{netloc}".rstrip("/")
-
-
-def norm_path(path: str) -> str:
-    if not path:
-        return "/"
-    if path.startswith("http://") or path.startswith("https://"):
-        return up.urlparse(path).path or "/"
-    return ("/" + path.lstrip("/")).split("#", 1)[0]
+from tools.crawl.engine import CrawlConfig, Crawler  # noqa: E402
+from tools.crawl.frontier import parse_budgets, parse_locales  # noqa: E402
+from tools.crawl.metrics import fmt_bytes, top  # noqa: E402
+from tools.crawl.urls import norm_base, norm_path  # noqa: E402
 
 
 def guess_site(base: str) -> str:
@@ -58,34 +57,6 @@ def guess_site(base: str) -> str:
     return re.sub(r"[^a-z0-9_\-]", "_", host)
 
 
-def try_login(page, base_url: str, login_path: str | None, email: str | None, password: str | None):
-    if not (email and password):
-        return False
-    # Heuristics for login form
-    try:
-        if login_path:
-            page.goto(f"{base_url}{norm_path(login_path)}", wait_until="domcontentloaded", timeout=12_000)
-        # Fill user & pass
-        user = page.locator("input[type='email'], input[name*='user' i], input[id*='user' i], input[name*='account' i]").first
-        pwd = page.locator("input[type='password']").first
-        if user.count() == 0 or pwd.count() == 0:
-            return False
-        user.fill(email)
-        pwd.fill(password)
-        # Submit
-        submit = page.get_by_role("button", name=re.compile(r"(login|log\s*in|sign\s*in|continue|submit)", re.I)).first
-        if submit.count() == 0:
-            submit = page.locator("button[type='submit'], input[type='submit']").first
-        if submit.count():
-            submit.click()
-        page.wait_for_load_state("domcontentloaded", timeout=10_000)
-        # If we are not at login page anymore assume success
-        cur = page.url
-        return (not re.search(r"/log[-_]?in|/sign[-_]?in", up.urlparse(cur).path, re.I))
-    except Exception:
-        return False
-
-
 def _emit_tests(site: str, data: dict):
     from pathlib import Path
     tests_dir = Path("tests/generated")
@@ -187,10 +158,52 @@ def main(argv: list[str] | None = None) -> int:
         "ion-item[routerLink]",
         "[routerLink]",
         "ion-button[routerLink]",
-    ], help="Extra selectors to click/scan for navigation links")
+    ], help="Selectors whose items are probed (clicked in-page) to record SPA navigations")
     ap.add_argument("--allow", nargs="*", default=[], help="Allow-list regex (match path)")
     ap.add_argument("--deny", nargs="*", default=[], help="Deny-list regex (match path)")
     ap.add_argument("--screenshot-dir", help="Save screenshots on navigation error (directory)")
+    ap.add_argument("--concurrency", type=int, default=4, help="Pages crawling in parallel (default 4)")
+    ap.add_argument("--contexts", type=int, default=1,
+                    help="Browser contexts to spread pages over; all share the login state (default 1)")
+    ap.add_argument("--host-max-inflight", type=int, default=4,
+                    help="Politeness: max concurrent navigations per host (default 4)")
+    ap.add_argument("--host-min-delay-ms", type=int, default=0,
+                    help="Politeness: min delay between navigations to the same host (default 0)")
+    ap.add_argument("--state", help="Checkpoint file (default report/discover/<site>.state.json)")
+    ap.add_argument("--checkpoint-every", type=float, default=30.0,
+                    help="Seconds between checkpoints of frontier/visited/results (default 30)")
+    ap.add_argument("--resume", action="store_true", help="Continue an interrupted crawl from the state file")
+    ap.add_argument("--template-samples", type=int, default=3,
+                    help="Sample instances kept per route template like /product/{id} (default 3)")
+    ap.add_argument("--template-max-crawl", type=int, default=5,
+                    help="Max instances crawled per route template (default 5)")
+    ap.add_argument("--dedupe-threshold", type=int, default=3,
+                    help="Max SimHash bit distance for near-duplicate pages; -1 disables (default 3)")
+    ap.add_argument("--settle-ms", type=int, default=1500,
+                    help="Max wait for network idle after the load event before fingerprinting (default 1500)")
+    ap.add_argument("--no-static-seeds", action="store_true",
+                    help="Skip seeding from JS bundle route tables, sitemap.xml and robots.txt")
+    ap.add_argument("--click-explore", choices=["auto", "always", "never"], default="auto",
+                    help="Click --nav-selectors items to provoke navigation; auto = only if static seeding found nothing")
+    ap.add_argument("--dual-identity", action="store_true",
+                    help="Open every route anonymously and logged in side by side (requires creds) "
+                         "to classify public / protected / role_restricted with evidence")
+    ap.add_argument("--prefix-budget", action="append", default=[], metavar="PREFIX=N",
+                    help="Queue at most N paths under PREFIX, e.g. /en/product=50 (repeatable; longest prefix wins)")
+    ap.add_argument("--locales", default=os.getenv("LOCALES") or os.getenv("SITE_LOCALES") or "",
+                    help="Comma-separated site locales, e.g. en,vi; /en/x and /x are then crawled once "
+                         "(default: $LOCALES / $SITE_LOCALES; none = no locale folding)")
+    ap.add_argument("--keep-locale-variants", action="store_true",
+                    help="Treat /en/x and /x as different pages even when --locales is set")
+    ap.add_argument("--visited-backend", choices=["memory", "bloom", "bloom+sqlite"], default="memory",
+                    help="Visited/seen sets: exact in-memory sets (default), a scalable Bloom filter, or a Bloom "
+                         "filter confirmed by an exact SQLite set under report/discover/ (for very large crawls)")
+    ap.add_argument("--visited-fp-rate", type=float, default=0.001,
+                    help="Target Bloom filter false-positive rate (default 0.001)")
+    ap.add_argument("--no-metrics", action="store_true",
+                    help="Skip per-route load metrics (<out>.metrics.json: TTFB, DCL, load, bytes, requests, JS heap)")
+    ap.add_argument("--incremental", action="store_true",
+                    help="Re-validate pages from the last crawl over HTTP (ETag/hash); only render changed ones")
     args = ap.parse_args(argv)
 
     if args.url and (args.base or args.start):
@@ -218,145 +231,76 @@ def main(argv: list[str] | None = None) -> int:
     email = os.getenv("E2E_EMAIL")
     password = os.getenv("E2E_PASSWORD")
 
-    discovered_public: set[str] = set()
-    discovered_protected: set[str] = set()
-
-    visited: set[str] = set()
-    q = deque([(start, 0)])
-
     screenshot_dir = None
     if getattr(args, 'screenshot_dir', None):
         screenshot_dir = Path(args.screenshot_dir)
         screenshot_dir.mkdir(parents=True, exist_ok=True)
 
-    with sync_playwright() as pw:
-        browser = pw.chromium.launch(headless=True)
-        ctx = browser.new_context()
-        page = ctx.new_page()
-
-        # Try logging in once if requested or if start looks like login
-        logged_in = False
-        if args.login_first or re.search(r"/log[-_]?in|/sign[-_]?in", start, re.I):
-            logged_in = try_login(page, base_url, login_path_env or start, email, password)
-        if logged_in:
-            print("[discover] Logged in successfully; will treat redirects to login as protected", file=sys.stderr)
-
-        count = 0
-        while q and count < args.max:
-            path, depth = q.popleft()
-            if path in visited or depth > args.depth:
-                continue
-            visited.add(path)
-            count += 1
-            try:
-                resp = page.goto(f"{base_url}{path}", wait_until="domcontentloaded", timeout=12_000)
-                status = resp.status if resp else None
-                final_path = up.urlparse(page.url).path or "/"
-                # Categorize
-                is_login = bool(re.search(r"/log[-_]?in|/sign[-_]?in", final_path, re.I))
-                if status in (401, 403) or is_login:
-                    discovered_protected.add(path)
-                else:
-                    discovered_public.add(path)
-
-                # Extract links from anchors
-                hrefs = page.eval_on_selector_all(
-                    "a[href]",
-                    "nodes => nodes.map(n => n.getAttribute('href'))",
-                )
-                for href in hrefs or []:
-                    if not href:
-                        continue
-                    if href.startswith("mailto:") or href.startswith("tel:"):
-                        continue
-                    u = up.urlparse(href)
-                    if u.scheme and u.netloc and norm_base(href) != base_url:
-                        continue  # external
-                    pth = norm_path(u.path if u.scheme else href)
-                    if ignore_re.search(pth):
-                        continue
-                    if allow_re and not allow_re.search(pth):
-                        continue
-                    if pth not in visited:
-                        q.append((pth, depth + 1))
-
-                # Extract Ionic/Angular router links
-                ionic_hrefs = []
-                try:
-                    # ion-router-link elements may have an internal anchor; try attribute first
-                    ionic_hrefs += page.eval_on_selector_all(
-                        "ion-router-link",
-                        "nodes => nodes.map(n => n.getAttribute('href') || n.getAttribute('routerLink'))",
-                    ) or []
-                except Exception:
-                    pass
-                try:
-                    # Any element with [routerLink] attribute
-                    ionic_hrefs += page.eval_on_selector_all(
-                        "[routerLink]",
-                        "nodes => nodes.map(n => n.getAttribute('routerLink'))",
-                    ) or []
-                except Exception:
-                    pass
-                # Normalize and enqueue
-                for href in ionic_hrefs:
-                    if not href:
-                        continue
-                    pth = norm_path(href)
-                    if ignore_re.search(pth):
-                        continue
-                    if allow_re and not allow_re.search(pth):
-                        continue
-                    if pth not in visited:
-                        q.append((pth, depth + 1))
-
-                # Try to expand common navigation containers and re-scan
-                for sel in args.nav_selectors:
-                    try:
-                        items = page.locator(sel)
-                        n = min(items.count(), 20)
-                        for i in range(n):
-                            with contextlib.suppress(Exception):
-                                items.nth(i).click(timeout=300)
-                                page.wait_for_timeout(50)
-                        # Re-scan links in nav area
-                        hrefs2 = page.eval_on_selector_all(
-                            sel,
-                            "nodes => Array.from(new Set(nodes.flatMap(n => {\n"
-                            "  const out = [];\n"
-                            "  out.push(...Array.from(n.querySelectorAll('a[href]')).map(a => a.getAttribute('href')));\n"
-                            "  out.push(...(n.getAttribute && n.getAttribute('href') ? [n.getAttribute('href')] : []));\n"
-                            "  out.push(...(n.getAttribute && n.getAttribute('routerLink') ? [n.getAttribute('routerLink')] : []));\n"
-                            "  return out;\n"
-                            "})))",
-                        )
-                        for href in hrefs2 or []:
-                            if not href:
-                                continue
-                            u = up.urlparse(href)
-                            if u.scheme and u.netloc and norm_base(href) != base_url:
-                                continue
-                            pth = norm_path(u.path if u.scheme else href)
-                            if ignore_re.search(pth):
-                                continue
-                            if allow_re and not allow_re.search(pth):
-                                continue
-                            if pth not in visited:
-                                q.append((pth, depth + 1))
-                    except Exception:
-                        continue
-            except Exception:
-                # On navigation error consider path protected (may require auth) and continue
-                discovered_protected.add(path)
-                # Save a screenshot for diagnostics if requested
-                if screenshot_dir:
-                    safe = path.strip('/').replace('/', '_') or 'home'
-                    pshot = screenshot_dir / f"err_{safe}.png"
-                    with contextlib.suppress(Exception):
-                        page.screenshot(path=str(pshot))
-                continue
-
-        browser.close()
+    try:
+        budgets = parse_budgets(args.prefix_budget)
+    except ValueError as e:
+        ap.error(str(e))
+    cfg = CrawlConfig(
+        base_url=base_url,
+        start=start,
+        max_pages=args.max,
+        max_depth=args.depth,
+        allow_re=allow_re,
+        ignore_re=ignore_re,
+        nav_selectors=list(args.nav_selectors or []),
+        concurrency=args.concurrency,
+        contexts=args.contexts,
+        host_max_inflight=args.host_max_inflight,
+        host_min_delay_ms=args.host_min_delay_ms,
+        login=args.login_first,
+        login_path=login_path_env,
+        email=email,
+        password=password,
+        screenshot_dir=screenshot_dir,
+        state_path=Path(args.state) if args.state else Path("report/discover") / f"{site}.state.json",
+        checkpoint_every_s=max(1.0, args.checkpoint_every),
+        resume=args.resume,
+        incremental=args.incremental,
+        template_samples=args.template_samples,
+        template_max_crawl=args.template_max_crawl,
+        dedupe_threshold=args.dedupe_threshold if args.dedupe_threshold >= 0 else None,
+        settle_ms=max(0, args.settle_ms),
+        static_seeds=not args.no_static_seeds,
+        click_explore=args.click_explore,
+        dual_identity=args.dual_identity,
+        prefix_budgets=budgets,
+        locales=[] if args.keep_locale_variants else sorted(parse_locales(args.locales)),
+        visited_backend=args.visited_backend,
+        visited_fp_rate=args.visited_fp_rate,
+        visited_path=Path("report/discover") / site,
+        metrics=not args.no_metrics,
+    )
+    res = Crawler(cfg).run()
+    print(
+        f"[discover] Visited {res.visited} pages in {res.elapsed_s:.1f}s "
+        f"({res.pages_per_sec:.2f} pages/s, concurrency={cfg.concurrency}, unchanged={res.unchanged})",
+        file=sys.stderr,
+    )
+    fr = res.frontier
+    print(
+        f"[discover] Frontier: {fr.get('queued', 0)} queued, {fr.get('deduped', 0)} duplicate links dropped"
+        + "".join(f", {p} over budget x{n}" for p, n in (fr.get("over_budget") or {}).items()),
+        file=sys.stderr,
+    )
+    vs = res.visited_set
+    mem = sum(vs.get(k, 0) for k in ("memory_bytes", "frontier_memory_bytes", "records_memory_bytes",
+                                      "other_memory_bytes"))
+    disk = vs.get("disk_bytes", 0) + vs.get("records_disk_bytes", 0)
+    print(
+        f"[discover] Visited set ({vs.get('backend')}): {vs.get('items')} paths, {vs.get('records', 0)} page records, "
+        f"{mem / 1024:.0f} KiB in memory"
+        + (f", est. false-positive rate {max(vs.get('est_fp_rate', 0), vs.get('frontier_est_fp_rate', 0)):.2e}"
+           if vs.get("backend") != "memory" else "")
+        + (f", {disk / 1024:.0f} KiB on disk" if disk else ""),
+        file=sys.stderr,
+    )
+    discovered_public = res.public
+    discovered_protected = res.protected
 
     # Prepare output
     out = {
@@ -364,13 +308,34 @@ def main(argv: list[str] | None = None) -> int:
         "login_path": login_path_env or start,
         "public": sorted(x for x in discovered_public if x.startswith("/")),
         "protected": sorted(x for x in discovered_protected if x.startswith("/")),
+        "role_restricted": sorted(res.role_restricted),
+        "templates": res.templates,
+        "duplicate_of": dict(sorted(res.duplicates.items())),
+        "sources": res.sources,
     }
+    if cfg.dual_identity:
+        out["unreachable"] = sorted(res.unreachable)
+        out["evidence"] = dict(sorted(res.evidence.items()))
 
     out_dir = Path("config/discovered")
     out_dir.mkdir(parents=True, exist_ok=True)
     out_path = Path(args.out) if args.out else out_dir / f"{site}.json"
     out_path.write_text(json.dumps(out, ensure_ascii=False, indent=2), encoding="utf-8")
     print(f"[discover] Wrote {out_path}")
+    if res.metrics:
+        metrics_path = out_path.with_name(f"{out_path.stem}.metrics.json")
+        metrics_path.write_text(json.dumps({"base_url": base_url, "routes": dict(sorted(res.metrics.items()))},
+                                           ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"[discover] Wrote {metrics_path}")
+        print("[discover] Slowest routes (load):", file=sys.stderr)
+        for p, v in top(res.metrics, "load_ms"):
+            m = res.metrics[p]
+            print(f"  {v:>7} ms  ttfb={m.get('ttfb_ms')} dcl={m.get('dcl_ms')}  {p}", file=sys.stderr)
+        print("[discover] Heaviest routes (transfer):", file=sys.stderr)
+        for p, v in top(res.metrics, "transfer_bytes"):
+            m = res.metrics[p]
+            print(f"  {fmt_bytes(v):>10}  requests={m.get('requests')} heap={fmt_bytes(m.get('js_heap_bytes'))}  {p}",
+                  file=sys.stderr)
     print(json.dumps(out, ensure_ascii=False))
     if args.emit_tests:
         _emit_tests(site, out)
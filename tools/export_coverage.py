@@ -7,7 +7,12 @@ Export a concise coverage summary of what links/routes and feature areas were te
 Usage:
   python tools/export_coverage.py --site ratemate_app2 --junit report/junit.xml --out report
 
-If --junit is omitted, the script tries to find a JUnit file in report/*.xml.
+If --junit is omitted, the script tries to find a JUnit file in report/*.xml,
+then falls back to the results cache (report/results.jsonl).
+--junit also takes several files or globs (e.g. one per browser job); they are
+merged with tools/results.py, the last rerun of a test deciding its status.
+With --history report/history.sqlite, per-route pass rate / median time over
+recent runs and significant slowdowns are added (see tools/run_history.py).
 Outputs:
   - report/coverage.json
   - report/coverage.md
@@ -16,110 +21,61 @@ Outputs:
 
 from __future__ import annotations
 import argparse
-import glob
 import json
 import os
 import re
-from dataclasses import dataclass
+import sys
 from pathlib import Path
-import xml.etree.ElementTree as ET
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from tools.results import TestResult, cache_path, expand, load_results, newest_junit, read_cache  # noqa: E402
 
-@dataclass
-class Case:
-    name: str
-    classname: str
-    status: str  # pass | fail | error | skip
-    time: float
 
+def _find_junit(path_hints: list[str] | None) -> list[str]:
+    if path_hints:
+        return expand(path_hints)
+    newest = newest_junit("report")
+    return [newest] if newest else []
 
-def _find_junit(path_hint: str | None) -> str | None:
-    if path_hint and Path(path_hint).is_file():
-        return path_hint
-    cands = sorted(glob.glob("report/*.xml"))
-    for p in cands[::-1]:
-        try:
-            root = ET.parse(p).getroot()
-            if root.tag.endswith("testsuite") or root.find(".//testsuite") is not None:
-                return p
-        except Exception:
-            continue
-    return None
-
-
-def _parse_junit(path: str) -> list[Case]:
-    cases: list[Case] = []
-    root = ET.parse(path).getroot()
-    suites = [root] if root.tag.endswith("testsuite") else list(root.findall(".//testsuite"))
-    for ts in suites:
-        for tc in ts.findall(".//testcase"):
-            name = (tc.get("name") or "").strip()
-            classname = (tc.get("classname") or "").strip()
-            try:
-                t = float(tc.get("time", "0") or 0.0)
-            except Exception:
-                t = 0.0
-            status = "pass"
-            if tc.find("failure") is not None:
-                status = "fail"
-            elif tc.find("error") is not None:
-                status = "error"
-            elif tc.find("skipped") is not None:
-                status = "skip"
-            cases.append(Case(name=name, classname=classname, status=status, time=t))
-    return cases
-
-
-def _browser_and_param(name: str) -> tuple[str | None, str | None]:
-    # test_fn[chromium-/en/login] or test_fn[chromium-public:/login]
-    if "[" not in name:
-        return None, None
-    br = name.split("[", 1)[1].rstrip("]")
-    if not br:
-        return None, None
-    if "-" in br:
-        b, param = br.split("-", 1)
-        return b, param
-    return br, None
-
-
-def _collect_links_and_routes(cases: list[Case]):
+
+def _parse_junit(paths: list[str]) -> list[TestResult]:
+    return list(load_results(paths, cache=cache_path()))
+
+
+def _collect_links_and_routes(cases: list[TestResult]):
     links: list[dict] = []
     routes: list[dict] = []
     for c in cases:
         mod = c.classname  # e.g., tests.smoke.test_links
         if mod.endswith("test_links") and c.name.startswith("test_open_links_ok"):
-            br, param = _browser_and_param(c.name)
-            path = param or ""
             links.append({
-                "browser": br,
-                "path": path,
-                "status": c.status,
+                "browser": c.browser or None,
+                "path": c.param or "",
+                "status": c.outcome,
                 "time": c.time,
             })
         elif mod.endswith("test_routes") and c.name.startswith("test_routes_access"):
-            br, param = _browser_and_param(c.name)
             kind, path = None, None
-            if param and ":" in param:
-                kind, path = param.split(":", 1)
+            if c.param and ":" in c.param:
+                kind, path = c.param.split(":", 1)
             routes.append({
-                "browser": br,
+                "browser": c.browser or None,
                 "kind": kind,
                 "path": path,
-                "status": c.status,
+                "status": c.outcome,
                 "time": c.time,
             })
     return links, routes
 
 
-def _feature_buckets(cases: list[Case]) -> dict[str, list[str]]:
+def _feature_buckets(cases: list[TestResult]) -> dict[str, list[str]]:
     buckets: dict[str, set[str]] = {}
     def add(key: str, label: str):
         buckets.setdefault(key, set()).add(label)
 
     for c in cases:
         mod = c.classname
-        base = c.name.split("[", 1)[0]
+        base = c.function
         if mod.endswith("tests.auth.test_login"):
             add("auth", base)
         elif mod.endswith("tests.auth.test_register"):
@@ -164,29 +120,47 @@ def _md_table(rows: list[list[str]]) -> str:
 def main(argv: list[str] | None = None) -> int:
     ap = argparse.ArgumentParser(description=__doc__)
     ap.add_argument("--site", help="Site key (used to read discovered JSON)")
-    ap.add_argument("--junit", help="Path to JUnit XML (default: search report/*.xml)")
+    ap.add_argument("--junit", nargs="+", help="JUnit XML files, globs or comma lists; shards are merged "
+                    "(default: newest report/*.xml)")
     ap.add_argument("--out", default="report", help="Output directory (default: report)")
+    ap.add_argument("--history", help="Run-history SQLite (tools/run_history.py) for per-route trends")
     args = ap.parse_args(argv)
 
-    junit_path = _find_junit(args.junit)
-    if not junit_path:
+    junit_paths = _find_junit(args.junit)
+    cached = None if junit_paths else read_cache()
+    if cached is not None:
+        # Only the results cache was kept (e.g. downloaded as an artifact)
+        junit_paths, cases = cached.sources, list(cached)
+    elif not junit_paths:
         print("[coverage] WARN: JUnit XML not found; nothing to export")
         return 0
-
-    cases = _parse_junit(junit_path)
+    else:
+        cases = _parse_junit(junit_paths)
     links, routes = _collect_links_and_routes(cases)
     features = _feature_buckets(cases)
     discovered = _load_discovered(args.site)
 
     out = {
         "site": args.site or os.getenv("SITE") or "",
-        "junit": junit_path,
+        "junit": junit_paths[0] if len(junit_paths) == 1 else junit_paths,
         "links": links,
         "routes": routes,
         "features": features,
         "discovered": discovered,
     }
 
+    history: dict = {}
+    regressions: list[str] = []
+    if args.history and Path(args.history).is_file():
+        from tools.run_history import connect, find_regressions, route_history
+        conn = connect(args.history)
+        try:
+            history = route_history(conn, out["site"] or None)
+            regressions = [r.describe() for r in find_regressions(conn, out["site"] or None)]
+        finally:
+            conn.close()
+        out["history"] = {"routes": history, "regressions": regressions}
+
     out_dir = Path(args.out)
     out_dir.mkdir(parents=True, exist_ok=True)
     (out_dir / "coverage.json").write_text(json.dumps(out, ensure_ascii=False, indent=2), encoding="utf-8")
@@ -202,7 +176,7 @@ def main(argv: list[str] | None = None) -> int:
     # Markdown summary
     md: list[str] = []
     md.append(f"# Coverage Summary (site={out['site']})\n")
-    md.append(f"JUnit: `{junit_path}`\n")
+    md.append("JUnit: " + ", ".join(f"`{p}`" for p in junit_paths) + "\n")
     md.append("## Links Tested\n")
     rows = [["Browser", "Path", "Status", "Time"]]
     for it in links:
@@ -213,6 +187,18 @@ def main(argv: list[str] | None = None) -> int:
     for it in routes:
         rows.append([it.get("browser") or "", it.get("kind") or "", it.get("path") or "", it.get("status") or "", f"{it.get('time', 0):.2f}s"])
     md.append(_md_table(rows) + "\n")
+    if history:
+        md.append("## Route History (recent runs)\n")
+        rows = [["Path", "Runs", "Pass rate", "Median time"]]
+        for path, h in history.items():
+            rate = "" if h["pass_rate"] is None else f"{h['pass_rate'] * 100:.0f}%"
+            med = "" if h["median_time"] is None else f"{h['median_time']:.2f}s"
+            rows.append([path, str(h["runs"]), rate, med])
+        md.append(_md_table(rows) + "\n")
+        if regressions:
+            md.append("Significant slowdowns:\n")
+            md.extend(f"- {r}" for r in regressions)
+            md.append("")
     md.append("## Feature Areas\n")
     for k in ("auth", "smoke", "i18n", "sites", "other"):
         lst = features.get(k) or []
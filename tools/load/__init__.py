@@ -0,0 +1,2 @@
+# -*- coding: utf-8 -*-
+"""Load-testing helpers: latency histograms and a local stand-in server."""
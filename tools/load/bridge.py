@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""
+One async Playwright driver shared by many threads through sync-looking proxies.
+
+The sync API starts a Node driver per thread, so N virtual-user threads would
+cost N drivers. `Bridge` instead runs `async_playwright()` once, on an event
+loop in a private thread, and hands out proxies for its objects. Every
+attribute read or method call on a proxy runs on that loop (awaiting the
+result if needed) while the calling thread blocks, so page objects written
+against the sync API (`page.goto(...)`, `locator.first.click()`,
+`with page.expect_response(...) as info: ... info.value`) work unchanged
+from any number of threads.
+
+Proxies passed back in as arguments (`loc.or_(other)`,
+`cand.filter(has_not=page.locator(...))`) are unwrapped before the call is
+scheduled. Predicates passed to `expect_response` run on the loop with the
+raw async objects; they may read properties (`r.url`, `r.request.method`)
+but must not call back into a proxy, which raises instead of deadlocking.
+"""
+
+from __future__ import annotations
+import asyncio
+import contextlib
+import inspect
+import threading
+
+
+class _Proxy:
+    __slots__ = ("_obj", "_bridge")
+
+    def __init__(self, obj, bridge: "Bridge"):
+        object.__setattr__(self, "_obj", obj)
+        object.__setattr__(self, "_bridge", bridge)
+
+    def __getattr__(self, name: str):
+        value = self._bridge.run(getattr, self._obj, name)
+        if isinstance(value, _Proxy) or not callable(value) or inspect.isclass(value):
+            return value
+        return lambda *args, **kwargs: self._bridge.run(value, *args, **kwargs)
+
+    def __enter__(self):
+        return self._bridge.run(self._obj.__aenter__)
+
+    def __exit__(self, *exc):
+        return self._bridge.run(self._obj.__aexit__, *exc)
+
+    def __repr__(self) -> str:
+        return f"<sync proxy {self._obj!r}>"
+
+
+def _unwrap(value):
+    if isinstance(value, _Proxy):
+        return value._obj
+    if isinstance(value, (list, tuple)):
+        return type(value)(_unwrap(v) for v in value)
+    if isinstance(value, dict):
+        return {k: _unwrap(v) for k, v in value.items()}
+    return value
+
+
+def _is_playwright(value) -> bool:
+    return type(value).__module__.startswith("playwright.") and not isinstance(value, BaseException)
+
+
+class Bridge:
+    """Event loop thread owning one Playwright driver; `start()` returns the sync-proxied Playwright."""
+
+    def __init__(self) -> None:
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name="playwright-loop", daemon=True)
+        self._thread.start()
+        self._pw = None
+
+    def _wrap(self, value):
+        if isinstance(value, list):
+            return [self._wrap(v) for v in value]
+        return _Proxy(value, self) if _is_playwright(value) else value
+
+    def run(self, fn, *args, **kwargs):
+        """Call `fn` on the loop, await its result if it is awaitable, return it proxied."""
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("Bridge.run() called from the Playwright loop thread (e.g. inside a predicate); "
+                               "use the raw async object there")
+        args, kwargs = _unwrap(args), _unwrap(kwargs)
+
+        async def call():
+            out = fn(*args, **kwargs)
+            if inspect.isawaitable(out):
+                out = await out
+            return out
+        return self._wrap(asyncio.run_coroutine_threadsafe(call(), self.loop).result())
+
+    def start(self):
+        from playwright.async_api import async_playwright
+
+        self._pw = self.run(lambda: async_playwright().start())
+        return self._pw
+
+    def close(self) -> None:
+        if self._pw is not None:
+            with contextlib.suppress(Exception):
+                self._pw.stop()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=10)
+        with contextlib.suppress(Exception):
+            self.loop.close()
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""
+HDR-style log-linear latency histogram.
+
+Values are recorded in microseconds. Below 2**sub_bits they are exact; above,
+each power-of-two range is split into 2**(sub_bits-1) linear buckets, so the
+relative error stays under 2 / 2**sub_bits (~0.8% for the default 8) at any
+magnitude with a few hundred sparse counters. Histograms from several threads
+or processes merge by adding counts (`to_dict` / `from_dict` for pickling).
+"""
+
+from __future__ import annotations
+from typing import Optional
+
+
+class Histogram:
+    def __init__(self, sub_bits: int = 8):
+        self.sub_bits = sub_bits
+        self._sub = 1 << sub_bits
+        self._half = self._sub >> 1
+        self.counts: dict[int, int] = {}
+        self.count = 0
+        self.total_us = 0
+        self.min_us: Optional[int] = None
+        self.max_us: Optional[int] = None
+
+    # ----- bucket math -----
+    def _index(self, v: int) -> int:
+        if v < self._sub:
+            return v
+        shift = v.bit_length() - self.sub_bits
+        return self._sub + (shift - 1) * self._half + ((v >> shift) - self._half)
+
+    def _high(self, i: int) -> int:
+        """Highest value that lands in bucket i."""
+        if i < self._sub:
+            return i
+        shift, off = divmod(i - self._sub, self._half)
+        shift += 1
+        return ((off + self._half + 1) << shift) - 1
+
+    # ----- recording -----
+    def record(self, ms: float, n: int = 1) -> None:
+        v = max(0, int(round(ms * 1000)))
+        i = self._index(v)
+        self.counts[i] = self.counts.get(i, 0) + n
+        self.count += n
+        self.total_us += v * n
+        self.min_us = v if self.min_us is None else min(self.min_us, v)
+        self.max_us = v if self.max_us is None else max(self.max_us, v)
+
+    def merge(self, other: "Histogram") -> "Histogram":
+        if other.sub_bits != self.sub_bits:
+            raise ValueError("cannot merge histograms with different precision")
+        for i, n in other.counts.items():
+            self.counts[i] = self.counts.get(i, 0) + n
+        self.count += other.count
+        self.total_us += other.total_us
+        if other.min_us is not None:
+            self.min_us = other.min_us if self.min_us is None else min(self.min_us, other.min_us)
+        if other.max_us is not None:
+            self.max_us = other.max_us if self.max_us is None else max(self.max_us, other.max_us)
+        return self
+
+    # ----- queries -----
+    def percentile(self, p: float) -> Optional[float]:
+        """Value (ms) at or below which `p` percent of samples fall."""
+        if not self.count:
+            return None
+        rank = max(1, int(round(p / 100.0 * self.count + 0.4999)))
+        seen = 0
+        for i in sorted(self.counts):
+            seen += self.counts[i]
+            if seen >= rank:
+                return min(self._high(i), self.max_us or 0) / 1000.0
+        return (self.max_us or 0) / 1000.0
+
+    def mean(self) -> Optional[float]:
+        return self.total_us / self.count / 1000.0 if self.count else None
+
+    def summary(self) -> dict:
+        r = lambda v: None if v is None else round(v, 1)  # noqa: E731
+        return {
+            "count": self.count,
+            "mean_ms": r(self.mean()),
+            "p50_ms": r(self.percentile(50)),
+            "p95_ms": r(self.percentile(95)),
+            "p99_ms": r(self.percentile(99)),
+            "max_ms": r(None if self.max_us is None else self.max_us / 1000.0),
+        }
+
+    # ----- (de)serialisation -----
+    def to_dict(self) -> dict:
+        return {
+            "sub_bits": self.sub_bits,
+            "counts": {str(i): n for i, n in sorted(self.counts.items())},
+            "count": self.count,
+            "total_us": self.total_us,
+            "min_us": self.min_us,
+            "max_us": self.max_us,
+        }
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "Histogram":
+        h = cls(int(d.get("sub_bits", 8)))
+        h.counts = {int(i): int(n) for i, n in (d.get("counts") or {}).items()}
+        h.count = int(d.get("count", 0))
+        h.total_us = int(d.get("total_us", 0))
+        h.min_us = d.get("min_us")
+        h.max_us = d.get("max_us")
+        return h
+
+
+def merge_all(hists: dict[str, Histogram], other: dict[str, Histogram]) -> dict[str, Histogram]:
+    """Merge a name -> histogram map into `hists` (in place)."""
+    for name, h in other.items():
+        if name in hists:
+            hists[name].merge(h)
+        else:
+            hists[name] = Histogram.from_dict(h.to_dict())
+    return hists
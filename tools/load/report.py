@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+"""Console table and JSON report shared by the load tools."""
+
+from __future__ import annotations
+import json
+import time
+from pathlib import Path
+from typing import Optional
+
+from tools.load.histogram import Histogram
+
+
+def print_report(hists: dict[str, Histogram], errors: dict[str, int], wall_s: float, iterations: int,
+                 label: str = "step", prefix: str = "[load]") -> None:
+    head = (label, "count", "errors", "rps", "mean", "p50", "p95", "p99", "max")
+    rows = []
+    for name in sorted(set(hists) | set(errors), key=lambda n: (n.startswith("login."), n)):
+        s = hists[name].summary() if name in hists else {}
+        fmt = lambda v: "-" if v is None else f"{v:.0f}"  # noqa: E731
+        rows.append((name, str(s.get("count", 0)), str(errors.get(name, 0)),
+                     f"{s.get('count', 0) / wall_s:.2f}" if wall_s > 0 else "-",
+                     fmt(s.get("mean_ms")), fmt(s.get("p50_ms")), fmt(s.get("p95_ms")),
+                     fmt(s.get("p99_ms")), fmt(s.get("max_ms"))))
+    widths = [max(len(r[i]) for r in rows + [head]) for i in range(len(head))]
+    line = lambda r: "  ".join(c.ljust(w) if i == 0 else c.rjust(w) for i, (c, w) in enumerate(zip(r, widths)))  # noqa: E731
+    print(f"{prefix} {iterations} iterations in {wall_s:.1f}s ({iterations / wall_s if wall_s else 0:.2f} it/s); "
+          "latencies in ms")
+    print(line(head))
+    print(line(tuple("-" * w for w in widths)))
+    for r in rows:
+        print(line(r))
+
+
+def write_report(out: Optional[str], kind: str, meta: dict, hists: dict[str, Histogram],
+                 errors: dict[str, int]) -> Path:
+    """JSON report with per-step summaries and the raw histograms (mergeable later)."""
+    path = Path(out) if out else Path("report/load") / f"{kind}-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    report = {
+        **meta,
+        "steps": {k: {**h.summary(), "errors": errors.get(k, 0)} for k, h in sorted(hists.items())},
+        "errors": errors,
+        "histograms": {k: h.to_dict() for k, h in sorted(hists.items())},
+    }
+    path.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    return path
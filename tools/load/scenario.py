@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+"""
+Recorded XHR/fetch traffic as a replayable scenario.
+
+A scenario is plain JSON (one file per test, written by the capture fixture in
+tests/_fixtures/traffic.py, replayed by tools/replay_traffic.py):
+
+  {
+    "version": 1, "name": <nodeid>, "base_url": ..., "recorded_at": ...,
+    "steps": [
+      {"name": "POST /api/auth/login", "method": "POST", "url": "/api/auth/login",
+       "headers": {...}, "body": "{\"email\": \"{{email}}\", ...}", "status": 200,
+       "offset_ms": 0, "auth": false, "extract": {"token": "data.accessToken"}},
+      {"name": "GET /api/store/items", ..., "headers": {"Authorization": "Bearer {{token}}"}, "auth": true}
+    ]
+  }
+
+Values are templated while recording: the test credentials become
+`{{email}}`/`{{password}}`, and a bearer token seen in a response body (the
+token source, recorded as `extract`) becomes `{{token}}` wherever it is sent
+later. Same-origin URLs are stored relative to base_url so a scenario can be
+replayed against another host. Cookies and browser-managed headers are
+dropped; the replay client keeps its own cookie jar.
+"""
+
+from __future__ import annotations
+import json
+import os
+import re
+import time
+from pathlib import Path
+from typing import Any, Iterable, Optional
+from urllib.parse import urlsplit
+
+SCENARIO_VERSION = 1
+
+# Headers the browser or the HTTP client manage themselves
+_DROP_HEADERS = {
+    "cookie", "host", "content-length", "connection", "accept-encoding", "origin", "referer",
+    "user-agent", "sec-ch-ua", "sec-ch-ua-mobile", "sec-ch-ua-platform", "sec-fetch-dest",
+    "sec-fetch-mode", "sec-fetch-site", "priority", "pragma", "cache-control",
+}
+_TOKEN_KEYS = ("access_token", "accessToken", "token", "jwt", "id_token", "idToken", "authToken")
+_VAR_RE = re.compile(r"\{\{(\w+)\}\}")
+
+
+def find_token(data: Any, prefix: str = "", depth: int = 0) -> Optional[tuple[str, str]]:
+    """(dotted path, value) of the first token-looking string in a JSON body."""
+    if depth > 4:
+        return None
+    if isinstance(data, dict):
+        for k in _TOKEN_KEYS:
+            v = data.get(k)
+            if isinstance(v, str) and len(v) >= 16:
+                return f"{prefix}{k}", v
+        for k, v in data.items():
+            if isinstance(v, (dict, list)):
+                hit = find_token(v, f"{prefix}{k}.", depth + 1)
+                if hit:
+                    return hit
+    elif isinstance(data, list) and data:
+        return find_token(data[0], f"{prefix}0.", depth + 1)
+    return None
+
+
+def extract(data: Any, path: str) -> Optional[str]:
+    cur = data
+    for part in path.split("."):
+        if isinstance(cur, list) and part.isdigit():
+            cur = cur[int(part)] if int(part) < len(cur) else None
+        elif isinstance(cur, dict):
+            cur = cur.get(part)
+        else:
+            return None
+    return cur if isinstance(cur, str) else None
+
+
+def render(text: Optional[str], variables: dict[str, str]) -> Optional[str]:
+    """Substitute `{{name}}`; unknown names are left as-is."""
+    if text is None:
+        return None
+    return _VAR_RE.sub(lambda m: str(variables.get(m.group(1), m.group(0))), text)
+
+
+def variables_of(steps: Iterable[dict]) -> set[str]:
+    out: set[str] = set()
+    for st in steps:
+        for text in [st.get("url"), st.get("body"), *(st.get("headers") or {}).values()]:
+            out.update(_VAR_RE.findall(text or ""))
+    return out
+
+
+class ScenarioRecorder:
+    """Collects XHR/fetch exchanges for one test and turns them into scenario steps."""
+
+    def __init__(self, name: str, base_url: str, secrets: Optional[dict[str, str]] = None):
+        self.name = name
+        self.base_url = base_url.rstrip("/")
+        self._origin = "{0.scheme}://{0.netloc}".format(urlsplit(self.base_url)) if self.base_url else ""
+        # Longest value first so a password that contains the email is still replaced whole
+        self.secrets = sorted(((v, k) for k, v in (secrets or {}).items() if v), key=lambda x: -len(x[0]))
+        self.tokens: dict[str, str] = {}  # literal token value -> variable name
+        self.steps: list[dict] = []
+        self._t0: Optional[float] = None
+
+    def _template(self, text: Optional[str]) -> Optional[str]:
+        if not text:
+            return text
+        for value, var in self.secrets:
+            text = text.replace(value, "{{%s}}" % var)
+            enc = json.dumps(value)[1:-1]
+            if enc != value:
+                text = text.replace(enc, "{{%s}}" % var)
+        for value, var in self.tokens.items():
+            text = text.replace(value, "{{%s}}" % var)
+        return text
+
+    def _url(self, url: str) -> str:
+        if self._origin and url.startswith(self._origin + "/"):
+            return url[len(self._origin):]
+        return url
+
+    def add(self, method: str, url: str, headers: dict[str, str], body: Optional[str],
+            status: Optional[int], response_json: Any = None, resource_type: str = "fetch") -> dict:
+        now = time.monotonic()
+        if self._t0 is None:
+            self._t0 = now
+        kept = {k: v for k, v in (headers or {}).items() if k.lower() not in _DROP_HEADERS and not k.startswith(":")}
+        templated = {k: self._template(v) for k, v in kept.items()}
+        step = {
+            "name": f"{method} {urlsplit(url).path or '/'}",
+            "method": method,
+            "url": self._template(self._url(url)),
+            "headers": templated,
+            "body": self._template(body),
+            "status": status,
+            "type": resource_type,
+            "offset_ms": round((now - self._t0) * 1000),
+            "auth": any("{{token" in (v or "") for v in templated.values()),
+        }
+        hit = find_token(response_json) if response_json is not None else None
+        if hit and hit[1] not in self.tokens:
+            var = "token" if not self.tokens else f"token{len(self.tokens) + 1}"
+            self.tokens[hit[1]] = var
+            step["extract"] = {var: hit[0]}
+        self.steps.append(step)
+        return step
+
+    def to_json(self) -> dict:
+        return {
+            "version": SCENARIO_VERSION,
+            "name": self.name,
+            "base_url": self.base_url,
+            "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "variables": sorted(variables_of(self.steps)),
+            "steps": self.steps,
+        }
+
+
+def scenario_filename(nodeid: str) -> str:
+    return re.sub(r"[^\w.-]+", "_", nodeid.replace("::", "__")).strip("_")[:150] + ".json"
+
+
+def save_scenario(path: Path, data: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+def load_scenario(path: Path) -> dict:
+    data = json.loads(Path(path).read_text(encoding="utf-8")) or {}
+    if data.get("version") != SCENARIO_VERSION:
+        raise ValueError(f"{path}: unsupported scenario version {data.get('version')}")
+    data.setdefault("name", Path(path).stem)
+    data.setdefault("steps", [])
+    return data
+
+
+def pick_cred(site: str, name: str) -> str:
+    """E2E credential lookup in the same order as the test fixtures (site-scoped, then global)."""
+    key = (site or "ratemate").strip().upper()
+    aliases = {key} | ({"RATEMATE"} if key in {"RATEMATE1", "RATEMATE2"} else set())
+    order = [f"E2E_{k}_{name}" for k in aliases] + [f"{k}_E2E_{name}" for k in aliases] + [f"E2E_{name}"]
+    for envn in order:
+        if os.getenv(envn):
+            return os.environ[envn]
+    return ""
@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+"""
+Local stand-in for the RateMate store, for running load tools without a real site.
+
+Pages (HTML, same shapes the page objects expect):
+  /, /login            -> 302 /en/login
+  /en/login            email + password form; submits via fetch to /api/auth/login,
+                       then goes to /en/store (error shown in [role=alert])
+  /en/store, /en/product, /en/category, /en/QR, /en/feedback
+                       protected: 302 /en/login without a session cookie;
+                       /en/store loads its items with fetch /api/store/items
+API (JSON):
+  POST /api/auth/login     {email, password} -> {token}; also sets the session cookie
+  GET  /api/store/items    Authorization: Bearer <token> or session cookie, else 401
+  GET  /api/me             same auth; the current user
+
+Usage:
+  python -m tools.load.standin --port 8800 [--latency-ms 20] [--email e2e@example.com --password Passw0rd!]
+"""
+
+from __future__ import annotations
+import argparse
+import json
+import random
+import secrets
+import threading
+import time
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+DEFAULT_EMAIL = "e2e@example.com"
+DEFAULT_PASSWORD = "Passw0rd!"
+PROTECTED = ("/en/store", "/en/product", "/en/category", "/en/QR", "/en/feedback")
+
+_LOGIN_HTML = """<!doctype html>
+<html><head><meta charset="utf-8"><title>Login</title></head>
+<body>
+<nav><a href="/en/login">Login</a></nav>
+<main class="login">
+  <form id="login-form" action="/api/auth/login">
+    <label>Email <input type="email" name="email" placeholder="Email" autocomplete="username"></label>
+    <label>Password <input type="password" name="password" placeholder="Password" autocomplete="current-password"></label>
+    <button type="submit">Sign in</button>
+    <p role="alert" hidden></p>
+  </form>
+</main>
+<script>
+document.getElementById('login-form').addEventListener('submit', async (ev) => {
+  ev.preventDefault();
+  const f = ev.target;
+  const alert = f.querySelector('[role=alert]');
+  if (!f.email.value || !f.password.value) { alert.textContent = 'Email and password are required'; alert.hidden = false; return; }
+  const r = await fetch('/api/auth/login', { method: 'POST', headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({ email: f.email.value, password: f.password.value }) });
+  if (r.ok) {
+    const data = await r.json();
+    localStorage.setItem('access_token', data.token);
+    location.href = '/en/store';
+  } else {
+    alert.textContent = 'Incorrect email or password'; alert.hidden = false;
+  }
+});
+</script>
+</body></html>"""
+
+_PAGE_HTML = """<!doctype html>
+<html><head><meta charset="utf-8"><title>{title}</title></head>
+<body>
+<nav>{nav}</nav>
+<main><h1>{title}</h1><ul id="items">{items}</ul></main>
+{script}
+</body></html>"""
+
+_STORE_SCRIPT = """<script>
+fetch('/api/store/items', { headers: { Authorization: 'Bearer ' + (localStorage.getItem('access_token') || '') } })
+  .then((r) => r.ok ? r.json() : { items: [] })
+  .then((d) => { document.getElementById('items').innerHTML = d.items.map((i) => '<li>' + i.name + '</li>').join(''); });
+</script>"""
+
+
+class StandinState:
+    def __init__(self, email: str, password: str, latency_ms: float = 0.0):
+        self.email = email
+        self.password = password
+        self.latency_ms = latency_ms
+        self.tokens: set[str] = set()
+        self.lock = threading.Lock()
+
+    def issue(self) -> str:
+        tok = secrets.token_hex(16)
+        with self.lock:
+            self.tokens.add(tok)
+        return tok
+
+    def valid(self, tok: Optional[str]) -> bool:
+        return bool(tok) and tok in self.tokens
+
+
+def _make_handler(state: StandinState):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        server_version = "RateMateStandin/1.0"
+
+        def log_message(self, fmt, *args):  # keep load runs quiet
+            pass
+
+        # ----- helpers -----
+        def _delay(self) -> None:
+            if state.latency_ms > 0:
+                time.sleep(random.uniform(0.5, 1.5) * state.latency_ms / 1000.0)
+
+        def _send(self, status: int, body: bytes, ctype: str, headers: Optional[dict] = None) -> None:
+            self.send_response(status)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(body)))
+            for k, v in (headers or {}).items():
+                self.send_header(k, v)
+            self.end_headers()
+            if self.command != "HEAD":
+                self.wfile.write(body)
+
+        def _json(self, status: int, data, headers: Optional[dict] = None) -> None:
+            self._send(status, json.dumps(data).encode("utf-8"), "application/json", headers)
+
+        def _redirect(self, location: str) -> None:
+            self._send(302, b"", "text/plain", {"Location": location})
+
+        def _token(self) -> Optional[str]:
+            auth = self.headers.get("Authorization") or ""
+            if auth.lower().startswith("bearer ") and auth[7:].strip():
+                return auth[7:].strip()
+            cookie = SimpleCookie(self.headers.get("Cookie") or "")
+            return cookie["session"].value if "session" in cookie else None
+
+        # ----- routes -----
+        def do_HEAD(self):
+            self.do_GET()
+
+        def do_GET(self):
+            self._delay()
+            path = self.path.split("?", 1)[0]
+            if path in ("/", "/login", "/en", "/en/"):
+                return self._redirect("/en/login")
+            if path == "/en/login":
+                return self._send(200, _LOGIN_HTML.encode("utf-8"), "text/html; charset=utf-8")
+            if path in PROTECTED:
+                if not state.valid(self._token()):
+                    return self._redirect("/en/login")
+                title = path.rsplit("/", 1)[-1]
+                nav = "".join(f'<a href="{p}">{p.rsplit("/", 1)[-1]}</a> ' for p in PROTECTED)
+                items = "" if path == "/en/store" else "".join(f"<li>{title} {i}</li>" for i in range(20))
+                html = _PAGE_HTML.format(title=title, nav=nav, items=items,
+                                         script=_STORE_SCRIPT if path == "/en/store" else "")
+                return self._send(200, html.encode("utf-8"), "text/html; charset=utf-8")
+            if path == "/api/store/items":
+                if not state.valid(self._token()):
+                    return self._json(401, {"error": "unauthorized"})
+                return self._json(200, {"items": [{"id": i, "name": f"Item {i}"} for i in range(50)]})
+            if path == "/api/me":
+                if not state.valid(self._token()):
+                    return self._json(401, {"error": "unauthorized"})
+                return self._json(200, {"email": state.email})
+            if path == "/favicon.ico":
+                return self._send(204, b"", "image/x-icon")
+            return self._send(404, b"not found", "text/plain")
+
+        def do_POST(self):
+            self._delay()
+            path = self.path.split("?", 1)[0]
+            length = int(self.headers.get("Content-Length") or 0)
+            raw = self.rfile.read(length) if length else b""
+            if path == "/api/auth/login":
+                try:
+                    data = json.loads(raw or b"{}")
+                except Exception:
+                    data = {}
+                if data.get("email") == state.email and data.get("password") == state.password:
+                    tok = state.issue()
+                    return self._json(200, {"token": tok},
+                                      {"Set-Cookie": f"session={tok}; Path=/; HttpOnly; SameSite=Lax"})
+                return self._json(401, {"error": "Incorrect email or password"})
+            return self._send(404, b"not found", "text/plain")
+
+    return Handler
+
+
+def serve(host: str = "127.0.0.1", port: int = 0, latency_ms: float = 0.0,
+          email: str = DEFAULT_EMAIL, password: str = DEFAULT_PASSWORD) -> ThreadingHTTPServer:
+    """Start the stand-in in a daemon thread; `server.server_address` has the bound port."""
+    server = ThreadingHTTPServer((host, port), _make_handler(StandinState(email, password, latency_ms)))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="standin", daemon=True).start()
+    return server
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8800)
+    ap.add_argument("--latency-ms", type=float, default=0.0, help="Mean artificial latency per request")
+    ap.add_argument("--email", default=DEFAULT_EMAIL)
+    ap.add_argument("--password", default=DEFAULT_PASSWORD)
+    args = ap.parse_args(argv)
+    server = serve(args.host, args.port, args.latency_ms, args.email, args.password)
+    host, port = server.server_address[:2]
+    print(f"[standin] Serving on http://{host}:{port} (login {args.email})")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Virtual-user load runner built on the existing page objects.
+
+Each virtual user (VU) loops over a scripted flow in a fresh browser context:
+  login   site LoginPage (PageFactory) goto + login, then visit --routes
+  browse  visit --routes anonymously
+Steps are timed individually (`open_login`, `login`, `login.<phase>` from the
+LoginPage phase timer, `visit <route>`); failures are counted per step.
+
+Layout: --shards processes (default: CPU count, at most one per user), each
+running one async Playwright driver that launches --browsers-per-shard
+Chromium processes. Every VU is a thread that drives the shard's driver
+through sync proxies (tools/load/bridge.py), so the sync page objects run
+unchanged, and opens one lightweight context per iteration. N users cost N
+contexts but only one driver and `browsers` browser processes per shard.
+Users start evenly over --ramp-up seconds.
+
+Latencies go into HDR-style log-linear histograms (tools/load/histogram.py),
+merged across threads and shards; the report prints count, errors,
+throughput and p50/p95/p99 per step and is written as JSON.
+
+Usage:
+  # fully local, against the stand-in server
+  python tools/load_runner.py --standin --users 20 --ramp-up 10 --duration 60
+
+  # real site (creds via E2E_* env, as in the tests)
+  SITE=ratemate python tools/load_runner.py --base-url https://store.ratemate.top \\
+      --users 10 --ramp-up 30 --duration 120 --routes /en/store /en/product
+"""
+
+from __future__ import annotations
+import argparse
+import contextlib
+import multiprocessing as mp
+import os
+import re
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from tools.load.bridge import Bridge  # noqa: E402
+from tools.load.histogram import Histogram, merge_all  # noqa: E402
+from tools.load.report import print_report, write_report  # noqa: E402
+from tools.load.scenario import pick_cred  # noqa: E402
+
+LOGIN_URL_RE = re.compile(r"/(auth/login|log[-_]?in|sign[-_]?in)(\?|/|$)", re.I)
+
+
+class Recorder:
+    """Per-thread step latencies (successes) and error counts."""
+
+    def __init__(self) -> None:
+        self.hists: dict[str, Histogram] = {}
+        self.errors: dict[str, int] = {}
+        self.last_error: dict[str, str] = {}
+        self.iterations = 0
+
+    def record(self, name: str, ms: float) -> None:
+        self.hists.setdefault(name, Histogram()).record(ms)
+
+    @contextlib.contextmanager
+    def step(self, name: str):
+        t0 = time.monotonic()
+        try:
+            yield
+        except Exception as e:
+            self.errors[name] = self.errors.get(name, 0) + 1
+            self.last_error[name] = f"{type(e).__name__}: {str(e).splitlines()[0][:200] if str(e) else ''}"
+            raise
+        self.record(name, (time.monotonic() - t0) * 1000)
+
+
+# ----- flows -----
+
+def run_flow(spec: dict, page, rec: Recorder) -> None:
+    from pages.core.base_page import BasePage
+    from pages.factory import PageFactory
+
+    base_url = spec["base_url"]
+    logged_in = False
+    if spec["flow"] == "login":
+        lp = PageFactory(page, {
+            "site": spec["site"],
+            "base_url": base_url,
+            "login_path": spec["login_path"],
+        }).login()
+        with rec.step("open_login"):
+            lp.goto()
+        with rec.step("login"):
+            resp = lp.login(spec["email"], spec["password"])
+            with contextlib.suppress(Exception):
+                page.wait_for_load_state("domcontentloaded", timeout=8_000)
+            status = getattr(resp, "status", None)
+            if LOGIN_URL_RE.search(page.url) and not (status and 200 <= status < 400):
+                raise RuntimeError(f"still on login page (status={status})")
+        for ph in getattr(resp, "phases", None) or []:
+            if ph.ok and ph.name != "page_ready":
+                rec.record(f"login.{ph.name}", ph.duration_ms)
+        logged_in = True
+
+    bp = BasePage(page, base_url)
+    for route in spec["routes"]:
+        with rec.step(f"visit {route}"):
+            bp.goto_path(route, timeout=spec["nav_timeout_ms"])
+            if logged_in and LOGIN_URL_RE.search(page.url):
+                raise RuntimeError(f"redirected to login: {page.url}")
+        if spec["think_ms"]:
+            time.sleep(spec["think_ms"] / 1000.0)
+
+
+def _virtual_user(spec: dict, browser, start_at: float, deadline: float, sink: list, lock) -> None:
+    rec = Recorder()
+    time.sleep(max(0.0, start_at - time.time()))
+    try:
+        while time.time() < deadline and (not spec["iterations"] or rec.iterations < spec["iterations"]):
+            ctx = browser.new_context()
+            try:
+                page = ctx.new_page()
+                page.set_default_timeout(spec["nav_timeout_ms"])
+                with contextlib.suppress(Exception):  # failures are already counted per step
+                    run_flow(spec, page, rec)
+            finally:
+                with contextlib.suppress(Exception):
+                    ctx.close()
+            rec.iterations += 1
+    except Exception as e:
+        rec.errors["vu"] = rec.errors.get("vu", 0) + 1
+        rec.last_error["vu"] = f"{type(e).__name__}: {e}"
+    with lock:
+        sink.append(rec)
+
+
+# ----- shard (one process) -----
+
+def run_shard(spec: dict, shard: int, vu_ids: list[int], t0: float) -> dict:
+    out = {"shard": shard, "hists": {}, "errors": {}, "last_error": {}, "iterations": 0, "fatal": None}
+    bridge = Bridge()
+    try:
+        pw = bridge.start()
+        browsers = [pw.chromium.launch(headless=spec["headless"])
+                    for _ in range(max(1, spec["browsers_per_shard"]))]
+        sink: list[Recorder] = []
+        lock = threading.Lock()
+        threads = []
+        ramp = spec["ramp_up_s"] / max(1, spec["users"])
+        deadline = t0 + spec["ramp_up_s"] + spec["duration_s"]
+        for k, vu in enumerate(vu_ids):
+            th = threading.Thread(target=_virtual_user,
+                                  args=(spec, browsers[k % len(browsers)], t0 + vu * ramp, deadline, sink, lock),
+                                  name=f"vu-{vu}", daemon=True)
+            th.start()
+            threads.append(th)
+        for th in threads:
+            th.join()
+        hists: dict[str, Histogram] = {}
+        for rec in sink:
+            merge_all(hists, rec.hists)
+            for k, n in rec.errors.items():
+                out["errors"][k] = out["errors"].get(k, 0) + n
+            out["last_error"].update(rec.last_error)
+            out["iterations"] += rec.iterations
+        out["hists"] = {k: h.to_dict() for k, h in hists.items()}
+    except Exception as e:
+        out["fatal"] = f"{type(e).__name__}: {e}"
+    finally:
+        bridge.close()  # stopping the driver closes its browsers
+    return out
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--base-url", default=os.getenv("BASE_URL", ""), help="Site under test (default $BASE_URL)")
+    ap.add_argument("--site", default=os.getenv("SITE", "ratemate"), help="Selects pages/sites/<site> page objects")
+    ap.add_argument("--login-path", default=os.getenv("LOGIN_PATH", "/en/login"))
+    ap.add_argument("--flow", choices=["login", "browse"], default="login")
+    ap.add_argument("--routes", nargs="*", default=["/en/store"], help="Routes visited each iteration")
+    ap.add_argument("--users", type=int, default=10, help="Concurrent virtual users")
+    ap.add_argument("--ramp-up", type=float, default=10.0, help="Seconds over which users start")
+    ap.add_argument("--duration", type=float, default=60.0, help="Seconds of steady load after ramp-up")
+    ap.add_argument("--iterations", type=int, default=0, help="Stop each user after N iterations (0 = duration only)")
+    ap.add_argument("--think-ms", type=int, default=0, help="Pause after each route visit")
+    ap.add_argument("--shards", type=int, default=os.cpu_count() or 1, help="Worker processes (default CPU count)")
+    ap.add_argument("--browsers-per-shard", type=int, default=1)
+    ap.add_argument("--nav-timeout-ms", type=int, default=int(os.getenv("NAV_TIMEOUT_MS", "30000")))
+    ap.add_argument("--headed", action="store_true")
+    ap.add_argument("--standin", action="store_true",
+                    help="Start the local stand-in server (tools/load/standin.py) and run against it")
+    ap.add_argument("--standin-latency-ms", type=float, default=20.0)
+    ap.add_argument("--out", help="JSON report path (default report/load/load-<timestamp>.json)")
+    args = ap.parse_args(argv)
+
+    server = None
+    email, password = pick_cred(args.site, "EMAIL"), pick_cred(args.site, "PASSWORD")
+    base_url = args.base_url.rstrip("/")
+    if args.standin:
+        from tools.load.standin import DEFAULT_EMAIL, DEFAULT_PASSWORD, serve
+        server = serve(port=0, latency_ms=args.standin_latency_ms)
+        base_url = f"http://127.0.0.1:{server.server_address[1]}"
+        email, password = DEFAULT_EMAIL, DEFAULT_PASSWORD
+        print(f"[load] Stand-in server at {base_url}")
+    if not base_url:
+        ap.error("--base-url (or BASE_URL) is required unless --standin is used")
+    if args.flow == "login" and not (email and password):
+        ap.error("flow 'login' needs E2E_EMAIL/E2E_PASSWORD (or --standin)")
+
+    users = max(1, args.users)
+    shards = max(1, min(args.shards, users))
+    spec = {
+        "base_url": base_url, "site": args.site, "login_path": args.login_path, "flow": args.flow,
+        "routes": args.routes, "email": email, "password": password, "users": users,
+        "ramp_up_s": max(0.0, args.ramp_up), "duration_s": max(0.0, args.duration), "iterations": args.iterations,
+        "think_ms": args.think_ms, "browsers_per_shard": args.browsers_per_shard,
+        "nav_timeout_ms": args.nav_timeout_ms, "headless": not args.headed,
+    }
+    print(f"[load] {users} users over {shards} shard(s) x {args.browsers_per_shard} browser(s); "
+          f"ramp-up {spec['ramp_up_s']:.0f}s, duration {spec['duration_s']:.0f}s, flow={args.flow}")
+
+    # Start time is shared wall clock so ramp-up offsets line up across processes
+    t0 = time.time() + 2.0
+    assignments = [[vu for vu in range(users) if vu % shards == s] for s in range(shards)]
+    started = time.monotonic()
+    ctx = mp.get_context("spawn")
+    with ctx.Pool(processes=shards) as pool:
+        results = pool.starmap(run_shard, [(spec, s, ids, t0) for s, ids in enumerate(assignments)])
+    wall_s = max(0.001, time.monotonic() - started - 2.0)
+    if server is not None:
+        server.shutdown()
+
+    fatal = [r for r in results if r.get("fatal")]
+    for r in fatal:
+        print(f"[load] ERROR shard {r['shard']}: {r['fatal']}", file=sys.stderr)
+    hists: dict[str, Histogram] = {}
+    errors: dict[str, int] = {}
+    last_error: dict[str, str] = {}
+    iterations = 0
+    for r in results:
+        merge_all(hists, {k: Histogram.from_dict(v) for k, v in r["hists"].items()})
+        for k, n in r["errors"].items():
+            errors[k] = errors.get(k, 0) + n
+        last_error.update(r["last_error"])
+        iterations += r["iterations"]
+
+    print_report(hists, errors, wall_s, iterations)
+    for step, msg in sorted(last_error.items()):
+        print(f"[load] last error in {step}: {msg}", file=sys.stderr)
+
+    out_path = write_report(args.out, "load", {
+        "base_url": base_url, "flow": args.flow, "routes": args.routes, "users": users, "shards": shards,
+        "wall_s": round(wall_s, 2), "iterations": iterations,
+    }, hists, errors)
+    print(f"[load] Wrote {out_path}")
+    return 2 if len(fatal) == len(results) else (1 if errors else 0)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pack test artefacts (Playwright traces, screenshots, videos) into a
+content-addressed store, and rebuild them from it.
+
+Trace zips from `--tracing=retain-on-failure` mostly repeat the same JS bundles,
+fonts and snapshots across tests and browsers. Every zip is exploded into its
+members; each member (and every other file) is stored once under
+blobs/<aa>/<sha256>, zlib-compressed when that actually saves space (images,
+videos and other already-compressed data are kept raw). Files are processed in a
+process pool; the store itself is the dedup index, so workers never coordinate
+beyond an atomic rename. manifest.json lists every original file with its
+members and blob keys; packing into an existing store adds to it.
+
+Rebuilt traces contain the same members, with the same names, order and
+timestamps, so they open in the trace viewer as before. The zip bytes
+themselves can differ from the original, since the archive is recompressed.
+
+Usage:
+  python tools/pack_artifacts.py test-results --out report/artifacts-pack
+  python tools/pack_artifacts.py --unpack report/artifacts-pack --dest .            # everything
+  python tools/pack_artifacts.py --unpack report/artifacts-pack --only "*login*"    # some files
+"""
+
+from __future__ import annotations
+import argparse
+import fnmatch
+import hashlib
+import json
+import os
+import sys
+import time
+import zipfile
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from tools.crawl.metrics import fmt_bytes  # noqa: E402
+
+MANIFEST = "manifest.json"
+_VERSION = 1
+_MIN_GAIN = 0.9  # keep the compressed copy only below 90% of the original size
+
+
+# ----- blob store -----
+
+def _blob_path(store: str, key: str, codec: str) -> str:
+    return os.path.join(store, "blobs", key[:2], key + (".z" if codec == "zlib" else ""))
+
+
+def _find_blob(store: str, key: str) -> tuple[Optional[str], str]:
+    for codec in ("zlib", "raw"):
+        p = _blob_path(store, key, codec)
+        if os.path.exists(p):
+            return p, codec
+    return None, ""
+
+
+def put_blob(store: str, data: bytes, level: int = 6) -> dict:
+    """Store `data` once; returns {key, size, stored, codec, new}."""
+    key = hashlib.sha256(data).hexdigest()
+    existing, codec = _find_blob(store, key)
+    if existing:
+        return {"key": key, "size": len(data), "stored": os.path.getsize(existing), "codec": codec, "new": False}
+    payload, codec = data, "raw"
+    if len(data) >= 64:
+        packed = zlib.compress(data, level)
+        if len(packed) < len(data) * _MIN_GAIN:
+            payload, codec = packed, "zlib"
+    final = _blob_path(store, key, codec)
+    os.makedirs(os.path.dirname(final), exist_ok=True)
+    tmp = f"{final}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as fh:
+        fh.write(payload)
+    # Another worker may have stored the same content meanwhile; same bytes, so last rename wins
+    os.replace(tmp, final)
+    return {"key": key, "size": len(data), "stored": len(payload), "codec": codec, "new": True}
+
+
+def get_blob(store: str, key: str) -> bytes:
+    path, codec = _find_blob(store, key)
+    if not path:
+        raise FileNotFoundError(f"blob {key} missing from {store}")
+    with open(path, "rb") as fh:
+        data = fh.read()
+    if codec == "zlib":
+        data = zlib.decompress(data)
+    if hashlib.sha256(data).hexdigest() != key:
+        raise ValueError(f"blob {key} is corrupt")
+    return data
+
+
+# ----- pack -----
+
+def _pack_one(job: tuple[str, str, str, int]) -> tuple[dict, list[dict]]:
+    """Worker: one input file -> (manifest entry, blob stats)."""
+    path, rel, store, level = job
+    blobs: list[dict] = []
+    size = os.path.getsize(path)
+    if path.endswith(".zip") and zipfile.is_zipfile(path):
+        digest = hashlib.sha256()
+        with open(path, "rb") as fh:
+            for chunk in iter(lambda: fh.read(1 << 20), b""):
+                digest.update(chunk)
+        members = []
+        with zipfile.ZipFile(path) as zf:
+            for info in zf.infolist():
+                m = {"name": info.filename, "date_time": list(info.date_time),
+                     "compress_type": info.compress_type, "external_attr": info.external_attr}
+                if not info.is_dir():
+                    b = put_blob(store, zf.read(info), level)
+                    blobs.append(b)
+                    m.update(blob=b["key"], size=b["size"])
+                members.append(m)
+        return {"path": rel, "kind": "zip", "size": size, "sha256": digest.hexdigest(), "members": members}, blobs
+    with open(path, "rb") as fh:
+        b = put_blob(store, fh.read(), level)
+    blobs.append(b)
+    return {"path": rel, "kind": "file", "size": size, "blob": b["key"]}, blobs
+
+
+def _collect(inputs: list[str], store: str) -> list[tuple[str, str]]:
+    """(absolute path, manifest path) for every file; manifest paths keep the input dir name."""
+    store_abs = os.path.abspath(store)
+    out = []
+    for inp in inputs:
+        root = os.path.abspath(inp)
+        if os.path.isfile(root):
+            out.append((root, os.path.basename(root)))
+            continue
+        base = os.path.dirname(root)
+        for dirpath, dirnames, filenames in os.walk(root):
+            here = os.path.abspath(dirpath)
+            if here == store_abs or here.startswith(store_abs + os.sep):
+                dirnames[:] = []
+                continue
+            dirnames.sort()
+            for name in sorted(filenames):
+                full = os.path.join(dirpath, name)
+                out.append((full, os.path.relpath(full, base).replace(os.sep, "/")))
+    return out
+
+
+def _load_manifest(store: str) -> dict:
+    p = Path(store) / MANIFEST
+    if p.is_file():
+        with open(p, encoding="utf-8") as fh:
+            data = json.load(fh)
+        if data.get("version") == _VERSION:
+            return data
+        print(f"[pack] WARN: {p} has an unknown version; starting a new manifest")
+    return {"version": _VERSION, "files": {}, "blobs": {}}
+
+
+def pack(inputs: list[str], store: str, jobs: Optional[int] = None, level: int = 6) -> dict:
+    t0 = time.perf_counter()
+    files = _collect(inputs, store)
+    os.makedirs(store, exist_ok=True)
+    manifest = _load_manifest(store)
+    work = [(path, rel, store, level) for path, rel in files]
+    stats = {"files": len(files), "zips": 0, "members": 0, "input": 0, "new_blobs": 0, "new_stored": 0,
+             "dedup_hits": 0}
+    workers = max(1, min(jobs or os.cpu_count() or 1, len(work) or 1))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for entry, blobs in pool.map(_pack_one, work, chunksize=4):
+            manifest["files"][entry["path"]] = entry
+            stats["input"] += entry["size"]
+            if entry["kind"] == "zip":
+                stats["zips"] += 1
+                stats["members"] += len(entry["members"])
+            for b in blobs:
+                seen = b["key"] in manifest["blobs"]
+                manifest["blobs"][b["key"]] = {"size": b["size"], "stored": b["stored"], "codec": b["codec"]}
+                if b["new"] and not seen:
+                    stats["new_blobs"] += 1
+                    stats["new_stored"] += b["stored"]
+                else:
+                    stats["dedup_hits"] += 1
+    manifest["updated_at"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+    tmp = Path(store) / f"{MANIFEST}.tmp"
+    tmp.write_text(json.dumps(manifest, separators=(",", ":")), encoding="utf-8")
+    os.replace(tmp, Path(store) / MANIFEST)
+
+    stored_total = sum(b["stored"] for b in manifest["blobs"].values())
+    stats.update(seconds=round(time.perf_counter() - t0, 2), store_bytes=stored_total, workers=workers)
+    return stats
+
+
+# ----- unpack -----
+
+def _unpack_one(job: tuple[str, dict, str]) -> int:
+    store, entry, dest = job
+    out = os.path.join(dest, entry["path"])
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    if entry["kind"] == "file":
+        with open(out, "wb") as fh:
+            fh.write(get_blob(store, entry["blob"]))
+        return os.path.getsize(out)
+    with zipfile.ZipFile(out, "w") as zf:
+        for m in entry["members"]:
+            info = zipfile.ZipInfo(m["name"], date_time=tuple(m["date_time"]))
+            info.compress_type = m.get("compress_type", zipfile.ZIP_DEFLATED)
+            info.external_attr = m.get("external_attr", 0)
+            zf.writestr(info, get_blob(store, m["blob"]) if m.get("blob") else b"")
+    return os.path.getsize(out)
+
+
+def unpack(store: str, dest: str = ".", only: Optional[list[str]] = None, jobs: Optional[int] = None) -> dict:
+    t0 = time.perf_counter()
+    manifest = _load_manifest(store)
+    entries = [e for p, e in sorted(manifest["files"].items())
+               if not only or any(fnmatch.fnmatch(p, pat) for pat in only)]
+    workers = max(1, min(jobs or os.cpu_count() or 1, len(entries) or 1))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        written = sum(pool.map(_unpack_one, [(store, e, dest) for e in entries], chunksize=4))
+    return {"files": len(entries), "bytes": written, "seconds": round(time.perf_counter() - t0, 2)}
+
+
+# ----- CLI -----
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("inputs", nargs="*", default=["test-results"],
+                    help="Directories/files to pack (default: test-results)")
+    ap.add_argument("--out", default="report/artifacts-pack", help="Store directory (default: report/artifacts-pack)")
+    ap.add_argument("--unpack", metavar="STORE", help="Rebuild the original files from STORE instead of packing")
+    ap.add_argument("--dest", default=".", help="Where --unpack writes (default: current directory)")
+    ap.add_argument("--only", nargs="*", help="--unpack only manifest paths matching these globs")
+    ap.add_argument("--jobs", type=int, help="Worker processes (default: CPU count)")
+    ap.add_argument("--level", type=int, default=6, help="zlib level 1-9 (default 6)")
+    args = ap.parse_args(argv)
+
+    if args.unpack:
+        if not (Path(args.unpack) / MANIFEST).is_file():
+            print(f"[pack] No {MANIFEST} in {args.unpack}")
+            return 1
+        st = unpack(args.unpack, args.dest, args.only, args.jobs)
+        print(f"[pack] Rebuilt {st['files']} file(s), {fmt_bytes(st['bytes'])} into {args.dest} in {st['seconds']}s")
+        return 0
+
+    inputs = [p for p in args.inputs if os.path.exists(p)]
+    if not inputs:
+        print(f"[pack] Nothing to pack ({', '.join(args.inputs)} missing)")
+        return 0
+    st = pack(inputs, args.out, args.jobs, args.level)
+    ratio = st["store_bytes"] / st["input"] if st["input"] else 0.0
+    print(f"[pack] {st['files']} file(s) ({st['zips']} zips, {st['members']} members), "
+          f"{fmt_bytes(st['input'])} in -> store {fmt_bytes(st['store_bytes'])} ({ratio:.0%}) "
+          f"in {st['seconds']}s with {st['workers']} worker(s)")
+    print(f"[pack] {st['new_blobs']} new blob(s) ({fmt_bytes(st['new_stored'])}), {st['dedup_hits']} deduplicated")
+    print(f"[pack] Manifest: {Path(args.out) / MANIFEST}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
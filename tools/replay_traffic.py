@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Protocol-level load generator: replay recorded XHR/fetch scenarios at high concurrency.
+
+Scenarios are captured from the browser tests (E2E_CAPTURE_TRAFFIC=1, see
+tests/_fixtures/traffic.py and tools/load/scenario.py), e.g.
+
+  E2E_CAPTURE_TRAFFIC=1 pytest tests/auth/test_login.py -k login_success
+  E2E_CAPTURE_TRAFFIC=1 SITE=fuchacha pytest tests/sites/test_fuchacha_user_manage.py
+
+Each virtual user is an asyncio task sharing one pooled HTTP client. A scenario
+is split at its token source: the steps up to the last `extract` form the
+session (login), which runs once per account and is injected into every user
+(`{{token}}` plus cookies); --session-cache persists it across runs and
+--login-per-user makes each user log in itself. The rest repeats every
+iteration; a 401 on an authenticated step refreshes the session once.
+Latencies are recorded per endpoint in log-linear histograms.
+
+Usage:
+  python tools/replay_traffic.py report/traffic --users 200 --duration 60 --ramp-up 10
+  python tools/replay_traffic.py --standin --users 50 --iterations 100   # built-in stand-in scenario
+"""
+
+from __future__ import annotations
+import argparse
+import asyncio
+import contextlib
+import http.cookiejar
+import json
+import os
+import random
+import sys
+import time
+from http.cookies import SimpleCookie
+from pathlib import Path
+from typing import Optional
+from urllib.parse import urljoin
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from tools.load.histogram import Histogram  # noqa: E402
+from tools.load.report import print_report, write_report  # noqa: E402
+from tools.load.scenario import extract, load_scenario, pick_cred, render  # noqa: E402
+
+# What the login + store flow of tools/load/standin.py produces when captured
+STANDIN_SCENARIO = {
+    "version": 1,
+    "name": "standin_login_store",
+    "base_url": "",
+    "steps": [
+        {"name": "POST /api/auth/login", "method": "POST", "url": "/api/auth/login",
+         "headers": {"Content-Type": "application/json"},
+         "body": '{"email":"{{email}}","password":"{{password}}"}', "status": 200,
+         "offset_ms": 0, "auth": False, "extract": {"token": "token"}},
+        {"name": "GET /api/store/items", "method": "GET", "url": "/api/store/items",
+         "headers": {"Authorization": "Bearer {{token}}"}, "body": None, "status": 200,
+         "offset_ms": 120, "auth": True},
+        {"name": "GET /api/me", "method": "GET", "url": "/api/me",
+         "headers": {"Authorization": "Bearer {{token}}"}, "body": None, "status": 200,
+         "offset_ms": 150, "auth": True},
+    ],
+}
+
+
+def split_session(steps: list[dict]) -> tuple[list[dict], list[dict]]:
+    """(session steps up to the last token source, steps replayed every iteration)."""
+    last = max((i for i, st in enumerate(steps) if st.get("extract")), default=-1)
+    return steps[:last + 1], steps[last + 1:]
+
+
+def _ok(status: int, recorded: Optional[int]) -> bool:
+    if recorded and recorded >= 400:
+        return status == recorded
+    return status < 400
+
+
+class SessionCache:
+    """Tokens and cookies per (host, account), optionally persisted between runs."""
+
+    def __init__(self, path: Optional[Path]):
+        self.path = path
+        self.data: dict[str, dict] = {}
+        if path and path.is_file():
+            with contextlib.suppress(Exception):
+                self.data = json.loads(path.read_text(encoding="utf-8")) or {}
+
+    def save(self) -> None:
+        if self.path:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.path.write_text(json.dumps(self.data, indent=2), encoding="utf-8")
+
+
+class Replayer:
+    def __init__(self, client, base_url: str, variables: dict[str, str], cache: SessionCache,
+                 think_ms: int, pace: bool, timeout_s: float, share_sessions: bool = True):
+        self.client = client
+        self.base_url = base_url.rstrip("/") + "/"
+        self.variables = variables
+        self.cache = cache
+        self.think_ms = think_ms
+        self.pace = pace
+        self.timeout_s = timeout_s
+        self.share_sessions = share_sessions
+        self.hists: dict[str, Histogram] = {}
+        self.errors: dict[str, int] = {}
+        self.last_error: dict[str, str] = {}
+        self.iterations = 0
+        self._login_locks: dict[str, asyncio.Lock] = {}
+
+    def _fail(self, name: str, msg: str) -> None:
+        self.errors[name] = self.errors.get(name, 0) + 1
+        self.last_error[name] = msg
+
+    async def _send(self, step: dict, vu: dict) -> Optional[object]:
+        """One request; returns the response or None on a transport error. Records latency/errors."""
+        name = step.get("name") or f"{step['method']} {step['url']}"
+        vars_ = {**self.variables, **vu["vars"]}
+        headers = {k: render(v, vars_) for k, v in (step.get("headers") or {}).items()}
+        if vu["cookies"]:
+            headers["Cookie"] = "; ".join(f"{k}={v}" for k, v in vu["cookies"].items())
+        body = render(step.get("body"), vars_)
+        url = urljoin(self.base_url, render(step["url"], vars_).lstrip("/")) \
+            if not step["url"].startswith("http") else render(step["url"], vars_)
+        t0 = time.monotonic()
+        try:
+            resp = await self.client.request(step["method"], url, headers=headers,
+                                             content=body.encode("utf-8") if body is not None else None,
+                                             timeout=self.timeout_s)
+        except Exception as e:
+            self._fail(name, f"{type(e).__name__}: {e}")
+            return None
+        ms = (time.monotonic() - t0) * 1000
+        for raw in resp.headers.get_list("set-cookie"):
+            with contextlib.suppress(Exception):
+                for k, morsel in SimpleCookie(raw).items():
+                    vu["cookies"][k] = morsel.value
+        if _ok(resp.status_code, step.get("status")):
+            self.hists.setdefault(name, Histogram()).record(ms)
+        else:
+            self._fail(name, f"HTTP {resp.status_code} (recorded {step.get('status')})")
+        return resp
+
+    async def login(self, scenario: dict, vu: dict, force: bool = False) -> bool:
+        session_steps = scenario["_session"]
+        if not session_steps:
+            return True
+        key = f"{self.base_url}|{self.variables.get('email', '')}|{scenario['name']}"
+        lock = self._login_locks.setdefault(key, asyncio.Lock()) if self.share_sessions else asyncio.Lock()
+        async with lock:
+            cached = self.cache.data.get(key) if self.share_sessions else None
+            # Reuse the cached session unless it is the one that just got a 401
+            if cached and (not force or cached.get("at", 0) > vu.get("login_at", 0)):
+                vu["vars"].update(cached.get("vars") or {})
+                vu["cookies"].update(cached.get("cookies") or {})
+                vu["login_at"] = cached.get("at", 0)
+                return True
+            for st in session_steps:
+                resp = await self._send(st, vu)
+                if resp is None or not _ok(resp.status_code, st.get("status")):
+                    return False
+                for var, path in (st.get("extract") or {}).items():
+                    with contextlib.suppress(Exception):
+                        val = extract(resp.json(), path)
+                        if val:
+                            vu["vars"][var] = val
+            vu["login_at"] = time.time()
+            self.cache.data[key] = {"at": vu["login_at"], "vars": dict(vu["vars"]), "cookies": dict(vu["cookies"])}
+            return True
+
+    async def run_user(self, scenario: dict, start_at: float, deadline: float, iterations: int) -> None:
+        await asyncio.sleep(max(0.0, start_at - time.monotonic()))
+        vu = {"vars": {}, "cookies": {}}
+        if not await self.login(scenario, vu):
+            return
+        steps = scenario["_work"] or scenario["_session"]
+        n = 0
+        while time.monotonic() < deadline and (not iterations or n < iterations):
+            prev_offset = None
+            for st in steps:
+                if self.pace and prev_offset is not None:
+                    await asyncio.sleep(max(0, st.get("offset_ms", 0) - prev_offset) / 1000.0)
+                prev_offset = st.get("offset_ms", 0)
+                resp = await self._send(st, vu)
+                if resp is not None and resp.status_code == 401 and st.get("auth") and scenario["_session"]:
+                    if await self.login(scenario, vu, force=True):
+                        await self._send(st, vu)
+            n += 1
+            self.iterations += 1
+            if self.think_ms:
+                await asyncio.sleep(random.uniform(0.5, 1.5) * self.think_ms / 1000.0)
+
+
+def _scenario_files(paths: list[str]) -> list[Path]:
+    out: list[Path] = []
+    for raw in paths:
+        p = Path(raw)
+        out.extend(sorted(p.glob("*.json")) if p.is_dir() else [p])
+    return out
+
+
+async def run(args, scenarios: list[dict], base_url: str, variables: dict[str, str]) -> tuple[Replayer, float]:
+    import httpx  # replay-only dependency
+
+    limits = httpx.Limits(max_connections=args.max_connections, max_keepalive_connections=args.max_connections)
+    # Cookies are tracked per virtual user; keep the shared client's jar empty
+    no_cookies = httpx.Cookies(http.cookiejar.CookieJar(policy=http.cookiejar.DefaultCookiePolicy(allowed_domains=[])))
+    cache = SessionCache(Path(args.session_cache) if args.session_cache else None)
+    async with httpx.AsyncClient(limits=limits, cookies=no_cookies, follow_redirects=False,
+                                 verify=not args.insecure, http2=False) as client:
+        rp = Replayer(client, base_url, variables, cache, args.think_ms, args.pace, args.timeout,
+                      share_sessions=not args.login_per_user)
+        start = time.monotonic() + 0.2
+        deadline = start + args.ramp_up + args.duration if args.duration else float("inf")
+        ramp = args.ramp_up / max(1, args.users)
+        tasks = [asyncio.create_task(rp.run_user(scenarios[i % len(scenarios)], start + i * ramp,
+                                                 deadline, args.iterations))
+                 for i in range(args.users)]
+        await asyncio.gather(*tasks)
+        wall_s = max(0.001, time.monotonic() - start)
+    cache.save()
+    return rp, wall_s
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("scenarios", nargs="*", help="Scenario JSON files or directories (default report/traffic)")
+    ap.add_argument("--base-url", default=os.getenv("BASE_URL", ""),
+                    help="Target host (default: the scenario's recorded base_url)")
+    ap.add_argument("--site", default=os.getenv("SITE", "ratemate"), help="Selects E2E_<SITE>_* credentials")
+    ap.add_argument("--var", action="append", default=[], metavar="NAME=VALUE", help="Extra template variable")
+    ap.add_argument("--users", type=int, default=50)
+    ap.add_argument("--ramp-up", type=float, default=5.0)
+    ap.add_argument("--duration", type=float, default=30.0, help="Seconds after ramp-up (0 = iterations only)")
+    ap.add_argument("--iterations", type=int, default=0, help="Per-user iteration cap (0 = duration only)")
+    ap.add_argument("--think-ms", type=int, default=0, help="Mean pause between iterations")
+    ap.add_argument("--pace", action="store_true", help="Keep the recorded gaps between requests")
+    ap.add_argument("--max-connections", type=int, default=100, help="Connection pool size")
+    ap.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout (s)")
+    ap.add_argument("--session-cache", help="JSON file to reuse/persist login sessions (tokens, cookies)")
+    ap.add_argument("--login-per-user", action="store_true",
+                    help="Every user runs the session steps itself instead of sharing one cached login")
+    ap.add_argument("--insecure", action="store_true", help="Skip TLS verification")
+    ap.add_argument("--standin", action="store_true", help="Replay the built-in scenario against tools/load/standin.py")
+    ap.add_argument("--standin-latency-ms", type=float, default=5.0)
+    ap.add_argument("--out", help="JSON report path (default report/load/replay-<timestamp>.json)")
+    args = ap.parse_args(argv)
+    if not args.duration and not args.iterations:
+        ap.error("set --duration or --iterations")
+
+    try:
+        import httpx  # noqa: F401
+    except ImportError:
+        print("[replay] httpx is required: pip install httpx", file=sys.stderr)
+        return 2
+
+    variables = {"email": pick_cred(args.site, "EMAIL"), "password": pick_cred(args.site, "PASSWORD")}
+    server = None
+    if args.standin:
+        from tools.load.standin import DEFAULT_EMAIL, DEFAULT_PASSWORD, serve
+        server = serve(port=0, latency_ms=args.standin_latency_ms)
+        args.base_url = f"http://127.0.0.1:{server.server_address[1]}"
+        variables = {"email": DEFAULT_EMAIL, "password": DEFAULT_PASSWORD}
+        scenarios = [json.loads(json.dumps(STANDIN_SCENARIO))]
+        print(f"[replay] Stand-in server at {args.base_url}")
+    else:
+        files = _scenario_files(args.scenarios or ["report/traffic"])
+        scenarios = []
+        for f in files:
+            try:
+                scenarios.append(load_scenario(f))
+            except Exception as e:
+                print(f"[replay] WARN: skip {f}: {e}", file=sys.stderr)
+        scenarios = [s for s in scenarios if s["steps"]]
+        if not scenarios:
+            print("[replay] No scenarios with steps found", file=sys.stderr)
+            return 2
+    for kv in args.var:
+        k, _, v = kv.partition("=")
+        variables[k.strip()] = v
+
+    base_url = args.base_url or scenarios[0].get("base_url") or ""
+    if not base_url:
+        ap.error("--base-url is required (scenario has no base_url)")
+    for sc in scenarios:
+        sc["_session"], sc["_work"] = split_session(sc["steps"])
+        missing = {v for v in sc.get("variables") or [] if v in ("email", "password") and not variables.get(v)}
+        if missing:
+            print(f"[replay] WARN: {sc['name']}: no value for {', '.join(sorted(missing))} (set E2E_* or --var)",
+                  file=sys.stderr)
+
+    print(f"[replay] {len(scenarios)} scenario(s), {args.users} users, pool {args.max_connections}, "
+          f"target {base_url}")
+    try:
+        rp, wall_s = asyncio.run(run(args, scenarios, base_url, variables))
+    finally:
+        if server is not None:
+            server.shutdown()
+
+    print_report(rp.hists, rp.errors, wall_s, rp.iterations, label="endpoint", prefix="[replay]")
+    for name, msg in sorted(rp.last_error.items()):
+        print(f"[replay] last error in {name}: {msg}", file=sys.stderr)
+    out = write_report(args.out, "replay", {
+        "base_url": base_url, "scenarios": [s["name"] for s in scenarios], "users": args.users,
+        "wall_s": round(wall_s, 2), "iterations": rp.iterations,
+    }, rp.hists, rp.errors)
+    print(f"[replay] Wrote {out}")
+    return 1 if rp.errors else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Streaming JUnit ingestion, multi-shard merge and the shared test-result model.
+
+JUnit files are read with `iterparse` and every <testcase> is cleared as soon
+as it has been turned into a `TestResult`, so memory stays flat no matter how
+large a single file is; only one small record per unique test is kept.
+
+`TestResult` is the one place test IDs are parsed: pytest nodeid, browser and
+parametrize id. The browser is only taken from the id when it is a known
+engine at either end (`[chromium-/en/sign-in]`, `[public:/a-b-firefox]`), so
+params containing '-' are kept whole.
+
+Many files (one per browser matrix job, xdist worker or rerun job) merge into
+one `ResultSet` keyed by classname + name:
+  - files are applied oldest first (mtime), so a later rerun job's outcome is final;
+  - inside one file a test that appears twice (failure in call plus error in
+    teardown) keeps the worse outcome;
+  - a test that failed in an earlier attempt and passed later is marked flaky;
+    Surefire-style <flakyFailure>/<rerunFailure> children count as earlier attempts.
+
+The merged set is cached once per run in report/results.jsonl (a meta line
+with the source files' size/mtime, then one JSON object per test); consumers
+(coverage, Telegram, run history, run-over-run diffs) read the cache instead of
+re-parsing XML as long as the sources are unchanged, or use it on its own when
+only the cache was kept as an artifact.
+
+Usage:
+  python tools/results.py "report/junit-*.xml"        # merge, print counts, write report/results.jsonl
+"""
+
+from __future__ import annotations
+import glob
+import json
+import os
+import sys
+import xml.etree.ElementTree as ET
+from dataclasses import asdict, dataclass, field
+from typing import Iterable, Iterator, Optional
+
+OUTCOMES = ("pass", "fail", "error", "skip")
+BROWSERS = ("chromium", "firefox", "webkit")
+CACHE_FILE = "report/results.jsonl"
+_CACHE_VERSION = 1
+_SEVERITY = {"pass": 0, "skip": 1, "fail": 2, "error": 3}
+_RERUN_TAGS = {"flakyFailure", "flakyError", "rerunFailure", "rerunError"}
+
+
+def split_params(name: str) -> tuple[str, str, Optional[str]]:
+    """test_fn[chromium-public:/sign-in] -> ("test_fn", "chromium", "public:/sign-in")."""
+    if "[" not in name:
+        return name, "", None
+    base, br = name.split("[", 1)
+    br = br[:-1] if br.endswith("]") else br
+    if br in BROWSERS:
+        return base, br, None
+    for b in BROWSERS:
+        if br.startswith(b + "-"):
+            return base, b, br[len(b) + 1:]
+        if br.endswith("-" + b):
+            return base, b, br[:-len(b) - 1]
+    return base, "", br or None
+
+
+def nodeid_for(classname: str, name: str) -> str:
+    """tests.auth.test_login.TestX + test_fn[chromium] -> tests/auth/test_login.py::TestX::test_fn[chromium]"""
+    parts = classname.split(".") if classname else []
+    # Test classes follow the module; module names are lower-case by convention
+    cut = next((i for i, p in enumerate(parts) if p[:1].isupper()), len(parts))
+    mod, classes = parts[:cut], parts[cut:]
+    return "::".join([("/".join(mod) + ".py") if mod else "", *classes, name]).lstrip(":")
+
+
+def split_full_name(full_name: str) -> tuple[str, str]:
+    """Inverse of `TestResult.full_name`; the parametrize id may itself contain dots."""
+    base, br = (full_name.split("[", 1) + [""])[:2]
+    classname, _, fn = base.rpartition(".")
+    return classname, fn + (f"[{br}" if br else "")
+
+
+@dataclass
+class TestResult:
+    __test__ = False  # not a pytest class
+
+    classname: str
+    name: str
+    outcome: str  # pass | fail | error | skip
+    time: float = 0.0
+    message: str = ""
+    properties: dict[str, str] = field(default_factory=dict)
+    source: str = ""
+    attempts: int = 1
+    flaky: bool = False
+
+    @property
+    def key(self) -> str:
+        return f"{self.classname}::{self.name}"
+
+    @property
+    def full_name(self) -> str:
+        """`classname.name`, the form the reports have always printed."""
+        return f"{self.classname}.{self.name}".strip(".")
+
+    @property
+    def nodeid(self) -> str:
+        return nodeid_for(self.classname, self.name)
+
+    @property
+    def function(self) -> str:
+        return split_params(self.name)[0]
+
+    @property
+    def browser(self) -> str:
+        return split_params(self.name)[1]
+
+    @property
+    def param(self) -> Optional[str]:
+        return split_params(self.name)[2]
+
+    @property
+    def test_id(self) -> str:
+        """Browser-independent identity used to line runs up: classname.function[param]."""
+        base, _, param = split_params(self.name)
+        return f"{self.classname}.{base}" + (f"[{param}]" if param else "")
+
+    @property
+    def case_id(self) -> str:
+        return self.properties.get("case_id", "")
+
+    @property
+    def title(self) -> str:
+        return self.properties.get("case_title", "")
+
+    @property
+    def pretty(self) -> str:
+        """auth/test_login::test_fn [param] (chromium)"""
+        parts = self.classname.split(".")
+        if parts and parts[0] == "tests":
+            parts = parts[1:]
+        base, browser, param = split_params(self.name)
+        tail = ([f"[{param}]"] if param else []) + ([f"({browser})"] if browser else [])
+        return f"{'/'.join(parts)}::{base}" + (" " + " ".join(tail) if tail else "")
+
+    def to_json(self) -> dict:
+        return {**asdict(self), "nodeid": self.nodeid, "browser": self.browser, "param": self.param}
+
+    @classmethod
+    def from_json(cls, data: dict) -> "TestResult":
+        return cls(**{k: data[k] for k in cls.__dataclass_fields__ if k in data})
+
+
+def pretty_id(full_name: str) -> str:
+    return TestResult(*split_full_name(full_name), outcome="pass").pretty
+
+
+def _local(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def _case_from(elem: ET.Element, source: str) -> TestResult:
+    try:
+        t = float(elem.get("time", "0") or 0.0)
+    except ValueError:
+        t = 0.0
+    outcome, message, props, earlier = "pass", "", {}, 0
+    for child in elem:
+        tag = _local(child.tag)
+        if tag in ("failure", "error", "skipped"):
+            cand = {"failure": "fail", "error": "error", "skipped": "skip"}[tag]
+            if _SEVERITY[cand] > _SEVERITY[outcome]:
+                outcome = cand
+                message = (child.get("message") or "").strip() or (child.text or "").strip()
+        elif tag == "properties":
+            for p in child:
+                if p.get("name"):
+                    props[p.get("name")] = p.get("value") or ""
+        elif tag in _RERUN_TAGS:
+            earlier += 1
+    if outcome in ("fail", "error") and not message:
+        message = "No message"
+    return TestResult(classname=(elem.get("classname") or "").strip(), name=(elem.get("name") or "").strip(),
+                      outcome=outcome, time=t, message=message, properties=props, source=source,
+                      attempts=1 + earlier, flaky=bool(earlier) and outcome == "pass")
+
+
+def is_junit(path: str) -> bool:
+    """Cheap check: only the root element is parsed."""
+    try:
+        for _, elem in ET.iterparse(path, events=("start",)):
+            return _local(elem.tag) in ("testsuites", "testsuite")
+    except (ET.ParseError, OSError):
+        return False
+    return False
+
+
+def iter_junit(path: str, suites: Optional[list[dict]] = None) -> Iterator[TestResult]:
+    """Yield every testcase of one file; suite attributes (time, timestamp) go to `suites` if given."""
+    stack: list[ET.Element] = []
+    for event, elem in ET.iterparse(path, events=("start", "end")):
+        if event == "start":
+            stack.append(elem)
+            continue
+        stack.pop()
+        tag = _local(elem.tag)
+        if tag not in ("testcase", "testsuite"):
+            continue
+        if tag == "testcase":
+            yield _case_from(elem, str(path))
+        elif suites is not None:
+            suites.append({k: elem.get(k) for k in ("name", "time", "timestamp", "tests")})
+        # Done with it: detach from the parent so the tree never grows past one case
+        elem.clear()
+        if stack:
+            stack[-1].remove(elem)
+
+
+@dataclass
+class ResultSet:
+    cases: dict[str, TestResult] = field(default_factory=dict)
+    sources: list[str] = field(default_factory=list)
+    duration: float = 0.0
+    started_at: Optional[str] = None
+
+    def add_file(self, path: str) -> None:
+        suites: list[dict] = []
+        local: dict[str, TestResult] = {}
+        for case in iter_junit(path, suites):
+            prev = local.get(case.key)
+            # Same test twice in one file: keep the worse outcome, sum the time
+            if prev is None or _SEVERITY[case.outcome] > _SEVERITY[prev.outcome]:
+                if prev is not None:
+                    case.time += prev.time
+                    case.properties = {**prev.properties, **case.properties}
+                local[case.key] = case
+            else:
+                prev.time += case.time
+        for key, case in local.items():
+            prev = self.cases.get(key)
+            if prev is not None:
+                case.attempts += prev.attempts
+                case.flaky = case.outcome == "pass" and (prev.flaky or prev.outcome in ("fail", "error"))
+            self.cases[key] = case
+        for s in suites:
+            try:
+                self.duration += float(s.get("time") or 0.0)
+            except ValueError:
+                pass
+            if s.get("timestamp") and (self.started_at is None or s["timestamp"] < self.started_at):
+                self.started_at = s["timestamp"]
+        self.sources.append(str(path))
+
+    def by_outcome(self, outcome: str) -> list[TestResult]:
+        return [c for c in self.cases.values() if c.outcome == outcome]
+
+    def counts(self) -> dict[str, int]:
+        out = {k: 0 for k in OUTCOMES}
+        for c in self.cases.values():
+            out[c.outcome] += 1
+        return out
+
+    def flaky(self) -> list[TestResult]:
+        return [c for c in self.cases.values() if c.flaky]
+
+    def __len__(self) -> int:
+        return len(self.cases)
+
+    def __iter__(self) -> Iterator[TestResult]:
+        return iter(self.cases.values())
+
+
+def expand(patterns: Iterable[str]) -> list[str]:
+    """Files from paths / globs / comma-separated lists, oldest first, JUnit only."""
+    files: set[str] = set()
+    for pat in patterns:
+        for part in str(pat).split(","):
+            part = part.strip()
+            if not part:
+                continue
+            matches = glob.glob(part) if any(ch in part for ch in "*?[") else [part]
+            files.update(m for m in matches if os.path.isfile(m))
+    return sorted((f for f in files if is_junit(f)), key=lambda p: (os.path.getmtime(p), p))
+
+
+def newest_junit(directory: str = "report") -> Optional[str]:
+    cands = sorted(glob.glob(os.path.join(directory, "*.xml")), key=os.path.getmtime, reverse=True)
+    return next((p for p in cands if is_junit(p)), None)
+
+
+def cache_path() -> str:
+    return os.getenv("E2E_RESULTS_CACHE") or CACHE_FILE
+
+
+def _signature(paths: Iterable[str]) -> list[list]:
+    out = []
+    for p in paths:
+        st = os.stat(p)
+        out.append([os.path.abspath(p), st.st_size, st.st_mtime_ns])
+    return out
+
+
+def write_cache(rs: ResultSet, path: Optional[str] = None) -> str:
+    path = path or cache_path()
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    meta = {"version": _CACHE_VERSION, "sources": _signature(rs.sources), "duration": rs.duration,
+            "started_at": rs.started_at}
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        fh.write(json.dumps({"meta": meta}) + "\n")
+        for case in rs:
+            fh.write(json.dumps(case.to_json(), ensure_ascii=False) + "\n")
+    os.replace(tmp, path)
+    return path
+
+
+def read_cache(path: Optional[str] = None, sources: Optional[list[str]] = None) -> Optional[ResultSet]:
+    """The cached set, or None when missing/stale (`sources` given and changed since it was written)."""
+    path = path or cache_path()
+    try:
+        with open(path, encoding="utf-8") as fh:
+            meta = (json.loads(fh.readline() or "{}") or {}).get("meta") or {}
+            if meta.get("version") != _CACHE_VERSION:
+                return None
+            if sources is not None and meta.get("sources") != _signature(sources):
+                return None
+            rs = ResultSet(sources=[s[0] for s in meta.get("sources") or []],
+                           duration=meta.get("duration") or 0.0, started_at=meta.get("started_at"))
+            for line in fh:
+                if line.strip():
+                    case = TestResult.from_json(json.loads(line))
+                    rs.cases[case.key] = case
+            return rs
+    except (OSError, ValueError, TypeError):
+        return None
+
+
+def load_results(paths: Iterable[str], cache: Optional[str] = None) -> ResultSet:
+    """
+    Merge `paths`; with `cache`, reuse that file when it was written from the
+    same sources and (re)write it otherwise.
+    """
+    paths = list(paths)
+    if cache:
+        cached = read_cache(cache, paths)
+        if cached is not None:
+            return cached
+    rs = ResultSet()
+    for p in paths:
+        try:
+            rs.add_file(p)
+        except ET.ParseError as e:
+            print(f"[results] WARN: {p}: {e}")
+    if cache and rs.sources:
+        try:
+            write_cache(rs, cache)
+        except OSError as e:
+            print(f"[results] WARN: cannot write {cache}: {e}")
+    return rs
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = argv if argv is not None else sys.argv[1:]
+    files = expand(args) or ([newest_junit()] if newest_junit() else [])
+    if files:
+        rs = load_results(files, cache=cache_path())
+    else:
+        rs = read_cache()
+        if rs is None:
+            print("[results] No JUnit files")
+            return 1
+        print(f"[results] Using cached {cache_path()}")
+    c = rs.counts()
+    print(f"[results] {len(rs.sources)} file(s), {len(rs)} tests: pass={c['pass']} fail={c['fail']} "
+          f"error={c['error']} skip={c['skip']} flaky={len(rs.flaky())} duration={rs.duration:.1f}s")
+    for case in rs.flaky():
+        print(f"[results] flaky: {case.pretty} ({case.attempts} attempts)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
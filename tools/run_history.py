@@ -0,0 +1,457 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Run-history store: ingest JUnit runs into SQLite and flag statistically significant slowdowns.
+
+Every `report/junit-<ts>.xml` becomes one row in `runs` (site, branch, commit,
+timestamp, totals) with one row per test in `results` (outcome, duration,
+browser, param). Performance properties recorded by the tests
+(`login_phases`, `perf`, `memory`) and discovery metrics files (`--metrics
+report/discover/<site>.metrics.json`) land in `metrics`. Re-ingesting the same
+file is a no-op (keyed by content digest).
+
+Regression check: for each test (passed runs only) and each route/phase
+metric, the last --recent runs are compared with the --window runs before them.
+With at least 3 recent samples a one-sided Mann-Whitney U test is used
+(p < --alpha; exact permutation distribution for small samples, normal
+approximation otherwise); with fewer, a robust z-score against the baseline
+median/MAD (z > --z). The baseline needs enough runs for the test to be able
+to reach --alpha at all (`min_baseline`: 7 for --recent 3 and --alpha 0.01),
+so each test/route is only checked from its recent + min_baseline-th run on
+(10 with the defaults). Either way the median must also have grown by --min-ratio, so tiny
+but consistent shifts are not reported. When the baseline median is 0 or below
+(CLS, long tasks, memory slopes) there is no ratio; the median must instead
+have grown by the metric's absolute minimum delta (MIN_DELTA, --min-delta).
+
+Usage:
+  python tools/run_history.py ingest report/junit-*.xml --site ratemate
+  python tools/run_history.py ingest "report/junit-*.xml" --merge   # matrix shards -> one run
+  python tools/run_history.py ingest report/junit.xml --metrics report/discover/ratemate.metrics.json
+  python tools/run_history.py regressions --site ratemate [--json]
+
+The database defaults to $E2E_HISTORY_DB or report/history.sqlite.
+"""
+
+from __future__ import annotations
+import argparse
+import contextlib
+import hashlib
+import json
+import math
+import os
+import sqlite3
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Iterable, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from tools.results import cache_path, expand, load_results  # noqa: E402
+
+DEFAULT_DB = "report/history.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+  id INTEGER PRIMARY KEY,
+  digest TEXT UNIQUE NOT NULL,
+  source TEXT,
+  started_at TEXT NOT NULL,
+  site TEXT, branch TEXT, commit_sha TEXT, base_url TEXT,
+  duration REAL, total INTEGER, passed INTEGER, failed INTEGER, errored INTEGER, skipped INTEGER
+);
+CREATE TABLE IF NOT EXISTS results (
+  run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+  test_id TEXT NOT NULL,
+  browser TEXT NOT NULL DEFAULT '',
+  param TEXT,
+  outcome TEXT NOT NULL,
+  duration REAL,
+  PRIMARY KEY (run_id, test_id, browser)
+);
+CREATE TABLE IF NOT EXISTS metrics (
+  run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+  scope TEXT NOT NULL,      -- login_phase | route_perf | route_load | memory
+  subject TEXT NOT NULL,    -- phase name or route path
+  name TEXT NOT NULL,       -- e.g. duration_ms, lcp_ms, ttfb_ms
+  browser TEXT NOT NULL DEFAULT '',
+  value REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_test ON results(test_id, browser);
+CREATE INDEX IF NOT EXISTS metrics_key ON metrics(scope, subject, name, browser);
+CREATE INDEX IF NOT EXISTS runs_site ON runs(site, started_at);
+"""
+
+
+def connect(path: Optional[str] = None) -> sqlite3.Connection:
+    db = Path(path or os.getenv("E2E_HISTORY_DB") or DEFAULT_DB)
+    db.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(db))
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+# ----- ingestion -----
+
+def _git_commit() -> str:
+    with contextlib.suppress(Exception):
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                              timeout=5).stdout.strip()
+    return ""
+
+
+def _properties_to_metrics(props: dict[str, str], browser: str) -> list[tuple[str, str, str, str, float]]:
+    out = []
+    with contextlib.suppress(Exception):
+        for phase, ms in (json.loads(props.get("login_phases") or "{}") or {}).items():
+            if isinstance(ms, (int, float)):
+                out.append(("login_phase", phase, "duration_ms", browser, float(ms)))
+    with contextlib.suppress(Exception):
+        perf = json.loads(props.get("perf") or "{}") or {}
+        for name, val in (perf.get("median") or {}).items():
+            if isinstance(val, (int, float)):
+                out.append(("route_perf", str(perf.get("path") or ""), name, browser, float(val)))
+    with contextlib.suppress(Exception):
+        mem = json.loads(props.get("memory") or "{}") or {}
+        for name, val in (mem.get("slopes") or {}).items():
+            if isinstance(val, (int, float)):
+                out.append(("memory", "spa", name, browser, float(val)))
+    return out
+
+
+def _digest(paths: list[str]) -> str:
+    h = hashlib.sha256()
+    for p in paths:
+        with open(p, "rb") as fh:
+            for chunk in iter(lambda: fh.read(1 << 20), b""):
+                h.update(chunk)
+    return h.hexdigest()
+
+
+def ingest_junit(conn: sqlite3.Connection, path: str | list[str], site: str = "", branch: str = "",
+                 commit: str = "", base_url: str = "", metrics_files: Iterable[str] = (),
+                 cache: Optional[str] = None) -> Optional[int]:
+    """
+    Load one run: a JUnit file, or a list of shard files merged into a single run
+    (tools/results.py, reusing the results cache `cache` when it matches).
+    Returns the new run id, or None when it was already ingested.
+    """
+    paths = [path] if isinstance(path, (str, os.PathLike)) else list(path)
+    digest = _digest(paths)
+    if conn.execute("SELECT 1 FROM runs WHERE digest = ?", (digest,)).fetchone():
+        return None
+    rs = load_results(paths, cache=cache)
+    if not rs.sources:
+        raise ValueError(f"no readable JUnit in {', '.join(map(str, paths))}")
+    started = rs.started_at \
+        or time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(Path(paths[-1]).stat().st_mtime))
+
+    rows, metric_rows = {}, []
+    for case in rs:
+        rows[(case.test_id, case.browser)] = (case.test_id, case.browser, case.param, case.outcome, case.time)
+        if case.outcome == "pass":
+            metric_rows += _properties_to_metrics(case.properties, case.browser)
+
+    for mf in metrics_files:
+        with contextlib.suppress(Exception):
+            data = json.loads(Path(mf).read_text(encoding="utf-8")) or {}
+            for route, vals in (data.get("routes") or {}).items():
+                for name, val in (vals or {}).items():
+                    if isinstance(val, (int, float)):
+                        metric_rows.append(("route_load", route, name, "", float(val)))
+
+    counts = {k: sum(1 for r in rows.values() if r[3] == k) for k in ("pass", "fail", "error", "skip")}
+    with conn:
+        cur = conn.execute(
+            "INSERT INTO runs (digest, source, started_at, site, branch, commit_sha, base_url, duration, total,"
+            " passed, failed, errored, skipped) VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?)",
+            (digest, ",".join(map(str, paths)), started, site, branch, commit, base_url, rs.duration, len(rows),
+             counts["pass"], counts["fail"], counts["error"], counts["skip"]))
+        run_id = cur.lastrowid
+        conn.executemany("INSERT INTO results VALUES (?,?,?,?,?,?)", [(run_id, *r) for r in rows.values()])
+        conn.executemany("INSERT INTO metrics VALUES (?,?,?,?,?,?)", [(run_id, *m) for m in metric_rows])
+    return run_id
+
+
+# ----- statistics -----
+
+_EXACT_MAX_CELLS = 1000  # n1 * n2 up to which the exact permutation distribution is used
+
+
+def _exact_greater(doubled_ranks: list[int], groups: list[int], n1: int) -> float:
+    """P(rank sum of a random n1-subset >= observed rank sum of group 0); midranks doubled to stay integral."""
+    observed = sum(r for r, g in zip(doubled_ranks, groups) if g == 0)
+    counts: list[dict[int, int]] = [{} for _ in range(n1 + 1)]
+    counts[0][0] = 1
+    for r in doubled_ranks:
+        for k in range(n1, 0, -1):
+            here = counts[k]
+            for total, c in counts[k - 1].items():
+                here[total + r] = here.get(total + r, 0) + c
+    tail = sum(c for total, c in counts[n1].items() if total >= observed)
+    return tail / math.comb(len(doubled_ranks), n1)
+
+
+def mann_whitney_greater(x: list[float], y: list[float]) -> float:
+    """One-sided p-value that x tends to be larger than y (tie-corrected).
+
+    Exact permutation p-value for small samples (n1 * n2 <= _EXACT_MAX_CELLS), where the normal
+    approximation is too conservative to ever reach the usual alphas; normal approximation otherwise.
+    """
+    n1, n2 = len(x), len(y)
+    if not n1 or not n2:
+        return 1.0
+    allv = sorted([(v, 0) for v in x] + [(v, 1) for v in y])
+    ranks = [0.0] * len(allv)
+    ties = 0.0
+    i = 0
+    while i < len(allv):
+        j = i
+        while j + 1 < len(allv) and allv[j + 1][0] == allv[i][0]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[k] = (i + j) / 2 + 1
+        t = j - i + 1
+        ties += t ** 3 - t
+        i = j + 1
+    if n1 * n2 <= _EXACT_MAX_CELLS:
+        return _exact_greater([int(round(2 * r)) for r in ranks], [g for _, g in allv], n1)
+    r1 = sum(r for r, (_, g) in zip(ranks, allv) if g == 0)
+    u1 = r1 - n1 * (n1 + 1) / 2
+    n = n1 + n2
+    var = n1 * n2 / 12 * ((n + 1) - ties / (n * (n - 1)))
+    if var <= 0:
+        return 1.0
+    z = (u1 - n1 * n2 / 2 - 0.5) / math.sqrt(var)
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def robust_z(value: float, baseline: list[float]) -> float:
+    med = statistics.median(baseline)
+    mad = statistics.median(abs(v - med) for v in baseline) * 1.4826
+    # A perfectly flat baseline would make any change infinitely significant
+    scale = max(mad, abs(med) * 0.05, 1e-9)
+    return (value - med) / scale
+
+
+@dataclass
+class Regression:
+    kind: str  # test | metric
+    key: str
+    browser: str
+    baseline_median: float
+    recent_median: float
+    ratio: float
+    method: str  # mann-whitney | robust-z
+    score: float  # p-value or z
+    n_baseline: int
+    n_recent: int
+
+    def describe(self, unit: str = "") -> str:
+        unit = unit or ("s" if self.kind == "test" else "")
+        stat = f"p={self.score:.3g}" if self.method == "mann-whitney" else f"z={self.score:.1f}"
+        br = f" ({self.browser})" if self.browser else ""
+        growth = (f"x{self.ratio:.2f}" if math.isfinite(self.ratio)
+                  else f"+{self.recent_median - self.baseline_median:.4g}{unit}")
+        return (f"{self.key}{br}: {self.baseline_median:.4g}{unit} -> {self.recent_median:.4g}{unit} "
+                f"({growth}, {stat}, n={self.n_baseline}+{self.n_recent})")
+
+
+# Absolute growth required instead of --min-ratio when the baseline median is <= 0
+MIN_DELTA = {
+    "test": 0.5,  # seconds
+    "cls": 0.05,
+    "longtask_count": 2,
+    "requests": 5,
+    "transfer_bytes": 50_000,
+    "js_heap_bytes": 1_000_000,
+    "heap_slope_kb": 256,
+    "nodes_slope": 100,
+    "listeners_slope": 25,
+}
+DEFAULT_MIN_DELTA_MS = 100.0  # any other *_ms metric
+DEFAULT_MIN_DELTA = 1.0
+
+
+def min_delta_for(name: str, overrides: Optional[dict[str, float]] = None) -> float:
+    table = {**MIN_DELTA, **(overrides or {})}
+    if name in table:
+        return float(table[name])
+    return DEFAULT_MIN_DELTA_MS if name.endswith("_ms") else DEFAULT_MIN_DELTA
+
+
+def min_baseline(recent: int, alpha: float = 0.01, floor: int = 5) -> int:
+    """Fewest baseline runs for which `recent` runs can be significant at all.
+
+    With 3+ recent runs the smallest possible Mann-Whitney p-value is 1 / C(nb + nr, nr) (every recent run
+    slower than every baseline run); below that many baseline runs nothing could ever be flagged.
+    """
+    if recent < 3:
+        return floor
+    nb = floor
+    while 1 / math.comb(nb + recent, recent) >= alpha:
+        nb += 1
+    return nb
+
+
+def detect(series: list[float], recent: int = 3, window: int = 20, alpha: float = 0.01,
+           z_max: float = 3.5, min_ratio: float = 1.2,
+           min_delta: float = DEFAULT_MIN_DELTA) -> Optional[tuple[float, float, float, str, float, int, int]]:
+    """Check the tail of a chronological series; returns (base_med, recent_med, ratio, method, score, nb, nr)."""
+    rec = series[-recent:] if recent > 0 else []
+    base = series[-(recent + window):-recent] if recent > 0 else []
+    if not rec or len(base) < min_baseline(len(rec), alpha):
+        return None
+    b_med, r_med = statistics.median(base), statistics.median(rec)
+    if b_med > 0:
+        ratio = r_med / b_med
+        if ratio < min_ratio:
+            return None
+    else:
+        # No meaningful ratio from a zero/negative baseline (CLS 0, flat memory slope)
+        if r_med - b_med < max(min_delta, 0.0) or r_med <= b_med:
+            return None
+        ratio = float("inf")
+    if len(rec) >= 3:
+        p = mann_whitney_greater(rec, base)
+        return (b_med, r_med, ratio, "mann-whitney", p, len(base), len(rec)) if p < alpha else None
+    z = robust_z(r_med, base)
+    return (b_med, r_med, ratio, "robust-z", z, len(base), len(rec)) if z > z_max else None
+
+
+def _run_filter(site: Optional[str], branch: Optional[str]) -> tuple[str, list]:
+    where, args = [], []
+    if site:
+        where.append("r.site = ?")
+        args.append(site)
+    if branch:
+        where.append("r.branch = ?")
+        args.append(branch)
+    return (" AND " + " AND ".join(where)) if where else "", args
+
+
+def find_regressions(conn: sqlite3.Connection, site: Optional[str] = None, branch: Optional[str] = None,
+                     min_deltas: Optional[dict[str, float]] = None, **opts) -> list[Regression]:
+    where, args = _run_filter(site, branch)
+    out: list[Regression] = []
+    series: dict[tuple, list[float]] = {}
+    deltas: dict[tuple, float] = {}
+    for test_id, browser, dur in conn.execute(
+            "SELECT s.test_id, s.browser, s.duration FROM results s JOIN runs r ON r.id = s.run_id"
+            f" WHERE s.outcome = 'pass'{where} ORDER BY r.started_at, r.id", args):
+        series.setdefault(("test", test_id, browser), []).append(dur or 0.0)
+    for scope, subject, name, browser, val in conn.execute(
+            "SELECT m.scope, m.subject, m.name, m.browser, m.value FROM metrics m JOIN runs r ON r.id = m.run_id"
+            f" WHERE 1=1{where} ORDER BY r.started_at, r.id", args):
+        key = ("metric", f"{scope} {subject} {name}", browser)
+        series.setdefault(key, []).append(val)
+        deltas[key] = min_delta_for(name, min_deltas)
+    for (kind, key, browser), vals in series.items():
+        delta = deltas.get((kind, key, browser), min_delta_for("test", min_deltas))
+        hit = detect(vals, min_delta=delta, **opts)
+        if hit:
+            out.append(Regression(kind, key, browser, *hit))
+    out.sort(key=lambda r: -r.ratio)
+    return out
+
+
+def route_history(conn: sqlite3.Connection, site: Optional[str] = None, runs: int = 20) -> dict[str, dict]:
+    """Per route (test_routes_access / test_open_links_ok params): pass rate and median time over recent runs."""
+    where, args = _run_filter(site, None)
+    run_ids = [r[0] for r in conn.execute(
+        f"SELECT r.id FROM runs r WHERE 1=1{where} ORDER BY r.started_at DESC, r.id DESC LIMIT ?", [*args, runs])]
+    if not run_ids:
+        return {}
+    marks = ",".join("?" * len(run_ids))
+    stats: dict[str, dict] = {}
+    for param, outcome, dur in conn.execute(
+            f"SELECT param, outcome, duration FROM results WHERE run_id IN ({marks}) AND param IS NOT NULL"
+            " AND (test_id LIKE '%.test_routes_access[%' OR test_id LIKE '%.test_open_links_ok[%')"
+            " ORDER BY run_id", run_ids):
+        path = param.split(":", 1)[1] if ":" in param else param
+        st = stats.setdefault(path, {"runs": 0, "passed": 0, "times": []})
+        if outcome == "skip":
+            continue
+        st["runs"] += 1
+        st["passed"] += outcome == "pass"
+        st["times"].append(dur or 0.0)
+    return {p: {"runs": s["runs"], "pass_rate": round(s["passed"] / s["runs"], 3) if s["runs"] else None,
+                "median_time": round(statistics.median(s["times"]), 3) if s["times"] else None}
+            for p, s in sorted(stats.items())}
+
+
+# ----- CLI -----
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--db", help=f"SQLite file (default $E2E_HISTORY_DB or {DEFAULT_DB})")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    ing = sub.add_parser("ingest", help="Load JUnit files into the store")
+    ing.add_argument("junit", nargs="+", help="JUnit XML files or globs")
+    ing.add_argument("--site", default=os.getenv("SITE", ""))
+    ing.add_argument("--branch", default=os.getenv("GITHUB_REF_NAME", ""))
+    ing.add_argument("--commit", default=os.getenv("GITHUB_SHA", ""))
+    ing.add_argument("--base-url", default=os.getenv("BASE_URL", ""))
+    ing.add_argument("--metrics", nargs="*", default=[], help="Discovery <site>.metrics.json files for this run")
+    ing.add_argument("--merge", action="store_true", help="Treat all files as shards of a single run")
+
+    reg = sub.add_parser("regressions", help="List tests/routes that got significantly slower")
+    reg.add_argument("--site", default=os.getenv("SITE", ""))
+    reg.add_argument("--branch")
+    reg.add_argument("--recent", type=int, default=3, help="Latest runs under test (default 3)")
+    reg.add_argument("--window", type=int, default=20,
+                     help="Baseline runs before them (default 20). A series is only checked once it has "
+                          "enough baseline runs to reach --alpha (7 for --recent 3 and --alpha 0.01), i.e. "
+                          "from its 10th run with the defaults")
+    reg.add_argument("--alpha", type=float, default=0.01, help="Mann-Whitney significance level")
+    reg.add_argument("--z", type=float, default=3.5, help="Robust z threshold when fewer than 3 recent runs")
+    reg.add_argument("--min-ratio", type=float, default=1.2, help="Minimum median slowdown factor")
+    reg.add_argument("--min-delta", action="append", default=[], metavar="NAME=VALUE",
+                     help="Absolute growth required when the baseline median is <= 0, per metric name "
+                          "(or 'test' for durations in s); repeatable, overrides MIN_DELTA")
+    reg.add_argument("--json", action="store_true")
+    args = ap.parse_args(argv)
+
+    conn = connect(args.db)
+    if args.cmd == "ingest":
+        files = expand(args.junit)
+        if not files:
+            print("[history] WARN: no JUnit files found")
+            return 0
+        commit = args.commit or _git_commit()
+        # --merge: the files are shards of one run (browser matrix / xdist / rerun job)
+        for group in ([files] if args.merge else [[f] for f in files]):
+            label = group[0] if len(group) == 1 else f"{len(group)} shards"
+            try:
+                run_id = ingest_junit(conn, group, args.site, args.branch, commit, args.base_url, args.metrics,
+                                      cache=cache_path() if args.merge else None)
+            except ValueError as e:
+                print(f"[history] WARN: skip {label}: {e}")
+                continue
+            print(f"[history] {label}: " + (f"run {run_id}" if run_id else "already ingested"))
+        return 0
+
+    min_deltas = {}
+    for spec in args.min_delta:
+        name, sep, val = spec.partition("=")
+        if not sep:
+            ap.error(f"bad --min-delta {spec!r} (expected NAME=VALUE)")
+        min_deltas[name.strip()] = float(val)
+    regs = find_regressions(conn, args.site or None, args.branch, min_deltas=min_deltas, recent=args.recent,
+                            window=args.window, alpha=args.alpha, z_max=args.z, min_ratio=args.min_ratio)
+    if args.json:
+        print(json.dumps([asdict(r) for r in regs], indent=2))
+    elif not regs:
+        print("[history] No significant slowdowns")
+    else:
+        for r in regs:
+            print(f"[history] SLOWER {r.describe()}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())